@@ -0,0 +1,36 @@
+# Analytics package
+from .loader import DIMENSIONS, load_transaction_frame
+from .cache import ReportCache
+from .concentration import CONCENTRATION_DIMENSIONS, concentration_report
+from .exposure import EXPOSURE_GROUPS, EXPOSURE_MAX_CELLS, compute_exposure_changes, compute_exposure_series, exposure_series
+from .liquidity import GAP_BUCKETS, compute_liquidity_mismatch, liquidity_mismatch
+from .portfolio import compute_portfolio_analytics, portfolio_analytics
+from .projection import FREQUENCIES, compute_cash_flow_ladder, project_cash_flows
+from .product_table import ProductTable, product_table, resident_product_table, use_resident_tables
+from .report import write_report
+
+__all__ = [
+    "DIMENSIONS",
+    "load_transaction_frame",
+    "compute_portfolio_analytics",
+    "portfolio_analytics",
+    "ReportCache",
+    "CONCENTRATION_DIMENSIONS",
+    "concentration_report",
+    "EXPOSURE_GROUPS",
+    "EXPOSURE_MAX_CELLS",
+    "compute_exposure_changes",
+    "compute_exposure_series",
+    "exposure_series",
+    "GAP_BUCKETS",
+    "compute_liquidity_mismatch",
+    "liquidity_mismatch",
+    "FREQUENCIES",
+    "compute_cash_flow_ladder",
+    "project_cash_flows",
+    "ProductTable",
+    "product_table",
+    "resident_product_table",
+    "use_resident_tables",
+    "write_report",
+]
@@ -0,0 +1,69 @@
+"""
+分析结果缓存：按查询参数与数据版本缓存 DataFrame（进程内 + 本地文件）
+
+缓存文件为 JSON（pandas 的 table 格式，带列类型），读取时不执行任何代码；缓存目录仅当前用户可读写。
+"""
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from ..database.connection import PROJECT_ROOT
+
+# 缓存目录：优先读取环境变量 FUNDMAN_CACHE_DIR
+DEFAULT_CACHE_DIR = Path(os.getenv("FUNDMAN_CACHE_DIR") or PROJECT_ROOT / "data" / "cache")
+
+
+class ReportCache:
+    """两级缓存：进程内字典 + 本地 JSON 文件（跨进程复用，如日内重复运行）"""
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self.directory = Path(directory) if directory else DEFAULT_CACHE_DIR
+        self._memory: Dict[str, Tuple[str, pd.DataFrame]] = {}
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return self.directory / f"{digest}.json"
+
+    def get(self, key: str, version: str) -> Optional[pd.DataFrame]:
+        """获取缓存结果；数据版本不一致时视为未命中"""
+        hit = self._memory.get(key)
+        if hit and hit[0] == version:
+            return hit[1].copy()
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            stored = json.loads(path.read_text(encoding="utf-8"))
+            if stored["key"] != key or stored["version"] != version:
+                return None
+            frame = pd.read_json(io.StringIO(stored["frame"]), orient="table")
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self._memory[key] = (version, frame)
+        return frame.copy()
+
+    def put(self, key: str, version: str, frame: pd.DataFrame) -> None:
+        """写入缓存（同时写内存与文件）"""
+        frame = frame.copy()
+        self._memory[key] = (version, frame)
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        document = {"key": key, "version": version, "frame": frame.to_json(orient="table", index=False)}
+        path = self._path(key)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False)
+
+    def clear(self) -> None:
+        """清空进程内缓存与缓存文件"""
+        self._memory.clear()
+        if self.directory.exists():
+            for path in self.directory.glob("*.json"):
+                path.unlink()
+
+
+default_cache = ReportCache()
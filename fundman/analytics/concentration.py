@@ -0,0 +1,118 @@
+"""
+集中度分析：按发行人/行业/地区等维度在 SQL 中汇总持仓敞口
+"""
+from datetime import date
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from ..database.versions import data_version
+from ..models import AssetDB, TransactionDB, WealthProductDB
+from .cache import ReportCache, default_cache
+from .loader import UNKNOWN_LABEL
+from .portfolio import to_day
+
+CONCENTRATION_DIMENSIONS = ("issuer", "industry", "region", "asset_type")
+
+
+def concentration_statement(dimension: str, as_of: date, by_product: bool = True):
+    """构造集中度 GROUP BY 查询
+
+    敞口为清算金额（缺失时以 数量*单位全价 代替）；占比通过窗口函数按产品（或全账簿）合计计算。
+    仅统计 as_of 当日仍持有的交易。
+    """
+    if dimension not in CONCENTRATION_DIMENSIONS:
+        raise ValueError(f"不支持的维度: {dimension}（可选: {', '.join(CONCENTRATION_DIMENSIONS)}）")
+    amount = func.coalesce(
+        TransactionDB.settlement_amount,
+        TransactionDB.quantity * TransactionDB.unit_full_price,
+        0.0,
+    )
+    exposure = func.sum(amount)
+    label = func.coalesce(getattr(AssetDB, dimension), UNKNOWN_LABEL)
+    outstanding = (
+        TransactionDB.investment_date <= as_of,
+        or_(TransactionDB.maturity_date.is_(None), TransactionDB.maturity_date > as_of),
+    )
+
+    if by_product:
+        share = exposure / func.sum(exposure).over(partition_by=WealthProductDB.product_id)
+        stmt = (
+            select(
+                WealthProductDB.product_id,
+                WealthProductDB.product_yindeng_code,
+                WealthProductDB.product_name,
+                label.label(dimension),
+                exposure.label("exposure"),
+                share.label("share"),
+                func.count().label("transaction_count"),
+            )
+            .select_from(TransactionDB)
+            .join(AssetDB, TransactionDB.asset_id == AssetDB.asset_id)
+            .join(WealthProductDB, TransactionDB.product_id == WealthProductDB.product_id)
+            .where(*outstanding)
+            .group_by(WealthProductDB.product_id, label)
+            .order_by(WealthProductDB.product_id, exposure.desc())
+        )
+    else:
+        share = exposure / func.sum(exposure).over()
+        stmt = (
+            select(
+                label.label(dimension),
+                exposure.label("exposure"),
+                share.label("share"),
+                func.count().label("transaction_count"),
+            )
+            .select_from(TransactionDB)
+            .join(AssetDB, TransactionDB.asset_id == AssetDB.asset_id)
+            .where(*outstanding)
+            .group_by(label)
+            .order_by(exposure.desc())
+        )
+    return stmt
+
+
+def concentration_report(
+    db: Session,
+    query_date: Union[str, date],
+    dimensions: Sequence[str] = CONCENTRATION_DIMENSIONS,
+    limit: Union[None, float, Dict[str, float]] = None,
+    by_product: bool = True,
+    use_cache: bool = True,
+    cache: Optional[ReportCache] = None,
+) -> Dict[str, pd.DataFrame]:
+    """集中度报告
+
+    Args:
+        db: 数据库会话
+        query_date: 查询日期
+        dimensions: 统计维度
+        limit: 占比阈值（单一数值或按维度的字典）；超过阈值的行 breach 为 True
+        by_product: True 时按产品计算占比，False 时按全账簿计算
+        use_cache: 是否使用缓存（键为查询日期与参数，数据版本变化时自动失效；数据库没有变更日志时不缓存）
+        cache: 缓存实例，默认使用模块级缓存
+
+    Returns:
+        Dict[str, pd.DataFrame]: 每个维度一张表
+    """
+    as_of = to_day(query_date).astype(object)
+    cache = cache or default_cache
+    version = data_version(db) if use_cache else None
+    use_cache = version is not None
+
+    report = {}
+    for dimension in dimensions:
+        key = f"concentration|{as_of.isoformat()}|{dimension}|{'product' if by_product else 'book'}|{db.get_bind().url}"
+        frame = cache.get(key, version) if use_cache else None
+        if frame is None:
+            frame = pd.read_sql(concentration_statement(dimension, as_of, by_product), db.connection())
+            if use_cache:
+                cache.put(key, version, frame)
+        threshold = limit.get(dimension) if isinstance(limit, dict) else limit
+        frame["limit"] = np.nan if threshold is None else float(threshold)
+        frame["breach"] = frame["share"] > frame["limit"]
+        report[dimension] = frame
+    return report
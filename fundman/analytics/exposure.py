@@ -0,0 +1,202 @@
+"""
+敞口时间序列：按资产/产品/发行人等维度生成逐日未到期敞口
+
+每笔交易在投资日记 +清算金额、在到期日记 -清算金额（无到期日的交易一直持有），事件按 (分组, 日期) 排序一次
+（O(n log n)）后组内累加，得到各分组敞口发生变化的日期与取值（稀疏，行数不超过事件数）；汇总直接由变化点计算。
+逐日宽表（天数 × 分组数）只在需要时由变化点展开，且单元格数超过 EXPOSURE_MAX_CELLS 时拒绝生成。
+"""
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from .loader import UNKNOWN_LABEL, load_transaction_frame
+from .portfolio import to_day
+
+# 分组方式 -> 交易数据中的列
+EXPOSURE_GROUPS = {
+    "asset": "asset_code",
+    "product": "product_yindeng_code",
+    "issuer": "issuer",
+    "industry": "industry",
+    "region": "region",
+    "asset_type": "asset_type",
+}
+
+# 逐日宽表的单元格上限（float64 约 160 MB）
+EXPOSURE_MAX_CELLS = 20_000_000
+
+
+def _exposure_events(frame: pd.DataFrame, start: np.datetime64, days: int, by: str) -> Tuple[pd.DataFrame, pd.Index]:
+    """按 (分组, 日期) 排序的敞口变化点：day（相对起始日的天数）、code（分组编号）、exposure（当日起的敞口）"""
+    labels = frame[EXPOSURE_GROUPS[by]].astype(object).fillna(UNKNOWN_LABEL).to_numpy()
+    codes, groups = pd.factorize(labels, sort=True)
+    amount = frame["settlement_amount"].to_numpy(dtype="float64")
+    investment = (frame["investment_date"].to_numpy("datetime64[D]") - start).astype("int64")
+    maturity_dates = frame["maturity_date"].to_numpy("datetime64[D]")
+    closes = ~np.isnat(maturity_dates)
+    maturity = (maturity_dates[closes] - start).astype("int64")
+
+    # 事件偏移：早于起始日的归入第 0 天，晚于结束日的不影响区间内的敞口
+    offsets = np.maximum(np.concatenate([investment, maturity]), 0)
+    weights = np.concatenate([amount, -amount[closes]])
+    event_codes = np.concatenate([codes, codes[closes]])
+    inside = offsets < days
+    offsets, weights, event_codes = offsets[inside], weights[inside], event_codes[inside]
+
+    order = np.lexsort((offsets, event_codes))
+    events = pd.DataFrame({"day": offsets[order], "code": event_codes[order], "exposure": weights[order]})
+    events["exposure"] = events.groupby("code", sort=False)["exposure"].cumsum()
+    # 同一分组同一天的多个事件只保留最后一个（当日累计后的敞口）
+    return events.drop_duplicates(["code", "day"], keep="last").reset_index(drop=True), pd.Index(groups)
+
+
+def _day_range(start_date: Union[str, date], end_date: Union[str, date]) -> Tuple[np.datetime64, int]:
+    start, end = to_day(start_date), to_day(end_date)
+    if end < start:
+        raise ValueError("结束日不能早于起始日")
+    return start, int((end - start).astype("int64")) + 1
+
+
+def _check_by(by: str) -> None:
+    if by not in EXPOSURE_GROUPS:
+        raise ValueError(f"不支持的分组方式: {by}（可选: {', '.join(EXPOSURE_GROUPS)}）")
+
+
+def _expand(events: pd.DataFrame, groups: pd.Index, start: np.datetime64, days: int, by: str) -> pd.DataFrame:
+    """把变化点展开为逐日宽表；天数 × 分组数超过 EXPOSURE_MAX_CELLS 时抛出 ValueError"""
+    width = len(groups)
+    if days * width > EXPOSURE_MAX_CELLS:
+        raise ValueError(
+            f"逐日宽表过大（{days} 天 × {width} 个分组，上限 {EXPOSURE_MAX_CELLS} 个单元格），"
+            "请缩短区间、限定产品或改用更粗的分组"
+        )
+    day, code = events["day"].to_numpy(), events["code"].to_numpy()
+    values = events["exposure"].to_numpy()
+    deltas = values - np.where(np.r_[True, code[1:] != code[:-1]], 0.0, np.r_[0.0, values[:-1]])
+    table = np.zeros((days, width))
+    table[day, code] = deltas
+    np.cumsum(table, axis=0, out=table)
+    index = pd.DatetimeIndex(start + np.arange(days).astype("timedelta64[D]"), name="date")
+    return pd.DataFrame(table, index=index, columns=pd.Index(groups, name=by))
+
+
+def _changes_frame(events: pd.DataFrame, groups: pd.Index, start: np.datetime64, by: str) -> pd.DataFrame:
+    return pd.DataFrame({
+        "date": pd.DatetimeIndex(start + events["day"].to_numpy().astype("timedelta64[D]")),
+        by: groups.take(events["code"].to_numpy()),
+        "exposure": events["exposure"].to_numpy(),
+    })
+
+
+def compute_exposure_series(
+    frame: pd.DataFrame,
+    start_date: Union[str, date],
+    end_date: Union[str, date],
+    by: str = "asset",
+) -> pd.DataFrame:
+    """计算 [start_date, end_date] 内每日各分组的未到期敞口
+
+    交易在 投资日 <= d < 到期日 的日期 d 计入敞口；早于 start_date 的投资在首日即计入。
+
+    Args:
+        frame: load_transaction_frame 返回的交易数据
+        start_date: 起始日（含）
+        end_date: 结束日（含）
+        by: 分组方式，见 EXPOSURE_GROUPS
+
+    Returns:
+        pd.DataFrame: 以日期（DatetimeIndex，名为 date）为索引、每个分组一列的宽表
+
+    Raises:
+        ValueError: 分组方式或日期无效，或天数 × 分组数超过 EXPOSURE_MAX_CELLS
+    """
+    _check_by(by)
+    start, days = _day_range(start_date, end_date)
+    events, groups = _exposure_events(frame, start, days, by)
+    return _expand(events, groups, start, days, by)
+
+
+def compute_exposure_changes(
+    frame: pd.DataFrame,
+    start_date: Union[str, date],
+    end_date: Union[str, date],
+    by: str = "asset",
+) -> pd.DataFrame:
+    """稀疏的敞口序列：每个分组只在敞口变化的日期出一行（date, 分组, exposure），其余日期沿用上一行的值
+
+    起始日前已持有的敞口记在起始日；行数不超过交易事件数，与天数 × 分组数无关。
+    """
+    _check_by(by)
+    start, days = _day_range(start_date, end_date)
+    events, groups = _exposure_events(frame, start, days, by)
+    return _changes_frame(events, groups, start, by)
+
+
+def summarize_exposure(series: pd.DataFrame) -> pd.DataFrame:
+    """每个分组一行：期初、期末、峰值敞口及峰值日期，按峰值降序"""
+    values = series.to_numpy()
+    peak_at = values.argmax(axis=0)
+    summary = pd.DataFrame({
+        series.columns.name or "group": series.columns.to_numpy(),
+        "start_exposure": values[0],
+        "end_exposure": values[-1],
+        "peak_exposure": values[peak_at, np.arange(values.shape[1])],
+        "peak_date": series.index.to_numpy()[peak_at],
+    })
+    return summary.sort_values("peak_exposure", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def _summarize_events(events: pd.DataFrame, groups: pd.Index, start: np.datetime64, by: str) -> pd.DataFrame:
+    """由变化点直接计算 summarize_exposure 的结果，不展开逐日宽表"""
+    width = len(groups)
+    day, code = events["day"].to_numpy(), events["code"].to_numpy()
+    values = events["exposure"].to_numpy()
+    start_exposure = np.zeros(width)
+    opening = day == 0
+    start_exposure[code[opening]] = values[opening]
+    end_exposure = np.zeros(width)
+    end_exposure[code] = values  # 组内按日期升序，最后写入的即期末值
+
+    # 峰值：各变化点加上“首日敞口为 0”的候选，取最大值，同值取最早日期（与 argmax 一致）
+    missing = np.setdiff1d(np.arange(width), code[opening])
+    cand_code = np.concatenate([code, missing])
+    cand_day = np.concatenate([day, np.zeros(len(missing), dtype=day.dtype)])
+    cand_value = np.concatenate([values, np.zeros(len(missing))])
+    order = np.lexsort((cand_day, -cand_value, cand_code))
+    first = order[np.r_[True, cand_code[order][1:] != cand_code[order][:-1]]]
+
+    summary = pd.DataFrame({
+        by: groups.to_numpy(),
+        "start_exposure": start_exposure,
+        "end_exposure": end_exposure,
+        "peak_exposure": cand_value[first],
+        "peak_date": pd.DatetimeIndex(start + cand_day[first].astype("timedelta64[D]")),
+    })
+    return summary.sort_values("peak_exposure", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def exposure_series(
+    db: Session,
+    start_date: Union[str, date],
+    end_date: Union[str, date],
+    by: str = "asset",
+    product_codes: Optional[Iterable[str]] = None,
+    wide: bool = True,
+) -> Dict[str, pd.DataFrame]:
+    """从数据库加载交易（单条联表查询），返回敞口序列与分组汇总
+
+    Returns:
+        Dict[str, pd.DataFrame]: "exposure" 为逐日宽表（date 为列）；wide=False 或宽表超过 EXPOSURE_MAX_CELLS 时
+        改为 "changes"（compute_exposure_changes 的稀疏变化点）；"summary" 为分组汇总
+    """
+    _check_by(by)
+    start, days = _day_range(start_date, end_date)
+    frame = load_transaction_frame(db, product_codes=product_codes)
+    events, groups = _exposure_events(frame, start, days, by)
+    summary = _summarize_events(events, groups, start, by)
+    if wide and days * len(groups) <= EXPOSURE_MAX_CELLS:
+        return {"exposure": _expand(events, groups, start, days, by).reset_index(), "summary": summary}
+    return {"changes": _changes_frame(events, groups, start, by), "summary": summary}
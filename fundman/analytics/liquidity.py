@@ -0,0 +1,114 @@
+"""
+流动性错配分析：识别到期日晚于产品到期日的资产
+"""
+from datetime import date
+from typing import Dict, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from .loader import load_transaction_frame
+from .portfolio import first_index, to_day
+
+# 期限缺口（资产到期日 - 产品到期日，天）分布区间的右端点
+GAP_BUCKETS = (30, 90, 180, 365)
+
+
+def gap_bucket_labels(buckets: Sequence[int] = GAP_BUCKETS) -> list:
+    """期限缺口区间的列名，如 gap_1_30d / gap_over_365d / gap_open_ended"""
+    labels = []
+    lower = 1
+    for upper in buckets:
+        labels.append(f"gap_{lower}_{upper}d")
+        lower = upper + 1
+    labels.append(f"gap_over_{buckets[-1]}d")
+    labels.append("gap_open_ended")
+    return labels
+
+
+def compute_liquidity_mismatch(
+    frame: pd.DataFrame,
+    query_date: Union[str, date],
+    buckets: Sequence[int] = GAP_BUCKETS,
+    include_all: bool = False,
+) -> pd.DataFrame:
+    """按产品计算错配金额与期限缺口分布，按错配金额降序排列
+
+    到期日晚于产品到期日的资产计为错配；无到期日的资产视为错配（计入 gap_open_ended）。
+    仅统计查询日仍持有的交易。
+
+    Args:
+        frame: load_transaction_frame 返回的交易数据（含 product_end_date）
+        query_date: 查询日期
+        buckets: 期限缺口区间右端点（天）
+        include_all: 为 False 时仅返回存在错配的产品（例外报告）
+
+    Returns:
+        pd.DataFrame: 每个产品一行，含 rank、错配金额、占比、最大缺口及各缺口区间金额
+    """
+    qd = to_day(query_date)
+    investment = frame["investment_date"].to_numpy("datetime64[D]")
+    maturity = frame["maturity_date"].to_numpy("datetime64[D]")
+    live = (investment <= qd) & (np.isnat(maturity) | (maturity > qd))
+    frame = frame.loc[live]
+    maturity = maturity[live]
+
+    codes, product_ids = pd.factorize(frame["product_id"].to_numpy(), sort=True)
+    n = len(product_ids)
+    settlement = frame["settlement_amount"].to_numpy(dtype="float64")
+    product_end = frame["product_end_date"].to_numpy("datetime64[D]")
+
+    open_ended = np.isnat(maturity)
+    gap = np.where(open_ended, 0, (maturity - product_end).astype("int64"))
+    mismatched = open_ended | (gap > 0)
+
+    labels = gap_bucket_labels(buckets)
+    k = len(labels)
+    # 缺口区间下标：有限缺口按 buckets 划分，无到期日归入最后一列
+    bucket_idx = np.where(open_ended, k - 1, np.searchsorted(np.asarray(buckets), gap, side="left"))
+    weights = np.where(mismatched, settlement, 0.0)
+    distribution = np.bincount(codes * k + bucket_idx, weights=weights, minlength=n * k).reshape(n, k)
+
+    total = np.bincount(codes, weights=settlement, minlength=n)
+    mismatch_amount = distribution.sum(axis=1)
+    mismatch_count = np.bincount(codes, weights=mismatched, minlength=n).astype("int64")
+    max_gap = np.full(n, np.iinfo(np.int64).min)
+    np.maximum.at(max_gap, codes[mismatched & ~open_ended], gap[mismatched & ~open_ended])
+
+    first = first_index(codes, n)
+    end_dates = product_end[first]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = np.where(total > 0, mismatch_amount / total, np.nan)
+    report = pd.DataFrame({
+        "product_id": product_ids,
+        "product_yindeng_code": frame["product_yindeng_code"].to_numpy()[first],
+        "product_name": frame["product_name"].to_numpy()[first],
+        "product_end_date": end_dates.astype("datetime64[ns]"),
+        "product_days_remaining": np.maximum((end_dates - qd).astype("int64"), 0),
+        "settlement_total": total,
+        "mismatch_amount": mismatch_amount,
+        "mismatch_share": share,
+        "mismatch_count": mismatch_count,
+        "max_gap_days": pd.array(np.where(max_gap == np.iinfo(np.int64).min, None, max_gap), dtype="Int64"),
+    })
+    for j, label in enumerate(labels):
+        report[label] = distribution[:, j]
+
+    if not include_all:
+        report = report[report["mismatch_amount"] > 0]
+    report = report.sort_values(["mismatch_amount", "mismatch_share"], ascending=False, kind="stable").reset_index(drop=True)
+    report.insert(0, "rank", np.arange(1, len(report) + 1))
+    return report
+
+
+def liquidity_mismatch(
+    db: Session,
+    query_date: Union[str, date],
+    buckets: Sequence[int] = GAP_BUCKETS,
+    include_all: bool = False,
+) -> Dict[str, pd.DataFrame]:
+    """对全量持仓（单条联表查询）生成流动性错配例外报告"""
+    as_of = to_day(query_date).astype(object)
+    frame = load_transaction_frame(db, as_of=as_of)
+    return {"mismatch": compute_liquidity_mismatch(frame, as_of, buckets, include_all)}
@@ -0,0 +1,130 @@
+"""
+分析层数据加载：以单条联表查询把交易读取为列式 DataFrame
+"""
+from datetime import date
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from ..models import AssetDB, TransactionDB, WealthProductDB
+
+if TYPE_CHECKING:
+    from .product_table import ProductTable
+
+# 持仓维度列（来自 assets 表）
+DIMENSIONS = ("asset_type", "issuer", "industry", "region")
+
+# 维度缺失时使用的标签
+UNKNOWN_LABEL = "未知"
+
+# 交易数据中附带的产品列（来自 wealth_products 表）
+PRODUCT_COLUMNS = ("product_name", "product_yindeng_code", "product_end_date", "product_performance_benchmark")
+
+
+def transaction_frame_statement(
+    product_ids: Optional[Iterable[int]] = None,
+    product_codes: Optional[Iterable[str]] = None,
+    as_of: Optional[date] = None,
+    with_products: bool = True,
+):
+    """构造 交易 ⋈ 资产 ⋈ 产品 的列式查询语句
+
+    Args:
+        product_ids: 仅加载这些产品ID
+        product_codes: 仅加载这些银登编码的产品
+        as_of: 仅加载该日期仍持有的交易（投资日 <= as_of 且未到期）
+        with_products: 为 False 时不联接产品表（产品列由调用方从产品快照补齐，此时不支持 product_codes）
+    """
+    columns = [
+        TransactionDB.transaction_id,
+        TransactionDB.product_id,
+        TransactionDB.asset_id,
+        TransactionDB.investment_date,
+        TransactionDB.maturity_date,
+        TransactionDB.interest_rate,
+        TransactionDB.quantity,
+        TransactionDB.unit_full_price,
+        TransactionDB.settlement_amount,
+        AssetDB.asset_code,
+        AssetDB.asset_type,
+        AssetDB.issuer,
+        AssetDB.industry,
+        AssetDB.region,
+    ]
+    stmt = select(*columns).join(AssetDB, TransactionDB.asset_id == AssetDB.asset_id)
+    if with_products:
+        stmt = stmt.add_columns(*[getattr(WealthProductDB, name) for name in PRODUCT_COLUMNS]).join(
+            WealthProductDB, TransactionDB.product_id == WealthProductDB.product_id)
+    elif product_codes is not None:
+        raise ValueError("不联接产品表时不支持按银登编码过滤")
+    if product_ids is not None:
+        stmt = stmt.where(TransactionDB.product_id.in_(list(product_ids)))
+    if product_codes is not None:
+        stmt = stmt.where(WealthProductDB.product_yindeng_code.in_(list(product_codes)))
+    if as_of is not None:
+        stmt = stmt.where(
+            TransactionDB.investment_date <= as_of,
+            or_(TransactionDB.maturity_date.is_(None), TransactionDB.maturity_date > as_of),
+        )
+    return stmt
+
+
+def load_transaction_frame(
+    db: Session,
+    product_ids: Optional[Iterable[int]] = None,
+    product_codes: Optional[Iterable[str]] = None,
+    as_of: Optional[date] = None,
+    products: Optional["ProductTable"] = None,
+) -> pd.DataFrame:
+    """加载交易为列式 DataFrame（日期为 datetime64，维度列为 category）
+
+    清算金额缺失时以 数量*单位全价 补齐，仍缺失则记为 0。
+    提供产品快照（ProductTable）时不再联接产品表，产品列按 product_id 从快照中整列取出。
+    """
+    if products is None:
+        stmt = transaction_frame_statement(product_ids, product_codes, as_of)
+        frame = pd.read_sql(
+            stmt,
+            db.connection(),
+            parse_dates=["investment_date", "maturity_date", "product_end_date"],
+        )
+        return prepare_transaction_frame(frame)
+
+    if product_codes is not None:
+        matched = products["product_id"][products.isin("product_yindeng_code", product_codes)]
+        product_ids = matched if product_ids is None else np.intersect1d(matched, np.fromiter(product_ids, dtype=np.int64))
+    if product_ids is not None:
+        product_ids = np.asarray(product_ids, dtype=np.int64).tolist()
+    stmt = transaction_frame_statement(product_ids, None, as_of, with_products=False)
+    frame = pd.read_sql(stmt, db.connection(), parse_dates=["investment_date", "maturity_date"])
+    return prepare_transaction_frame(attach_products(frame, products))
+
+
+def attach_products(frame: pd.DataFrame, products: "ProductTable") -> pd.DataFrame:
+    """按 product_id 从产品快照补齐产品列（与联表一致，快照中不存在的产品对应的交易被丢弃）"""
+    positions = products.positions(frame["product_id"].to_numpy(dtype=np.int64))
+    found = positions >= 0
+    if not found.all():
+        frame = frame.loc[found].reset_index(drop=True)
+        positions = positions[found]
+    for name in PRODUCT_COLUMNS:
+        if name in products.categories:
+            frame[name] = products.labels(name)[positions]
+        else:
+            frame[name] = products[name][positions]
+    return frame
+
+
+def prepare_transaction_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """规范化交易列：补齐清算金额、维度列转为 category"""
+    settlement = frame["settlement_amount"].to_numpy(dtype="float64", na_value=np.nan)
+    fallback = frame["quantity"].to_numpy(dtype="float64", na_value=np.nan) * frame["unit_full_price"].to_numpy(dtype="float64", na_value=np.nan)
+    settlement = np.where(np.isnan(settlement), fallback, settlement)
+    frame["settlement_amount"] = np.nan_to_num(settlement, nan=0.0)
+    for column in DIMENSIONS:
+        if column in frame:
+            frame[column] = frame[column].fillna(UNKNOWN_LABEL).astype("category")
+    return frame
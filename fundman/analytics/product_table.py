@@ -0,0 +1,309 @@
+"""
+列式产品目录：把 wealth_products 一次读入为 NumPy 列数组，供进程内分析反复使用
+
+- 日期列为 datetime64[D]（空值为 NaT），金额列为 float64（空值为 NaN），非空整数列为 int64，可空整数列为 float64
+- 文本列（产品名称与各类编码）按字典编码为 int32 代码 + 取值数组（空值代码为 -1），与 pandas Categorical 一致
+- 过滤、排序、分组汇总与按主键定位均为整列运算；``to_frame`` 直接以列数组构造 DataFrame（数值列不复制）
+- ``refresh`` 按变更日志判断是否变化：只有新增行时增量追加，存在修改（含文本列）或删除时整表重新加载
+- 常驻进程（守护进程、HTTP 接口）调用 ``use_resident_tables`` 后，读取路径经 ``resident_product_table`` 复用进程内快照
+"""
+import threading
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Date, Float, Integer, String, case, func, select
+from sqlalchemy.orm import Session
+
+from ..database.changelog import current_watermark, has_change_log
+from ..models import ChangeLogDB, WealthProductDB
+from ..utils.calendar import BusinessCalendar, get_calendar
+
+TABLE_NAME = "wealth_products"
+_PK = WealthProductDB.product_id
+
+
+def _column_kind(column: Any) -> str:
+    """列的存储类型：int / float / date / category"""
+    if isinstance(column.type, Date):
+        return "date"
+    if isinstance(column.type, String):
+        return "category"
+    if isinstance(column.type, Integer):
+        return "int" if not column.nullable or column.primary_key else "float"
+    if isinstance(column.type, Float):
+        return "float"
+    raise TypeError(f"不支持的列类型: {column.key} {column.type}")
+
+
+COLUMNS: Dict[str, str] = {column.key: _column_kind(column) for column in WealthProductDB.__table__.columns}
+
+
+class ProductTable:
+    """产品表的列式快照"""
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        categories: Dict[str, List[Any]],
+        version: Optional[int] = None,
+    ) -> None:
+        self.columns = columns
+        # 文本列的取值（代码即下标）；过滤、排序后的子表共享同一份取值
+        self.categories = categories
+        # 加载时的变更日志水位（没有变更日志时为 None）
+        self.version = version
+
+    # 加载与刷新
+
+    @classmethod
+    def load(cls, db: Session) -> "ProductTable":
+        """整表读取（单条按列 SELECT）；水位在读取前取得，期间的写入在下次刷新时重新检查"""
+        version = current_watermark(db) if has_change_log(db) else None
+        table = cls.empty(version)
+        table._append_rows(cls._fetch(db))
+        return table
+
+    @classmethod
+    def empty(cls, version: Optional[int] = None) -> "ProductTable":
+        """空表（列类型齐全）"""
+        columns = {name: np.empty(0, dtype=_dtype(kind)) for name, kind in COLUMNS.items()}
+        categories: Dict[str, List[Any]] = {name: [] for name, kind in COLUMNS.items() if kind == "category"}
+        return cls(columns, categories, version)
+
+    @staticmethod
+    def _fetch(db: Session, after_id: Optional[int] = None) -> List[Tuple[Any, ...]]:
+        stmt = select(*WealthProductDB.__table__.columns).order_by(_PK)
+        if after_id is not None:
+            stmt = stmt.where(_PK > after_id)
+        return db.execute(stmt).all()
+
+    def _append_rows(self, rows: Sequence[Tuple[Any, ...]]) -> None:
+        """把按表定义列顺序的行追加到列数组（文本列沿用已有代码，新取值追加到末尾）"""
+        if not rows:
+            return
+        for name, values in zip(COLUMNS, zip(*rows)):
+            kind = COLUMNS[name]
+            if kind == "category":
+                labels = self.categories[name]
+                index = {label: code for code, label in enumerate(labels)}
+                codes = np.empty(len(values), dtype=np.int32)
+                for i, value in enumerate(values):
+                    if value is None:
+                        codes[i] = -1
+                        continue
+                    code = index.get(value)
+                    if code is None:
+                        code = index[value] = len(labels)
+                        labels.append(value)
+                    codes[i] = code
+                array = codes
+            else:
+                array = np.array(values, dtype=_dtype(kind))
+            self.columns[name] = np.concatenate([self.columns[name], array]) if len(self.columns[name]) else array
+
+    def refresh(self, db: Session) -> bool:
+        """按变更日志刷新，返回是否发生变化
+
+        水位之后产品表只有新增行（且主键都大于已加载的最大主键）时只追加新增行；存在修改（含文本列）或删除时
+        整表重新加载。数据库没有变更日志、或水位之后的日志已被清理时无法判断哪些行变化，同样整表重新加载。
+        """
+        if self.version is None or not has_change_log(db):
+            self._reload(db)
+            return True
+        watermark = current_watermark(db)
+        if watermark == self.version:
+            return False
+        oldest = db.execute(select(func.min(ChangeLogDB.seq))).scalar()
+        changes, first_id, others = db.execute(
+            select(func.count(), func.min(ChangeLogDB.row_id), func.sum(case((ChangeLogDB.operation != "insert", 1), else_=0)))
+            .where(ChangeLogDB.table_name == TABLE_NAME, ChangeLogDB.seq > self.version)
+        ).one()
+        loaded_max = int(self.columns["product_id"].max()) if len(self) else None
+        if oldest is not None and oldest > self.version + 1:
+            # 水位之后的日志已被清理
+            self._reload(db)
+            return True
+        self.version = watermark
+        if not changes:
+            # 只有其他表发生了变化
+            return False
+        if not others and (loaded_max is None or first_id > loaded_max):
+            self._append_rows(self._fetch(db, loaded_max))
+        else:
+            self._reload(db)
+        return True
+
+    def _reload(self, db: Session) -> None:
+        fresh = self.load(db)
+        self.columns, self.categories, self.version = fresh.columns, fresh.categories, fresh.version
+
+    # 访问
+
+    def __len__(self) -> int:
+        return len(self.columns["product_id"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def nbytes(self) -> int:
+        """列数组占用的字节数（不含文本取值本身）"""
+        return sum(array.nbytes for array in self.columns.values())
+
+    def labels(self, name: str) -> np.ndarray:
+        """文本列解码为对象数组（空值为 None）"""
+        categories = np.array(self.categories[name] + [None], dtype=object)
+        return categories[self.columns[name]]
+
+    def codes_for(self, name: str, values: Iterable[Any]) -> np.ndarray:
+        """文本取值对应的代码（不存在的取值被忽略）"""
+        index = {label: code for code, label in enumerate(self.categories[name])}
+        return np.array([index[value] for value in values if value in index], dtype=np.int32)
+
+    def isin(self, name: str, values: Iterable[Any]) -> np.ndarray:
+        """文本列取值是否属于给定集合（按代码比较）"""
+        return np.isin(self.columns[name], self.codes_for(name, values))
+
+    def positions(self, product_ids: Any) -> np.ndarray:
+        """产品ID在表中的行位置（表按主键有序）；不存在的ID返回 -1"""
+        ids = self.columns["product_id"]
+        product_ids = np.asarray(product_ids, dtype=np.int64)
+        pos = np.searchsorted(ids, product_ids)
+        found = pos < len(ids)
+        found[found] = ids[pos[found]] == product_ids[found]
+        return np.where(found, pos, -1)
+
+    # 整列运算
+
+    def take(self, indices: np.ndarray) -> "ProductTable":
+        """按行位置取子表（共享文本取值）"""
+        return ProductTable({name: array[indices] for name, array in self.columns.items()}, self.categories, self.version)
+
+    def filter(self, mask: np.ndarray) -> "ProductTable":
+        """按布尔掩码过滤"""
+        return self.take(np.flatnonzero(mask))
+
+    def sort(self, by: Union[str, Sequence[str]], descending: bool = False) -> "ProductTable":
+        """按一列或多列稳定排序（文本列按取值排序，空值与 NaN/NaT 排在最后，降序时亦然；相同值保持原有顺序）"""
+        keys = [by] if isinstance(by, str) else list(by)
+        sort_keys = []
+        for name in reversed(keys):
+            values = self.columns[name]
+            if COLUMNS[name] == "category":
+                # 取值的排序名次作为排序键
+                rank = np.argsort(np.argsort(np.array(self.categories[name], dtype=object), kind="stable"), kind="stable")
+                missing = values < 0
+                key = np.where(missing, 0, rank[np.maximum(values, 0)] if len(rank) else 0)
+            elif values.dtype.kind == "M":
+                missing = np.isnat(values)
+                key = np.where(missing, 0, values.view("int64"))
+            elif values.dtype.kind == "f":
+                missing = np.isnan(values)
+                key = np.where(missing, 0.0, values)
+            else:
+                missing = np.zeros(len(values), dtype=bool)
+                key = values.astype("int64")
+            # 降序取相反数而不是反转结果，空值键单独排在该列的最后
+            sort_keys.append(-key if descending else key)
+            sort_keys.append(missing)
+        order = np.lexsort(sort_keys) if sort_keys else np.arange(len(self))
+        return self.take(order)
+
+    def group_sum(self, by: str, value: str) -> pd.DataFrame:
+        """按文本列分组汇总数值列（NaN 记为 0），返回 [by, count, value]"""
+        codes = self.columns[by]
+        k = len(self.categories[by]) + 1
+        slots = np.where(codes < 0, k - 1, codes)
+        amounts = np.nan_to_num(self.columns[value].astype("float64"), nan=0.0)
+        totals = np.bincount(slots, weights=amounts, minlength=k)
+        counts = np.bincount(slots, minlength=k)
+        present = np.flatnonzero(counts)
+        labels = np.array(self.categories[by] + [None], dtype=object)
+        return pd.DataFrame({by: labels[present], "count": counts[present], value: totals[present]})
+
+    def days_remaining(self, query_date: Union[str, date], calendar: Optional[BusinessCalendar] = None) -> np.ndarray:
+        """按查询日计算剩余天数（calendar 提供时为工作日），不小于 0"""
+        qd = np.datetime64(query_date, "D")
+        end = self.columns["product_end_date"]
+        if calendar is not None:
+            return calendar.business_days_remaining(end, qd)
+        return np.maximum((end - qd).astype("int64"), 0)
+
+    def query_dynamic(self, query_date: Union[str, date], business_days: bool = False) -> "ProductTable":
+        """与 crud.query_dynamic 相同的语义：有到期日的产品，剩余天数按查询日动态计算"""
+        table = self.filter(~np.isnat(self.columns["product_end_date"]))
+        calendar = get_calendar() if business_days else None
+        table.columns["product_days_remaining"] = table.days_remaining(query_date, calendar)
+        return table
+
+    def to_frame(self) -> pd.DataFrame:
+        """转换为 DataFrame：数值列不复制，文本列为 Categorical，无空值的可空整数列转回 int64"""
+        data: Dict[str, Any] = {}
+        for name, array in self.columns.items():
+            kind = COLUMNS[name]
+            if kind == "category":
+                data[name] = pd.Categorical.from_codes(array, categories=pd.Index(self.categories[name], dtype=object))
+            elif kind == "float" and array.dtype.kind == "f" and _is_integer_column(name) and not np.isnan(array).any():
+                data[name] = array.astype("int64")
+            else:
+                data[name] = array
+        return pd.DataFrame(data, copy=False)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """按行转换为字典（日期为 date，整数为 int，空值为 None），字段与 read_rows 的行一致"""
+        values = []
+        for name, array in self.columns.items():
+            if COLUMNS[name] == "category":
+                values.append(self.labels(name))
+                continue
+            missing = np.isnat(array) if array.dtype.kind == "M" else np.isnan(array) if array.dtype.kind == "f" else None
+            if array.dtype.kind == "f" and _is_integer_column(name):
+                array = np.where(missing, 0, array).astype("int64")
+            # datetime64[D] 与 int64 转为对象数组时即为 date 与 int
+            column = array.astype(object)
+            if missing is not None:
+                column[missing] = None
+            values.append(column)
+        return [dict(zip(self.columns, row)) for row in zip(*values)]
+
+
+def _dtype(kind: str) -> str:
+    return {"int": "int64", "float": "float64", "date": "datetime64[D]", "category": "int32"}[kind]
+
+
+def _is_integer_column(name: str) -> bool:
+    return isinstance(WealthProductDB.__table__.columns[name].type, Integer)
+
+
+# 常驻进程（守护进程、HTTP 接口）内按数据库复用的快照
+_tables: Dict[str, ProductTable] = {}
+_tables_lock = threading.Lock()
+_resident = False
+
+
+def product_table(db: Session) -> ProductTable:
+    """获取当前数据库的产品快照（首次整表加载，之后每次调用按变更日志增量刷新）
+
+    返回的是共享列数组的浅拷贝：之后的刷新替换缓存中的列，不影响调用方正在使用的快照。
+    """
+    key = str(db.get_bind().url)
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            table = _tables[key] = ProductTable.load(db)
+        else:
+            table.refresh(db)
+        return ProductTable(dict(table.columns), table.categories, table.version)
+
+
+def use_resident_tables(enabled: bool = True) -> None:
+    """常驻进程启动时调用：之后 resident_product_table 返回进程内复用的快照"""
+    global _resident
+    _resident = enabled
+
+
+def resident_product_table(db: Session) -> Optional[ProductTable]:
+    """常驻进程内返回复用的产品快照；普通命令行进程返回 None，调用方使用各自的单次读取路径"""
+    return product_table(db) if _resident else None
@@ -0,0 +1,146 @@
+"""
+现金流与到期投影：把资产到期本息与产品兑付按日/周/月分桶
+"""
+from datetime import date
+from typing import Dict, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import TransactionDB, WealthProductDB
+from .portfolio import to_day
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+# 利息按 ACT/365 单利、到期一次性支付；收益率按百分数存储
+DAY_COUNT_BASIS = 365.0
+
+
+def bucket_edges(start: np.datetime64, end: np.datetime64, freq: str) -> np.ndarray:
+    """生成 [start, end) 区间内各桶的起始日（datetime64[D]）
+
+    daily 为逐日，weekly 为自 start 起每 7 天，monthly 为 start 及其后各月 1 日。
+    """
+    if freq == "daily":
+        return np.arange(start, end, dtype="datetime64[D]")
+    if freq == "weekly":
+        return np.arange(start, end, np.timedelta64(7, "D"), dtype="datetime64[D]")
+    if freq == "monthly":
+        one_month = np.timedelta64(1, "M")
+        months = np.arange(start.astype("datetime64[M]") + one_month, end.astype("datetime64[M]") + one_month, dtype="datetime64[M]")
+        edges = np.concatenate([[start], months.astype("datetime64[D]")])
+        return edges[edges < end]
+    raise ValueError(f"不支持的分桶频率: {freq}（可选: {', '.join(FREQUENCIES)}）")
+
+
+def bin_amounts(dates: np.ndarray, amounts: np.ndarray, edges: np.ndarray, end: np.datetime64) -> np.ndarray:
+    """将 (日期, 金额) 按桶起始日 edges 汇总；区间外的现金流被忽略"""
+    inside = (dates >= edges[0]) & (dates < end)
+    idx = np.searchsorted(edges, dates[inside], side="right") - 1
+    return np.bincount(idx, weights=amounts[inside], minlength=len(edges))
+
+
+def daily_amounts(dates: np.ndarray, amounts: np.ndarray, start: np.datetime64, horizon_days: int) -> np.ndarray:
+    """逐日汇总：以距 start 的天数直接作为 bincount 下标"""
+    offsets = (dates - start).astype("int64")
+    inside = (offsets >= 0) & (offsets < horizon_days)
+    return np.bincount(offsets[inside], weights=amounts[inside], minlength=horizon_days)
+
+
+def compute_cash_flow_ladder(
+    transactions: pd.DataFrame,
+    products: pd.DataFrame,
+    start_date: Union[str, date],
+    horizon_days: int,
+    frequencies: Sequence[str] = FREQUENCIES,
+) -> Dict[str, pd.DataFrame]:
+    """计算现金流阶梯
+
+    Args:
+        transactions: 含 investment_date/maturity_date/interest_rate/settlement_amount 列
+        products: 含 product_end_date/product_raise_amount 列
+        start_date: 投影起始日（含）
+        horizon_days: 投影天数（不含 start_date + horizon_days 当日）
+        frequencies: 需要输出的分桶频率
+
+    Returns:
+        Dict[str, pd.DataFrame]: 每个频率一张阶梯表，列为
+        bucket_start/bucket_end/principal/interest/asset_inflow/product_redemption/net_flow/cumulative_net_flow
+    """
+    if horizon_days <= 0:
+        raise ValueError("投影天数必须为正数")
+    start = to_day(start_date)
+    end = start + np.timedelta64(horizon_days, "D")
+
+    maturity = transactions["maturity_date"].to_numpy("datetime64[D]")
+    investment = transactions["investment_date"].to_numpy("datetime64[D]")
+    principal = np.nan_to_num(transactions["settlement_amount"].to_numpy(dtype="float64", na_value=np.nan))
+    rate = np.nan_to_num(transactions["interest_rate"].to_numpy(dtype="float64", na_value=np.nan))
+    has_maturity = ~np.isnat(maturity)
+    maturity, investment, principal, rate = maturity[has_maturity], investment[has_maturity], principal[has_maturity], rate[has_maturity]
+    term = np.maximum((maturity - investment).astype("int64"), 0)
+    interest = principal * rate / 100.0 * term / DAY_COUNT_BASIS
+
+    redemption_date = products["product_end_date"].to_numpy("datetime64[D]")
+    redemption = np.nan_to_num(products["product_raise_amount"].to_numpy(dtype="float64", na_value=np.nan))
+    has_end = ~np.isnat(redemption_date)
+    redemption_date, redemption = redemption_date[has_end], redemption[has_end]
+
+    ladders = {}
+    for freq in frequencies:
+        edges = bucket_edges(start, end, freq)
+        if freq == "daily":
+            columns = [daily_amounts(d, a, start, horizon_days) for d, a in (
+                (maturity, principal), (maturity, interest), (redemption_date, redemption))]
+        else:
+            columns = [bin_amounts(d, a, edges, end) for d, a in (
+                (maturity, principal), (maturity, interest), (redemption_date, redemption))]
+        principal_col, interest_col, redemption_col = columns
+        inflow = principal_col + interest_col
+        net = inflow - redemption_col
+        bucket_end = np.append(edges[1:], end) - np.timedelta64(1, "D")
+        ladders[freq] = pd.DataFrame({
+            "bucket_start": edges.astype("datetime64[ns]"),
+            "bucket_end": bucket_end.astype("datetime64[ns]"),
+            "principal": principal_col,
+            "interest": interest_col,
+            "asset_inflow": inflow,
+            "product_redemption": redemption_col,
+            "net_flow": net,
+            "cumulative_net_flow": np.cumsum(net),
+        })
+    return ladders
+
+
+def project_cash_flows(
+    db: Session,
+    start_date: Union[str, date],
+    horizon_days: int,
+    frequencies: Sequence[str] = FREQUENCIES,
+) -> Dict[str, pd.DataFrame]:
+    """从数据库加载区间内到期的交易与兑付的产品，计算现金流阶梯"""
+    start = to_day(start_date)
+    first = start.astype(object)
+    last = (start + np.timedelta64(horizon_days, "D")).astype(object)
+    connection = db.connection()
+    transactions = pd.read_sql(
+        select(
+            TransactionDB.investment_date,
+            TransactionDB.maturity_date,
+            TransactionDB.interest_rate,
+            TransactionDB.settlement_amount,
+        ).where(TransactionDB.maturity_date >= first, TransactionDB.maturity_date < last),
+        connection,
+        parse_dates=["investment_date", "maturity_date"],
+    )
+    products = pd.read_sql(
+        select(
+            WealthProductDB.product_end_date,
+            WealthProductDB.product_raise_amount,
+        ).where(WealthProductDB.product_end_date >= first, WealthProductDB.product_end_date < last),
+        connection,
+        parse_dates=["product_end_date"],
+    )
+    return compute_cash_flow_ladder(transactions, products, start, horizon_days, frequencies)
@@ -0,0 +1,34 @@
+"""
+分析结果输出：将多个 DataFrame 写入 CSV/XLSX
+"""
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+
+def write_report(frames: Dict[str, pd.DataFrame], output_path: str) -> List[Path]:
+    """写出分析结果
+
+    XLSX：每个结果一个工作表；CSV：第一个结果写入指定文件，
+    其余结果写入同目录下的 ``<文件名>_<结果名>.csv``。
+
+    Returns:
+        List[Path]: 实际写出的文件列表
+    """
+    path = Path(output_path)
+    suffix = path.suffix.lower()
+    if suffix == ".xlsx":
+        with pd.ExcelWriter(path, engine="openpyxl") as writer:
+            for name, frame in frames.items():
+                frame.to_excel(writer, sheet_name=name[:31], index=False)
+        return [path]
+    if suffix != ".csv":
+        raise ValueError(f"不支持的文件格式: {suffix}")
+
+    written = []
+    for i, (name, frame) in enumerate(frames.items()):
+        target = path if i == 0 else path.with_name(f"{path.stem}_{name}{path.suffix}")
+        frame.to_csv(target, index=False, encoding="utf-8")
+        written.append(target)
+    return written
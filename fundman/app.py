@@ -1,49 +1,449 @@
 import argparse
+import importlib
 import sys
 import os
-from typing import Optional, List
+from typing import Any, Optional, List
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-# 使用绝对导入而不是相对导入
-from fundman.database.connection import init_db, get_db
-from fundman.crud.wealth_product_crud import query_dynamic
-from fundman.data_processor import import_data_file, export_data_file
+# 子命令依赖按需导入（PEP 562）：SQLAlchemy 仅在访问数据库时加载，
+# pandas/openpyxl/xlrd 仅在导入导出时加载，以缩短 CLI 启动时间
+_LAZY_IMPORTS = {
+    "init_db": "fundman.database.connection",
+    "get_db": "fundman.database.connection",
+    "query_dynamic": "fundman.crud.wealth_product_crud",
+    "import_data_file": "fundman.data_processor",
+    "export_data_file": "fundman.data_processor",
+    "export_transactions_file": "fundman.data_processor",
+    "diff_data_file": "fundman.data_processor",
+    "import_assets_file": "fundman.data_processor",
+    "import_transactions_file": "fundman.data_processor",
+}
+
+
+# 不转发给守护进程的命令
+LOCAL_ONLY_COMMANDS = {"serve", "api"}
+# 耗时长或大量写入的命令在本进程内执行：守护进程串行执行命令，转发它们会阻塞其他客户端
+IN_PROCESS_COMMANDS = {"init", "import", "import-assets", "import-transactions", "export", "export-transactions",
+                       "rollforward", "diff", "batch", "bench"}
+
+
+def __getattr__(name: str) -> Any:
+    """按需导入子命令依赖，并缓存为模块属性"""
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def _lazy(name: str) -> Any:
+    """获取按需导入的依赖（测试中被 patch 的属性优先）"""
+    value = globals().get(name)
+    return value if value is not None else __getattr__(name)
 
 
 def init_database() -> None:
     """初始化数据库"""
-    init_db()
+    _lazy("init_db")()
     print("数据库初始化完成")
 
 
-def import_data(file_path: str, query_date: str) -> None:
-    """导入数据"""
-    import_data_file(file_path, query_date)
+def import_data(file_path: str, query_date: str, max_memory: Optional[str] = None) -> None:
+    """导入数据（max_memory 如 256M，设置后分批导入并控制内存占用）"""
+    import_kwargs = {}
+    if max_memory:
+        from fundman.utils.memory import parse_size
+        import_kwargs["max_memory"] = parse_size(max_memory)
+    _lazy("import_data_file")(file_path, query_date, **import_kwargs)
     print(f"数据导入完成: {file_path}")
 
 
-def export_data(file_path: str, query_date: Optional[str] = None) -> None:
-    """导出数据"""
-    export_data_file(file_path, query_date)
+def import_assets(file_path: str, batch_size: Optional[int] = None) -> None:
+    """从文件批量导入资产（按资产编码插入或更新）"""
+    import_kwargs = {"batch_size": batch_size} if batch_size else {}
+    _lazy("import_assets_file")(file_path, **import_kwargs)
+
+
+def import_transactions(file_path: str, rejects: Optional[str] = None, batch_size: Optional[int] = None) -> None:
+    """从成交流水文件批量导入交易（按银登编码与资产编码解析，无法解析的行写入拒收文件）"""
+    import_kwargs: dict = {}
+    if rejects:
+        import_kwargs["reject_path"] = rejects
+    if batch_size:
+        import_kwargs["batch_size"] = batch_size
+    _lazy("import_transactions_file")(file_path, **import_kwargs)
+
+
+def export_data(
+    file_path: str,
+    query_date: Optional[str] = None,
+    trusted: bool = False,
+    since: Optional[int] = None,
+    table: str = "wealth_products",
+) -> None:
+    """导出数据（trusted 为真时跳过逐行校验，直接按列读取；since 给定时只导出该水位之后的变更并打印新水位）"""
+    read_kwargs = {"mode": "dataframe"} if trusted else {}
+    if since is not None:
+        # 确保变更日志与触发器已安装
+        _lazy("init_db")()
+        read_kwargs.update(since=since, table=table)
+    watermark = _lazy("export_data_file")(file_path, query_date, **read_kwargs)
     print(f"数据导出完成: {file_path}")
+    if since is not None:
+        print(f"新水位: {watermark}")
+
+
+def export_transactions(
+    file_path: str,
+    product_codes: Optional[List[str]] = None,
+    asset_codes: Optional[List[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    query_date: Optional[str] = None,
+) -> None:
+    """流式导出交易明细（交易 ⋈ 产品 ⋈ 资产）到 CSV/XLSX/JSONL"""
+    export_kwargs = {
+        key: value for key, value in (
+            ("product_codes", product_codes), ("asset_codes", asset_codes), ("date_from", date_from),
+            ("date_to", date_to), ("query_date", query_date),
+        ) if value
+    }
+    _lazy("export_transactions_file")(file_path, **export_kwargs)
+
+
+def rollforward_data(query_date: str, product_codes: Optional[List[str]] = None) -> None:
+    """把产品滚动到新的查询日期（单条 UPDATE 在库内重算剩余天数），打印更新与已到期的数量"""
+    from fundman.crud import rollforward_products
+    from fundman.crud.filters import build_filters
+    from fundman.models import WealthProductDB
+
+    filters = {"product_yindeng_code": product_codes} if product_codes else {}
+    db_gen = _lazy("get_db")()
+    db = next(db_gen)
+    try:
+        updated = rollforward_products(db, query_date, filters)
+        matured = db.query(WealthProductDB).filter(
+            *build_filters(WealthProductDB, filters, allow_all=True),
+            WealthProductDB.product_days_remaining == 0,
+        ).count()
+    finally:
+        db.close()
+    print(f"已滚动到 {query_date}: 更新 {updated} 个产品，其中已到期 {matured} 个")
 
 
-def query_data(query_date: str) -> None:
-    """查询数据"""
-    init_db()
-    db_gen = get_db()
+def diff_data(file_path: str, query_date: str, output: Optional[str] = None) -> None:
+    """导入前对账：比较输入文件与数据库中的产品，打印新增/删除/变化汇总，output 给定时写出差异明细"""
+    summary = _lazy("diff_data_file")(file_path, query_date, output)
+    print(f"对账结果（{file_path}，共 {summary['file_rows']} 行）:")
+    print(f"  新增: {summary['added']}（其中无银登编码 {summary['without_code']}）")
+    print(f"  库中有、文件中无: {summary['removed']}")
+    print(f"  有变化: {summary['changed']}")
+    print(f"  无变化: {summary['unchanged']}")
+    if summary["duplicates"]:
+        print(f"  文件中重复的银登编码: {summary['duplicates']} 行（以最后一行为准）")
+    for field, count in summary["fields"].items():
+        print(f"    {field}: {count}")
+    if output:
+        print(f"差异明细已写入: {output}")
+
+
+def query_data(query_date: str, trusted: bool = False, business_days: bool = False) -> None:
+    """查询数据（trusted 为真时使用免校验的轻量行对象；business_days 为真时剩余天数按工作日计算）"""
+    _lazy("init_db")()
+    db_gen = _lazy("get_db")()
     db = next(db_gen)
     try:
-        results = query_dynamic(db, query_date)
+        from fundman.analytics.product_table import resident_product_table
+
+        # 常驻进程内免校验查询直接使用进程级产品快照
+        snapshot = resident_product_table(db) if trusted else None
+        if snapshot is not None:
+            from fundman.utils.date_utils import parse_date
+            frame = snapshot.query_dynamic(parse_date(query_date), business_days).to_frame()
+            results = list(frame.itertuples(index=False))
+        else:
+            read_kwargs = {"mode": "row"} if trusted else {}
+            if business_days:
+                read_kwargs["business_days"] = True
+            results = _lazy("query_dynamic")(db, query_date, **read_kwargs)
+        label = "剩余工作日" if business_days else "剩余天数"
         print(f"动态查询结果数量: {len(results)}")
         for result in results:
             # 如果是Pydantic模型实例，直接访问属性
             if hasattr(result, 'product_name'):
-                print(f"产品名称: {result.product_name}, 剩余天数: {result.product_days_remaining}")
+                print(f"产品名称: {result.product_name}, {label}: {result.product_days_remaining}")
             # 如果是SQLAlchemy模型实例，直接访问属性
             else:
-                print(f"产品名称: {result.product_name}, 剩余天数: {result.product_days_remaining}")
+                print(f"产品名称: {result.product_name}, {label}: {result.product_days_remaining}")
+    finally:
+        db.close()
+
+
+# query --top 的排序列
+TOP_COLUMNS = {"raise_amount": "product_raise_amount", "benchmark": "product_performance_benchmark"}
+
+
+def query_window_data(
+    query_date: str,
+    maturing_within: Optional[int] = None,
+    start_from: Optional[str] = None,
+    start_to: Optional[str] = None,
+    top: Optional[int] = None,
+    by: str = "raise_amount",
+) -> None:
+    """走索引的查询：到期窗口（查询日起 N 天内到期）、起息日范围或按募集金额/业绩基准取前 N 名"""
+    from datetime import date, timedelta
+    from fundman.crud import get_products_in_date_range, get_top_products
+    from fundman.utils.date_utils import parse_date
+
+    qd = date.fromisoformat(parse_date(query_date))
+    # 已有数据库补建索引
+    _lazy("init_db")()
+    db_gen = _lazy("get_db")()
+    db = next(db_gen)
+    try:
+        if top is not None:
+            results = get_top_products(db, TOP_COLUMNS[by], top, mode="row")
+            title = f"{by} 前 {top} 名"
+        elif maturing_within is not None:
+            results = get_products_in_date_range(db, "product_end_date", qd, qd + timedelta(days=maturing_within), mode="row")
+            title = f"{maturing_within} 天内到期"
+        else:
+            results = get_products_in_date_range(
+                db, "product_start_date",
+                date.fromisoformat(parse_date(start_from)) if start_from else None,
+                date.fromisoformat(parse_date(start_to)) if start_to else None,
+                mode="row",
+            )
+            title = f"起息日 {start_from or '-'} ~ {start_to or '-'}"
+        print(f"{title}: {len(results)} 个产品")
+        for result in results:
+            remaining = max(0, (result.product_end_date - qd).days)
+            print(f"产品名称: {result.product_name}, 到期日: {result.product_end_date}, 剩余天数: {remaining}, "
+                  f"募集金额: {result.product_raise_amount}, 业绩基准: {result.product_performance_benchmark}")
+    finally:
+        db.close()
+
+
+def analytics_data(
+    query_date: str,
+    product_codes: Optional[List[str]] = None,
+    output: Optional[str] = None,
+    business_days: bool = False,
+) -> None:
+    """组合分析：按产品输出加权收益率、加权剩余期限及与业绩基准的比较"""
+    from fundman.analytics import portfolio_analytics, resident_product_table, write_report
+
+    db_gen = _lazy("get_db")()
+    db = next(db_gen)
+    try:
+        # 常驻进程内产品列取自进程级快照，不再联接产品表
+        frames = portfolio_analytics(db, query_date, product_codes, business_days=business_days,
+                                     products=resident_product_table(db))
+    finally:
+        db.close()
+
+    summary = frames["summary"]
+    print(f"组合分析结果（查询日期 {query_date}）: {len(summary)} 个产品")
+    if len(summary):
+        print("-" * 100)
+        days_label = "加权剩余工作日" if business_days else "加权剩余天数"
+        print(f"{'银登编码':<15} {'产品名称':<15} {'笔数':>6} {'持仓金额':>16} {'加权收益率':>10} {days_label:>12} {'业绩基准':>10}")
+        print("-" * 100)
+        for row in summary.itertuples(index=False):
+            print(f"{str(row.product_yindeng_code)[:15]:<15} {str(row.product_name)[:15]:<15} {row.transaction_count:>6} "
+                  f"{row.settlement_total:>16,.2f} {row.weighted_yield:>10.4f} {row.weighted_remaining_days:>12.1f} {row.benchmark:>10.4f}")
+    if output:
+        written = write_report(frames, output)
+        print(f"分析结果已写入: {', '.join(str(p) for p in written)}")
+
+
+def projection_data(start_date: str, horizon: int, freq: str = "monthly", output: Optional[str] = None) -> None:
+    """现金流投影：资产到期本息与产品兑付的分桶阶梯"""
+    from fundman.analytics import project_cash_flows, write_report
+
+    db_gen = _lazy("get_db")()
+    db = next(db_gen)
+    try:
+        ladders = project_cash_flows(db, start_date, horizon)
+    finally:
+        db.close()
+
+    ladder = ladders[freq]
+    print(f"现金流投影（起始 {start_date}，{horizon} 天，按 {freq} 分桶）: {len(ladder)} 个区间")
+    print("-" * 100)
+    print(f"{'区间起始':<12} {'区间结束':<12} {'到期本金':>16} {'到期利息':>14} {'产品兑付':>16} {'净现金流':>16}")
+    print("-" * 100)
+    for row in ladder.itertuples(index=False):
+        print(f"{row.bucket_start:%Y-%m-%d}   {row.bucket_end:%Y-%m-%d}   {row.principal:>16,.2f} {row.interest:>14,.2f} "
+              f"{row.product_redemption:>16,.2f} {row.net_flow:>16,.2f}")
+    if output:
+        written = write_report(ladders, output)
+        print(f"现金流阶梯已写入: {', '.join(str(p) for p in written)}")
+
+
+def liquidity_data(query_date: str, include_all: bool = False, top: Optional[int] = None, output: Optional[str] = None) -> None:
+    """流动性错配例外报告：资产到期日晚于产品到期日的持仓，按错配金额排序"""
+    import pandas as pd
+    from fundman.analytics import liquidity_mismatch, write_report
+
+    db_gen = _lazy("get_db")()
+    db = next(db_gen)
+    try:
+        frames = liquidity_mismatch(db, query_date, include_all=include_all)
+    finally:
+        db.close()
+
+    report = frames["mismatch"]
+    print(f"流动性错配报告（查询日期 {query_date}）: {len(report)} 个产品")
+    if len(report):
+        print("-" * 110)
+        print(f"{'排名':<5} {'银登编码':<15} {'产品名称':<15} {'产品剩余天数':>12} {'持仓金额':>16} {'错配金额':>16} {'错配占比':>8} {'最大缺口天数':>12}")
+        print("-" * 110)
+        shown = report.head(top) if top else report
+        for row in shown.itertuples(index=False):
+            max_gap = "" if pd.isna(row.max_gap_days) else row.max_gap_days
+            print(f"{row.rank:<5} {str(row.product_yindeng_code)[:15]:<15} {str(row.product_name)[:15]:<15} {row.product_days_remaining:>12} "
+                  f"{row.settlement_total:>16,.2f} {row.mismatch_amount:>16,.2f} {row.mismatch_share:>8.2%} {str(max_gap):>12}")
+    if output:
+        written = write_report(frames, output)
+        print(f"错配报告已写入: {', '.join(str(p) for p in written)}")
+
+
+def exposure_data(
+    start_date: str,
+    end_date: str,
+    by: str = "asset",
+    product_codes: Optional[List[str]] = None,
+    top: Optional[int] = None,
+    output: Optional[str] = None,
+) -> None:
+    """逐日敞口时间序列：打印各分组的期初/期末/峰值敞口，output 给定时写出逐日序列与汇总"""
+    from datetime import date
+    from fundman.analytics import exposure_series, write_report
+    from fundman.utils.date_utils import parse_date
+
+    db_gen = _lazy("get_db")()
+    db = next(db_gen)
+    try:
+        # 只打印汇总时不展开逐日宽表
+        frames = exposure_series(db, start_date, end_date, by, product_codes, wide=output is not None)
+    finally:
+        db.close()
+
+    summary = frames["summary"]
+    days = (date.fromisoformat(parse_date(end_date)) - date.fromisoformat(parse_date(start_date))).days + 1
+    print(f"敞口时间序列（{start_date} ~ {end_date}，按 {by}）: {days} 天，{len(summary)} 个分组")
+    if len(summary):
+        print("-" * 100)
+        print(f"{'分组':<20} {'期初敞口':>16} {'期末敞口':>16} {'峰值敞口':>16} {'峰值日期':>12}")
+        print("-" * 100)
+        shown = summary.head(top) if top else summary
+        for row in shown.itertuples(index=False):
+            print(f"{str(row[0])[:20]:<20} {row.start_exposure:>16,.2f} {row.end_exposure:>16,.2f} "
+                  f"{row.peak_exposure:>16,.2f} {row.peak_date:%Y-%m-%d}")
+    if output:
+        if "changes" in frames:
+            print("逐日宽表超过单元格上限，改为写出敞口变化点（date, 分组, exposure）")
+        written = write_report(frames, output)
+        print(f"敞口序列已写入: {', '.join(str(p) for p in written)}")
+
+
+def concentration_data(
+    query_date: str,
+    dimensions: Optional[List[str]] = None,
+    limit: Optional[float] = None,
+    by_product: bool = True,
+    use_cache: bool = True,
+    breaches_only: bool = False,
+    output: Optional[str] = None,
+) -> None:
+    """集中度报告：按发行人/行业/地区/资产类型汇总敞口及占比，标记超限"""
+    from fundman.analytics import CONCENTRATION_DIMENSIONS, concentration_report, write_report
+
+    db_gen = _lazy("get_db")()
+    db = next(db_gen)
+    try:
+        frames = concentration_report(
+            db, query_date, dimensions or CONCENTRATION_DIMENSIONS,
+            limit=limit, by_product=by_product, use_cache=use_cache,
+        )
+    finally:
+        db.close()
+
+    if breaches_only:
+        frames = {name: frame[frame["breach"]].reset_index(drop=True) for name, frame in frames.items()}
+    for dimension, frame in frames.items():
+        print(f"集中度（{dimension}，查询日期 {query_date}）: {len(frame)} 行，超限 {int(frame['breach'].sum())} 行")
+        for row in frame.itertuples(index=False):
+            owner = f"{str(row.product_yindeng_code)[:15]:<15} " if by_product else ""
+            flag = " 超限" if row.breach else ""
+            print(f"  {owner}{str(getattr(row, dimension))[:20]:<20} {row.exposure:>16,.2f} {row.share:>8.2%}{flag}")
+    if output:
+        written = write_report(frames, output)
+        print(f"集中度报告已写入: {', '.join(str(p) for p in written)}")
+
+
+def bench_data(args: argparse.Namespace) -> None:
+    """运行基准测试套件，输出 JSON 结果"""
+    import json
+    from datetime import date
+    from fundman.bench.suite import run_suite
+
+    report = run_suite(
+        products=args.products, assets=args.assets, transactions=args.transactions, seed=args.seed,
+        repeat=args.repeat, query_date=date.fromisoformat(args.query_date), data_dir=args.data_dir,
+        file_format=args.format, only=args.only, memory=not args.no_memory,
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"基准测试结果已写出: {args.output}")
+    else:
+        print(text)
+
+
+def slowlog_data(log_path: Optional[str] = None, top: int = 10, show_plan: bool = True) -> None:
+    """慢查询汇总：按归一化语句分组，按总耗时列出前 top 组"""
+    from fundman.database.connection import SLOW_QUERY_LOG_PATH
+    from fundman.database.slowlog import read_entries, summarize
+
+    path = log_path or SLOW_QUERY_LOG_PATH
+    rows = summarize(read_entries(path), top)
+    if not rows:
+        print(f"没有慢查询记录: {path}（设置 FUNDMAN_SLOW_QUERY_MS 启用）")
+        return
+    print(f"{'次数':>6} {'总耗时ms':>12} {'平均ms':>10} {'最大ms':>10}  语句")
+    for row in rows:
+        print(f"{row['count']:>6} {row['total_ms']:>12.2f} {row['mean_ms']:>10.2f} {row['max_ms']:>10.2f}  {row['normalized']}")
+        if row["callers"]:
+            print(f"{'':>42}调用方: {', '.join(row['callers'])}")
+        if show_plan:
+            for line in row["plan"]:
+                print(f"{'':>42}计划: {line}")
+
+
+def changelog_data(prune_before: Optional[int] = None) -> None:
+    """变更日志概况：当前水位与按表、操作的计数；prune_before 给定时删除不超过该水位的日志"""
+    from fundman.database.changelog import change_summary, current_watermark, prune_change_log
+
+    _lazy("init_db")()
+    db_gen = _lazy("get_db")()
+    db = next(db_gen)
+    try:
+        if prune_before is not None:
+            print(f"已清理变更日志: {prune_change_log(db, prune_before)} 条（seq <= {prune_before}）")
+        print(f"当前水位: {current_watermark(db)}")
+        rows = change_summary(db)
+        if not rows:
+            print("变更日志为空")
+            return
+        print(f"{'表':<18} {'操作':<8} {'条数':>8} {'最小seq':>10} {'最大seq':>10}")
+        for row in rows:
+            print(f"{row['table_name']:<18} {row['operation']:<8} {row['count']:>8} {row['min_seq']:>10} {row['max_seq']:>10}")
     finally:
         db.close()
 
@@ -51,6 +451,9 @@ def query_data(query_date: str) -> None:
 def build_parser() -> argparse.ArgumentParser:
     """构建 argparse 解析器（可用于测试）"""
     parser = argparse.ArgumentParser(description="FundMan 理财产品管理系统")
+    parser.add_argument("--no-daemon", action="store_true", help="不使用守护进程，始终在本进程内执行")
+    parser.add_argument("--profile", action="store_true", help="剖析命令：在标准错误输出分阶段耗时与 SQL 统计")
+    parser.add_argument("--profile-trace", metavar="FILE", help="剖析命令并写出 Chrome trace JSON（chrome://tracing / Perfetto）")
     subparsers = parser.add_subparsers(dest="command", help="可用命令")
     
     # 投资组合管理子命令
@@ -67,7 +470,8 @@ def build_parser() -> argparse.ArgumentParser:
     create_asset_parser.add_argument("--region", help="资产所属地区")
     
     # 列出资产子命令
-    investment_subparsers.add_parser("list-assets", help="列出所有资产")
+    list_assets_parser = investment_subparsers.add_parser("list-assets", help="列出所有资产")
+    list_assets_parser.add_argument("--trusted", action="store_true", help="跳过逐行校验的快速读取")
     
     # 创建交易子命令
     create_transaction_parser = investment_subparsers.add_parser("create-transaction", help="创建交易")
@@ -81,7 +485,8 @@ def build_parser() -> argparse.ArgumentParser:
     create_transaction_parser.add_argument("--unit-full-price", help="单位全价")
     
     # 列出交易子命令
-    investment_subparsers.add_parser("list-transactions", help="列出所有交易")
+    list_transactions_parser = investment_subparsers.add_parser("list-transactions", help="列出所有交易")
+    list_transactions_parser.add_argument("--trusted", action="store_true", help="跳过逐行校验的快速读取")
     
     # 初始化数据库命令
     subparsers.add_parser("init", help="初始化数据库")
@@ -90,15 +495,142 @@ def build_parser() -> argparse.ArgumentParser:
     import_parser = subparsers.add_parser("import", help="导入数据")
     import_parser.add_argument("file", help="要导入的文件路径")
     import_parser.add_argument("--query-date", required=True, help="查询日期")
+    import_parser.add_argument("--max-memory", help="内存预算（如 256M、1G）：分批读取与提交，批大小随内存占用自适应")
     
+    # 导入资产命令
+    import_assets_parser = subparsers.add_parser("import-assets", help="从文件批量导入资产（按资产编码插入或更新）")
+    import_assets_parser.add_argument("file", help="要导入的文件路径（CSV/XLS/XLSX）")
+    import_assets_parser.add_argument("--batch-size", type=int, help="每批（每个事务）的行数（默认 1000）")
+
+    # 导入交易命令
+    import_transactions_parser = subparsers.add_parser("import-transactions", help="从成交流水文件批量导入交易")
+    import_transactions_parser.add_argument("file", help="要导入的文件路径（CSV/XLS/XLSX）")
+    import_transactions_parser.add_argument("--rejects", help="拒收文件路径（默认为 <文件名>_rejects.csv）")
+    import_transactions_parser.add_argument("--batch-size", type=int, help="每批（每个事务）的行数（默认 50000）")
+
     # 导出数据命令
     export_parser = subparsers.add_parser("export", help="导出数据")
     export_parser.add_argument("file", help="导出文件路径")
     export_parser.add_argument("--query-date", help="查询日期")
+    export_parser.add_argument("--trusted", action="store_true", help="跳过逐行校验的快速读取")
+    export_parser.add_argument("--since", type=int, help="变更日志水位：只导出该水位之后被修改过的行（含删除），并打印新水位")
+    export_parser.add_argument("--table", default="wealth_products", choices=["wealth_products", "assets", "transactions"],
+                               help="增量导出的表（默认 wealth_products，需配合 --since）")
     
+    # 导出交易明细命令
+    export_transactions_parser = subparsers.add_parser("export-transactions", help="流式导出交易明细（附产品与资产信息）")
+    export_transactions_parser.add_argument("file", help="导出文件路径（CSV/XLSX/JSONL）")
+    export_transactions_parser.add_argument("--product-code", action="append", help="限定产品银登编码（可重复）")
+    export_transactions_parser.add_argument("--asset-code", action="append", help="限定资产编码（可重复）")
+    export_transactions_parser.add_argument("--date-from", help="投资日期不早于该日期")
+    export_transactions_parser.add_argument("--date-to", help="投资日期不晚于该日期")
+    export_transactions_parser.add_argument("--query-date", help="限定产品查询日期")
+
+    # 滚动查询日期命令
+    rollforward_parser = subparsers.add_parser("rollforward", help="把产品滚动到新的查询日期（库内重算剩余天数，无需重新导入）")
+    rollforward_parser.add_argument("--query-date", required=True, help="新的查询日期")
+    rollforward_parser.add_argument("--product-code", action="append", help="限定产品银登编码（可重复）")
+
+    # 对账命令
+    diff_parser = subparsers.add_parser("diff", help="导入前对账：比较输入文件与数据库（新增/删除/字段变化）")
+    diff_parser.add_argument("file", help="要对账的文件路径")
+    diff_parser.add_argument("--query-date", required=True, help="查询日期")
+    diff_parser.add_argument("--output", help="差异明细输出文件（CSV/XLSX）")
+
     # 查询数据命令
     query_parser = subparsers.add_parser("query", help="查询数据")
     query_parser.add_argument("--query-date", required=True, help="查询日期")
+    query_parser.add_argument("--trusted", action="store_true", help="跳过逐行校验的快速读取")
+    query_parser.add_argument("--business-days", action="store_true", help="剩余天数按银行间市场工作日计算")
+    window_group = query_parser.add_mutually_exclusive_group()
+    window_group.add_argument("--maturing-within", type=int, metavar="DAYS", help="只列出查询日起 DAYS 天内到期的产品（按到期日）")
+    window_group.add_argument("--start-from", help="只列出起息日不早于该日期的产品（可配合 --start-to）")
+    window_group.add_argument("--top", type=int, metavar="N", help="按 --by 列取前 N 个产品")
+    query_parser.add_argument("--start-to", help="只列出起息日不晚于该日期的产品")
+    query_parser.add_argument("--by", choices=sorted(TOP_COLUMNS), default="raise_amount", help="--top 的排序列（默认 raise_amount）")
+
+    # 组合分析命令
+    analytics_parser = subparsers.add_parser("analytics", help="组合分析（加权收益率/剩余期限/持仓分布）")
+    analytics_parser.add_argument("--query-date", required=True, help="查询日期")
+    analytics_parser.add_argument("--product-code", action="append", help="限定产品银登编码（可重复）")
+    analytics_parser.add_argument("--output", help="结果输出文件（.csv/.xlsx）")
+    analytics_parser.add_argument("--business-days", action="store_true", help="加权剩余期限按银行间市场工作日计算")
+
+    # 现金流投影命令
+    projection_parser = subparsers.add_parser("projection", help="现金流与到期投影（日/周/月分桶）")
+    projection_parser.add_argument("--start-date", required=True, help="投影起始日期")
+    projection_parser.add_argument("--horizon", type=int, default=365, help="投影天数（默认 365）")
+    projection_parser.add_argument("--freq", choices=["daily", "weekly", "monthly"], default="monthly", help="打印的分桶频率")
+    projection_parser.add_argument("--output", help="阶梯输出文件（.csv/.xlsx，包含全部频率）")
+
+    # 流动性错配命令
+    liquidity_parser = subparsers.add_parser("liquidity", help="流动性错配例外报告（资产到期晚于产品到期）")
+    liquidity_parser.add_argument("--query-date", required=True, help="查询日期")
+    liquidity_parser.add_argument("--all", action="store_true", help="包含无错配的产品")
+    liquidity_parser.add_argument("--top", type=int, help="仅打印前 N 名")
+    liquidity_parser.add_argument("--output", help="报告输出文件（.csv/.xlsx）")
+
+    # 集中度命令
+    exposure_parser = subparsers.add_parser("exposure", help="逐日敞口时间序列（按资产/产品/发行人等）")
+    exposure_parser.add_argument("--start-date", required=True, help="起始日期（含）")
+    exposure_parser.add_argument("--end-date", required=True, help="结束日期（含）")
+    exposure_parser.add_argument("--by", choices=["asset", "product", "issuer", "industry", "region", "asset_type"],
+                                 default="asset", help="分组方式（默认 asset）")
+    exposure_parser.add_argument("--product-code", action="append", help="限定产品银登编码（可重复）")
+    exposure_parser.add_argument("--top", type=int, help="仅打印峰值最高的前 N 个分组")
+    exposure_parser.add_argument("--output", help="输出文件（.csv/.xlsx，含逐日序列与汇总）")
+
+    concentration_parser = subparsers.add_parser("concentration", help="集中度报告（发行人/行业/地区/资产类型）")
+    concentration_parser.add_argument("--query-date", required=True, help="查询日期")
+    concentration_parser.add_argument("--dimension", action="append",
+                                      choices=["issuer", "industry", "region", "asset_type"], help="统计维度（可重复，默认全部）")
+    concentration_parser.add_argument("--limit", type=float, help="占比阈值（如 0.1 表示 10%%）")
+    concentration_parser.add_argument("--book", action="store_true", help="按全账簿而非按产品计算占比")
+    concentration_parser.add_argument("--no-cache", action="store_true", help="忽略缓存重新计算")
+    concentration_parser.add_argument("--breaches-only", action="store_true", help="仅输出超限行")
+    concentration_parser.add_argument("--output", help="报告输出文件（.csv/.xlsx）")
+
+    # 批处理命令
+    batch_parser = subparsers.add_parser("batch", help="在一个进程与事务中批量执行命令（每行一条，或 JSON 行）")
+    batch_parser.add_argument("file", help="命令文件路径（- 表示标准输入）")
+    batch_parser.add_argument("--commit-every", type=int, default=0, help="每 N 条命令提交一次（默认全部执行完后提交）")
+    batch_parser.add_argument("--stop-on-error", action="store_true", help="遇到失败立即停止并回滚未提交的命令")
+
+    # 守护进程命令
+    serve_parser = subparsers.add_parser("serve", help="启动常驻守护进程（Unix 域套接字），其他命令自动转发")
+    serve_parser.add_argument("--socket", help="套接字路径（默认 data/fundman.sock 或环境变量 FUNDMAN_SOCKET）")
+    serve_parser.add_argument("--stop", action="store_true", help="停止正在运行的守护进程")
+
+    # 基准测试命令
+    bench_parser = subparsers.add_parser("bench", help="基准测试（生成合成数据并测量导入/导出/查询/分析性能）")
+    bench_parser.add_argument("--products", type=int, default=1000, help="产品数量（默认 1000）")
+    bench_parser.add_argument("--assets", type=int, default=500, help="资产数量（默认 500）")
+    bench_parser.add_argument("--transactions", type=int, default=20000, help="交易数量（默认 20000）")
+    bench_parser.add_argument("--seed", type=int, default=20250101, help="随机种子")
+    bench_parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（默认 3）")
+    bench_parser.add_argument("--query-date", default="2025-06-30", help="查询日期（默认 2025-06-30，与生成数据的基准日一致）")
+    bench_parser.add_argument("--format", choices=["csv", "xlsx"], default="csv", help="生成的导入文件格式")
+    bench_parser.add_argument("--data-dir", help="保留生成的数据文件与基准库的目录（默认使用临时目录）")
+    bench_parser.add_argument("--only", action="append", help="仅运行名称以此开头的基准（可重复）")
+    bench_parser.add_argument("--no-memory", action="store_true", help="不统计峰值内存")
+    bench_parser.add_argument("--output", help="结果 JSON 文件（默认打印到标准输出）")
+
+    # HTTP 接口命令
+    api_parser = subparsers.add_parser("api", help="启动本地 HTTP/JSON 接口")
+    api_parser.add_argument("--host", default="127.0.0.1", help="监听地址（默认 127.0.0.1）")
+    api_parser.add_argument("--port", type=int, default=8765, help="监听端口（默认 8765）")
+    api_parser.add_argument("--workers", type=int, default=16, help="工作线程数（默认 16）")
+    api_parser.add_argument("--verbose", action="store_true", help="打印访问日志")
+
+    # 数据库维护命令
+    db_parser = subparsers.add_parser("db", help="数据库维护")
+    db_subparsers = db_parser.add_subparsers(dest="db_command", help="数据库子命令")
+    slowlog_parser = db_subparsers.add_parser("slowlog", help="汇总慢查询日志（按归一化语句分组）")
+    slowlog_parser.add_argument("--log", help="日志文件（默认 data/slow_queries.log 或环境变量 FUNDMAN_SLOW_QUERY_LOG）")
+    slowlog_parser.add_argument("--top", type=int, default=10, help="显示前 N 组（默认 10）")
+    slowlog_parser.add_argument("--no-plan", action="store_true", help="不显示执行计划")
+    changelog_parser = db_subparsers.add_parser("changelog", help="变更日志概况与清理")
+    changelog_parser.add_argument("--prune-before", type=int, help="删除 seq 不超过该水位的日志（所有下游同步后）")
     return parser
 
 
@@ -118,25 +650,94 @@ def _print_investment_help() -> None:
     print("试试: python -m fundman.app investment --help")
 
 
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     """主函数"""
     parser = build_parser()
+    argv = sys.argv[1:] if argv is None else argv
     # 如果没有提供参数，显示帮助信息
-    if len(sys.argv) == 1:
+    if not argv:
         parser.print_help()
         sys.exit(1)
     
-    args = parser.parse_args()
-    
+    args = parser.parse_args(argv)
+
+    # 守护进程运行中时转发给守护进程执行，否则回退到进程内执行
+    local_only = args.command in LOCAL_ONLY_COMMANDS | IN_PROCESS_COMMANDS
+    profile = args.profile or args.profile_trace
+    if args.command is not None and not local_only and not args.no_daemon and not profile:
+        from fundman.server.client import DaemonError, run_remote
+        try:
+            exit_code = run_remote(argv)
+        except DaemonError as exc:
+            # 命令已发给守护进程，可能已经执行（如写操作），不在本进程内重复执行
+            print(f"错误: {exc}", file=sys.stderr)
+            sys.exit(1)
+        if exit_code is not None:
+            if exit_code:
+                sys.exit(exit_code)
+            return
+
+    if profile:
+        run_profiled(args)
+    else:
+        run_command(args)
+
+
+def run_profiled(args: argparse.Namespace) -> None:
+    """在剖析下执行命令（本进程内），结束后（含失败）输出汇总表与可选的 trace 文件"""
+    from fundman.utils.profiling import Profiler
+
+    profiler = Profiler().start()
+    try:
+        with profiler.span(f"command.{args.command}"):
+            run_command(args)
+    finally:
+        profiler.stop()
+        profiler.print_table(sys.stderr)
+        if args.profile_trace:
+            profiler.write_trace(args.profile_trace)
+            print(f"trace 已写出: {args.profile_trace}", file=sys.stderr)
+
+
+def run_command(args: argparse.Namespace) -> int:
+    """执行已解析的命令（供 main、守护进程、批处理复用）
+
+    Returns:
+        int: 0 表示成功；命令自行报告的失败（如找不到产品/资产）返回 1
+    """
     # 根据命令执行相应操作
     if args.command == "init":
         init_database()
     elif args.command == "import":
-        import_data(args.file, args.query_date)
+        import_data(args.file, args.query_date, args.max_memory)
+    elif args.command == "import-assets":
+        import_assets(args.file, args.batch_size)
+    elif args.command == "import-transactions":
+        import_transactions(args.file, args.rejects, args.batch_size)
     elif args.command == "export":
-        export_data(args.file, args.query_date)
+        export_data(args.file, args.query_date, args.trusted, args.since, args.table)
+    elif args.command == "export-transactions":
+        export_transactions(args.file, args.product_code, args.asset_code, args.date_from, args.date_to, args.query_date)
+    elif args.command == "rollforward":
+        rollforward_data(args.query_date, args.product_code)
+    elif args.command == "diff":
+        diff_data(args.file, args.query_date, args.output)
     elif args.command == "query":
-        query_data(args.query_date)
+        if args.maturing_within is not None or args.start_from or args.start_to or args.top is not None:
+            query_window_data(args.query_date, args.maturing_within, args.start_from, args.start_to, args.top, args.by)
+        else:
+            query_data(args.query_date, args.trusted, args.business_days)
+    elif args.command == "analytics":
+        analytics_data(args.query_date, args.product_code, args.output, args.business_days)
+    elif args.command == "projection":
+        projection_data(args.start_date, args.horizon, args.freq, args.output)
+    elif args.command == "liquidity":
+        liquidity_data(args.query_date, args.all, args.top, args.output)
+    elif args.command == "exposure":
+        exposure_data(args.start_date, args.end_date, args.by, args.product_code, args.top, args.output)
+    elif args.command == "concentration":
+        concentration_data(args.query_date, args.dimension, args.limit, not args.book,
+                           not args.no_cache, args.breaches_only, args.output)
     elif args.command == "investment":
         # 处理投资组合管理命令
         if args.investment_command == "create-asset":
@@ -144,7 +745,7 @@ def main() -> None:
             from fundman.models import AssetCreate
             from fundman.crud import create_asset as crud_create_asset
             
-            db_gen = get_db()
+            db_gen = _lazy("get_db")()
             db = next(db_gen)
             try:
                 asset_data = AssetCreate(
@@ -166,6 +767,7 @@ def main() -> None:
                 print(f"  地区: {asset.region}")
             except Exception as e:
                 print(f"创建资产时出错: {e}")
+                return 1
             finally:
                 db.close()
                 
@@ -173,10 +775,10 @@ def main() -> None:
             # 导入投资组合相关模块
             from fundman.crud import get_assets
             
-            db_gen = get_db()
+            db_gen = _lazy("get_db")()
             db = next(db_gen)
             try:
-                assets = get_assets(db)
+                assets = get_assets(db, mode="row") if args.trusted else get_assets(db)
                 if assets:
                     print("资产列表:")
                     print("-" * 80)
@@ -188,6 +790,7 @@ def main() -> None:
                     print("没有找到资产")
             except Exception as e:
                 print(f"列出资产时出错: {e}")
+                return 1
             finally:
                 db.close()
                 
@@ -198,19 +801,19 @@ def main() -> None:
             from fundman.crud.wealth_product_crud import get_product_by_yindeng_code
             from fundman.crud import get_asset_by_code
             
-            db_gen = get_db()
+            db_gen = _lazy("get_db")()
             db = next(db_gen)
             try:
                 # 首先检查产品和资产是否存在
                 product = get_product_by_yindeng_code(db, args.product_code)
                 if not product:
                     print(f"找不到银登编码为 {args.product_code} 的产品")
-                    return
+                    return 1
                     
                 asset = get_asset_by_code(db, args.asset_code)
                 if not asset:
                     print(f"找不到编码为 {args.asset_code} 的资产")
-                    return
+                    return 1
                     
                 # 获取 product_id 和 asset_id 的实际值
                 product_id_value = getattr(product, 'product_id', None)
@@ -218,7 +821,7 @@ def main() -> None:
                 
                 if product_id_value is None or asset_id_value is None:
                     print("获取产品ID或资产ID失败")
-                    return
+                    return 1
                     
                 from datetime import datetime
                 transaction_data = TransactionCreate(
@@ -245,6 +848,7 @@ def main() -> None:
                 print(f"  清算金额: {transaction.settlement_amount}")
             except Exception as e:
                 print(f"创建交易时出错: {e}")
+                return 1
             finally:
                 db.close()
                 
@@ -255,10 +859,10 @@ def main() -> None:
             # 退而求其次：若未提供“按ID取产品”的API，则根据事务中保存的 product_id 作为银登编码的情况做兼容尝试；
             # 若模型真实存的是 product_id，则建议后续提供 get_product_by_id 并在此替换为按ID查询。
             
-            db_gen = get_db()
+            db_gen = _lazy("get_db")()
             db = next(db_gen)
             try:
-                transactions = get_transactions(db)
+                transactions = get_transactions(db, mode="row") if args.trusted else get_transactions(db)
                 if transactions:
                     print("交易列表:")
                     print("-" * 120)
@@ -283,13 +887,38 @@ def main() -> None:
                     print("没有找到交易")
             except Exception as e:
                 print(f"列出交易时出错: {e}")
+                return 1
             finally:
                 db.close()
         else:
             # 无子命令时打印帮助以便测试覆盖（避免使用 argparse 私有属性）
             _print_investment_help()
+    elif args.command == "batch":
+        from fundman.batch import run_batch_file
+        exit_code = run_batch_file(args.file, args.commit_every, args.stop_on_error)
+        if exit_code:
+            sys.exit(exit_code)
+    elif args.command == "serve":
+        from fundman.server.daemon import serve, stop
+        if args.stop:
+            stop(args.socket)
+        else:
+            serve(args.socket)
+    elif args.command == "bench":
+        bench_data(args)
+    elif args.command == "api":
+        from fundman.server.api import serve_api
+        serve_api(args.host, args.port, args.workers, args.verbose)
+    elif args.command == "db":
+        if args.db_command == "slowlog":
+            slowlog_data(args.log, args.top, not args.no_plan)
+        elif args.db_command == "changelog":
+            changelog_data(args.prune_before)
+        else:
+            print("用法: fundman.app db {slowlog [--log FILE] [--top N] [--no-plan] | changelog [--prune-before SEQ]}")
     else:
-        parser.print_help()
+        build_parser().print_help()
+    return 0
 
 
 if __name__ == "__main__":
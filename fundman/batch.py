@@ -0,0 +1,139 @@
+"""
+批处理模式：在一个进程、一个数据库连接与外层事务中依次执行多条 CLI 子命令
+
+输入每行一条命令，支持两种写法：
+- 与命令行相同的参数（按 shell 规则切分，可带前缀 ``fundman``），空行与 ``#`` 注释行跳过
+- JSON 行：参数数组（``["investment", "list-assets"]``）或带 ``argv`` 字段的对象
+
+各命令内部的 commit 只释放保存点，外层事务每 ``commit_every`` 条命令（0 表示全部执行完）提交一次；
+单条命令失败时仅回滚其保存点并记录，``stop_on_error`` 为真时停止并回滚尚未提交的部分。
+"""
+import contextlib
+import io
+import json
+import shlex
+import sys
+import traceback
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+# 不允许在批处理中嵌套执行的命令
+EXCLUDED_COMMANDS = {"batch", "serve", "api"}
+
+
+def parse_line(line: str) -> Optional[List[str]]:
+    """解析一行批处理输入为参数列表；空行与注释行返回 None"""
+    text = line.strip()
+    if not text or text.startswith("#"):
+        return None
+    if text[0] in "[{":
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get("argv")
+        if not isinstance(data, list):
+            raise ValueError("JSON 行必须是参数数组或带 argv 字段的对象")
+        argv = [str(item) for item in data]
+    else:
+        argv = shlex.split(text)
+    if argv and argv[0] == "fundman":
+        argv = argv[1:]
+    return argv
+
+
+def _run_one(parser: Any, argv: List[str]) -> Tuple[bool, str]:
+    """执行一条命令，返回 (是否成功, 错误信息)"""
+    from fundman.app import run_command
+
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            args = parser.parse_args(argv)
+        if args.command in EXCLUDED_COMMANDS:
+            return False, f"批处理中不支持 {args.command} 命令"
+        status = run_command(args)
+    except SystemExit as e:
+        message = stderr.getvalue().strip().splitlines()
+        return e.code in (0, None), message[-1] if message else f"退出码 {e.code}"
+    except Exception as e:
+        traceback.print_exc()
+        return False, f"{type(e).__name__}: {e}"
+    if status:
+        return False, f"退出码 {status}"
+    return True, ""
+
+
+def run_batch(
+    lines: Iterable[str],
+    commit_every: int = 0,
+    stop_on_error: bool = False,
+    engine: Any = None,
+    err: Optional[TextIO] = None,
+) -> Dict[str, Any]:
+    """在同一连接与外层事务中执行批处理命令
+
+    Args:
+        lines: 输入行
+        commit_every: 每执行多少条命令提交一次外层事务（0 表示全部执行完后提交）
+        stop_on_error: 为真时遇到失败立即停止，并回滚尚未提交的命令
+        engine: 数据库引擎（默认使用配置的 engine，并先完成建表）
+        err: 失败信息输出流（默认 stderr）
+
+    Returns:
+        Dict[str, Any]: total/succeeded/failed（[(行号, 命令, 错误信息)]）/commits/aborted
+    """
+    from fundman.app import build_parser
+    from fundman.database import connection as db_connection
+
+    err = err or sys.stderr
+    if engine is None:
+        db_connection.init_db()
+        engine = db_connection.engine
+    parser = build_parser()
+
+    result: Dict[str, Any] = {"total": 0, "succeeded": 0, "failed": [], "commits": 0, "aborted": False}
+    pending = 0
+    with engine.connect() as connection, db_connection.bind_connection(connection):
+        db_connection.begin_transaction(connection)
+        for number, line in enumerate(lines, start=1):
+            try:
+                argv = parse_line(line)
+            except ValueError as e:
+                argv, ok, message = [], False, f"无法解析: {e}"
+            else:
+                if argv is None:
+                    continue
+                ok, message = _run_one(parser, argv) if argv else (False, "缺少命令")
+
+            result["total"] += 1
+            pending += 1
+            if ok:
+                result["succeeded"] += 1
+            else:
+                command = " ".join(argv) if argv else line.strip()
+                result["failed"].append((number, command, message))
+                print(f"第 {number} 行失败: {command}: {message}", file=err)
+                if stop_on_error:
+                    connection.rollback()
+                    result["aborted"] = True
+                    return result
+
+            if commit_every and pending >= commit_every:
+                connection.commit()
+                result["commits"] += 1
+                pending = 0
+                db_connection.begin_transaction(connection)
+
+        connection.commit()
+        if pending:
+            result["commits"] += 1
+    return result
+
+
+def run_batch_file(path: str, commit_every: int = 0, stop_on_error: bool = False) -> int:
+    """执行批处理文件（``-`` 表示标准输入），打印汇总并返回退出码"""
+    with (contextlib.nullcontext(sys.stdin) if path == "-" else open(path, encoding="utf-8")) as stream:
+        result = run_batch(stream, commit_every=commit_every, stop_on_error=stop_on_error)
+    failed = len(result["failed"])
+    status = "已中止" if result["aborted"] else "完成"
+    print(f"批处理{status}: 共 {result['total']} 条，成功 {result['succeeded']} 条，失败 {failed} 条，提交 {result['commits']} 次",
+          file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,224 @@
+"""
+确定性合成数据生成器：按给定种子生成产品、资产与交易
+
+- 产品：仿真的中文产品名、银登/金数/托管编码、起息日与期限分布、业绩基准与募集金额
+- 资产：国债/金融债/存单/信用债等类型，发行人、行业、地区
+- 交易：落在产品存续期内的投资日期、期限分布、收益率与价格
+
+同一组 (数量, 种子, 基准日) 生成完全相同的数据；可写出为导入格式的 CSV/XLSX，或直接批量写入数据库。
+"""
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from ..models import AssetDB, TransactionDB, WealthProductDB
+
+DEFAULT_SEED = 20250101
+DEFAULT_BASE_DATE = date(2025, 6, 30)
+
+PRODUCT_BRANDS = ["招银", "工银", "建信", "农银", "中银", "交银", "兴银", "光大", "浦银", "平安", "华夏", "民生"]
+PRODUCT_SERIES = ["稳健", "添利", "安享", "鑫享", "悦享", "恒利", "睿远", "丰润", "天天利", "智享"]
+PRODUCT_KINDS = ["固收", "固收+", "现金管理", "纯债", "混合"]
+# 产品期限（天）及其概率
+PRODUCT_TERMS = np.array([91, 182, 273, 365, 548, 730, 1095])
+PRODUCT_TERM_WEIGHTS = np.array([0.10, 0.20, 0.10, 0.30, 0.12, 0.13, 0.05])
+
+ASSET_TYPES = ["国债", "政策性金融债", "同业存单", "地方政府债", "企业债", "中期票据", "短期融资券", "公司债", "资产支持证券"]
+ASSET_TYPE_WEIGHTS = np.array([0.08, 0.12, 0.25, 0.10, 0.08, 0.15, 0.10, 0.08, 0.04])
+# 发行人及其所属行业
+ISSUERS = [
+    ("财政部", "政府"), ("国家开发银行", "金融"), ("中国进出口银行", "金融"), ("中国农业发展银行", "金融"),
+    ("招商银行", "金融"), ("兴业银行", "金融"), ("浦发银行", "金融"), ("中信银行", "金融"),
+    ("北京市财政局", "政府"), ("上海市财政局", "政府"), ("广东省财政厅", "政府"), ("江苏省财政厅", "政府"),
+    ("成都城投集团", "城投"), ("重庆城建投资", "城投"), ("武汉地产集团", "城投"),
+    ("国家电网", "公用事业"), ("长江电力", "公用事业"), ("三峡集团", "公用事业"), ("中国石化", "能源"),
+    ("中国铁建", "建筑"), ("中国中铁", "建筑"), ("万科企业", "房地产"), ("保利发展", "房地产"),
+    ("华润置地", "房地产"), ("招商蛇口", "房地产"), ("宁德时代", "制造业"), ("比亚迪", "制造业"),
+    ("美的集团", "制造业"), ("中国移动", "信息技术"), ("京东方", "信息技术"),
+]
+REGIONS = ["北京", "上海", "广东", "江苏", "浙江", "四川", "重庆", "湖北", "山东", "福建", "天津", "河南"]
+# 交易期限（天）及其概率
+ASSET_TERMS = np.array([30, 90, 180, 270, 365, 730, 1095, 1825])
+ASSET_TERM_WEIGHTS = np.array([0.08, 0.15, 0.17, 0.10, 0.25, 0.12, 0.08, 0.05])
+
+# 导入文件列名（与 import_data_file 的中文表头一致）
+IMPORT_COLUMNS = {
+    "product_name": "产品名称",
+    "product_yindeng_code": "银登编码",
+    "product_jinshu_code": "金数编码",
+    "product_custody_code": "托管编码",
+    "product_start_date": "起息日",
+    "product_end_date": "到期日",
+    "product_performance_benchmark": "业绩基准",
+    "product_raise_target": "募集目标",
+    "product_raise_amount": "募集金额",
+    "product_raise_institutional": "机构募集",
+    "product_raise_retail": "个人募集",
+}
+
+
+def _rng(seed: int, stream: int) -> np.random.Generator:
+    """按实体拆分的随机流，保证改变某一类数量时其余实体不受影响"""
+    return np.random.default_rng([seed, stream])
+
+
+def _days(base: date) -> np.datetime64:
+    return np.datetime64(base, "D")
+
+
+def generate_products(n: int, seed: int = DEFAULT_SEED, base_date: date = DEFAULT_BASE_DATE) -> pd.DataFrame:
+    """生成 n 个产品（列名与 WealthProductDB 一致，product_id 为 1..n）"""
+    rng = _rng(seed, 1)
+    ids = np.arange(1, n + 1)
+    names = [
+        f"{PRODUCT_BRANDS[b]}理财{PRODUCT_SERIES[s]}{PRODUCT_KINDS[k]}{i:04d}期"
+        for i, b, s, k in zip(ids,
+                              rng.integers(0, len(PRODUCT_BRANDS), n),
+                              rng.integers(0, len(PRODUCT_SERIES), n),
+                              rng.integers(0, len(PRODUCT_KINDS), n))
+    ]
+    terms = rng.choice(PRODUCT_TERMS, size=n, p=PRODUCT_TERM_WEIGHTS)
+    # 起息日分布在基准日前两年内，使部分产品已到期、部分仍在存续
+    start = _days(base_date) - rng.integers(0, 730, n).astype("timedelta64[D]")
+    end = start + terms.astype("timedelta64[D]")
+    institutions = rng.integers(10000, 99999, n)
+    years = start.astype("datetime64[Y]").astype(int) % 100
+    target = np.round(rng.lognormal(mean=19.5, sigma=0.8, size=n), -4)
+    amount = np.round(target * rng.uniform(0.6, 1.0, n), -2)
+    institutional = np.round(amount * rng.uniform(0.2, 0.8, n), -2)
+    return pd.DataFrame({
+        "product_id": ids,
+        "product_name": names,
+        "product_yindeng_code": [f"Z7{inst:05d}{yy:02d}{i:06d}" for inst, yy, i in zip(institutions, years, ids)],
+        "product_jinshu_code": [f"JS{i:010d}" for i in ids],
+        "product_custody_code": [f"TG{inst:05d}{i:07d}" for inst, i in zip(institutions, ids)],
+        "product_start_date": start.astype(object),
+        "product_end_date": end.astype(object),
+        "product_days_total": terms,
+        # 业绩基准按库中存储口径（小数，0.03 即 3%）生成
+        "product_performance_benchmark": np.round(rng.normal(0.03, 0.005, n).clip(0.015, 0.05), 4),
+        "product_raise_target": target,
+        "product_raise_amount": amount,
+        "product_raise_institutional": institutional,
+        "product_raise_retail": amount - institutional,
+    })
+
+
+def generate_assets(m: int, seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """生成 m 个资产（列名与 AssetDB 一致，asset_id 为 1..m）"""
+    rng = _rng(seed, 2)
+    ids = np.arange(1, m + 1)
+    types = rng.choice(len(ASSET_TYPES), size=m, p=ASSET_TYPE_WEIGHTS)
+    issuers = rng.integers(0, len(ISSUERS), m)
+    markets = rng.choice([".IB", ".SH", ".SZ"], size=m, p=[0.7, 0.2, 0.1])
+    return pd.DataFrame({
+        "asset_id": ids,
+        "asset_name": [f"{ISSUERS[s][0][:4]}{25 - i % 5:02d}{ASSET_TYPES[t]}{i:03d}" for i, t, s in zip(ids, types, issuers)],
+        "asset_code": [f"{2 + i % 3}{i:07d}{market}" for i, market in zip(ids, markets)],
+        "asset_type": [ASSET_TYPES[t] for t in types],
+        "issuer": [ISSUERS[s][0] for s in issuers],
+        "industry": [ISSUERS[s][1] for s in issuers],
+        "region": [REGIONS[r] for r in rng.integers(0, len(REGIONS), m)],
+    })
+
+
+def generate_transactions(
+    k: int,
+    products: pd.DataFrame,
+    m_assets: int,
+    seed: int = DEFAULT_SEED,
+    base_date: date = DEFAULT_BASE_DATE,
+) -> pd.DataFrame:
+    """生成 k 笔交易：投资日期落在产品存续期内且不晚于基准日（列名与 TransactionDB 一致）"""
+    if k and (products.empty or m_assets < 1):
+        raise ValueError("生成交易需要至少一个产品和一个资产")
+    rng = _rng(seed, 3)
+    # 交易集中在少数大产品上（Zipf 型分布）
+    weights = 1.0 / np.arange(1, len(products) + 1) ** 0.8
+    picked = rng.choice(len(products), size=k, p=weights / weights.sum())
+    start = products["product_start_date"].to_numpy(dtype="datetime64[D]")[picked]
+    end = products["product_end_date"].to_numpy(dtype="datetime64[D]")[picked]
+    latest = np.minimum(end, _days(base_date))
+    span = np.maximum((latest - start).astype(int), 0)
+    investment = start + (rng.random(k) * (span + 1)).astype("timedelta64[D]")
+    maturity = investment + rng.choice(ASSET_TERMS, size=k, p=ASSET_TERM_WEIGHTS).astype("timedelta64[D]")
+    quantity = rng.integers(1, 500, k) * 1000.0
+    net_price = np.round(rng.normal(100.0, 1.5, k), 4)
+    full_price = np.round(net_price + rng.uniform(0.0, 3.0, k), 4)
+    return pd.DataFrame({
+        "transaction_id": np.arange(1, k + 1),
+        "product_id": products["product_id"].to_numpy()[picked],
+        "asset_id": rng.integers(1, m_assets + 1, k),
+        "investment_date": investment.astype(object),
+        "maturity_date": maturity.astype(object),
+        "interest_rate": np.round(rng.normal(2.6, 0.6, k).clip(1.2, 6.0), 4),
+        "quantity": quantity,
+        "unit_net_price": net_price,
+        "unit_full_price": full_price,
+        "settlement_amount": np.round(quantity * full_price, 2),
+    })
+
+
+def generate_dataset(
+    n_products: int,
+    m_assets: int,
+    k_transactions: int,
+    seed: int = DEFAULT_SEED,
+    base_date: date = DEFAULT_BASE_DATE,
+) -> Dict[str, pd.DataFrame]:
+    """生成完整数据集 {products, assets, transactions}"""
+    products = generate_products(n_products, seed, base_date)
+    assets = generate_assets(m_assets, seed)
+    transactions = generate_transactions(k_transactions, products, m_assets, seed, base_date)
+    return {"products": products, "assets": assets, "transactions": transactions}
+
+
+def to_import_frame(products: pd.DataFrame) -> pd.DataFrame:
+    """转换为 import_data_file 接受的中文表头格式（业绩基准为百分比字符串）"""
+    frame = products[list(IMPORT_COLUMNS)].rename(columns=IMPORT_COLUMNS)
+    frame["业绩基准"] = products["product_performance_benchmark"].map(lambda v: f"{v * 100:.2f}%")
+    for column in ("起息日", "到期日"):
+        frame[column] = pd.to_datetime(frame[column]).dt.strftime("%Y-%m-%d")
+    return frame
+
+
+def write_dataset(dataset: Dict[str, pd.DataFrame], directory: Union[str, Path], fmt: str = "csv") -> List[Path]:
+    """写出数据集：products 为导入格式，assets/transactions 为表结构格式"""
+    if fmt not in ("csv", "xlsx"):
+        raise ValueError(f"不支持的文件格式: {fmt}")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, frame in dataset.items():
+        frame = to_import_frame(frame) if name == "products" else frame
+        path = directory / f"{name}.{fmt}"
+        if fmt == "csv":
+            frame.to_csv(path, index=False, encoding="utf-8")
+        else:
+            frame.to_excel(path, index=False, engine="openpyxl")
+        paths.append(path)
+    return paths
+
+
+def populate_database(
+    engine: Engine,
+    dataset: Dict[str, pd.DataFrame],
+    chunk_size: int = 10000,
+    tables: Optional[List[str]] = None,
+) -> Dict[str, int]:
+    """将数据集按块批量写入数据库（executemany），返回各表写入行数"""
+    models = {"products": WealthProductDB, "assets": AssetDB, "transactions": TransactionDB}
+    counts = {}
+    with engine.begin() as connection:
+        for name in tables or list(models):
+            frame = dataset[name]
+            records = frame.astype(object).where(frame.notna(), None).to_dict("records")
+            for offset in range(0, len(records), chunk_size):
+                connection.execute(insert(models[name]), records[offset:offset + chunk_size])
+            counts[name] = len(records)
+    return counts
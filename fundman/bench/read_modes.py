@@ -0,0 +1,101 @@
+"""
+读取模式基准测试：比较各读取模式的单行开销
+
+用法::
+
+    python -m fundman.bench.read_modes --rows 20000 --repeat 3
+"""
+import argparse
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from ..crud.investment_crud import get_transactions
+from ..crud.read_modes import READ_MODES
+from ..crud.wealth_product_crud import query_dynamic
+from ..models import Base, AssetDB, TransactionDB, WealthProductDB
+
+
+def _seed(db: Session, rows: int) -> None:
+    """向内存数据库写入 rows 条产品与交易"""
+    base = date(2025, 1, 1)
+    db.execute(insert(AssetDB), [{"asset_id": 1, "asset_name": "基准资产", "asset_code": "BENCH", "asset_type": "债券"}])
+    db.execute(insert(WealthProductDB), [
+        {
+            "product_id": i + 1,
+            "product_name": f"基准产品{i}",
+            "product_yindeng_code": f"YD{i:08d}",
+            "product_start_date": base,
+            "product_end_date": base + timedelta(days=30 + i % 700),
+            "product_days_total": 30 + i % 700,
+            "product_performance_benchmark": 0.03,
+            "product_raise_amount": 1_000_000.0,
+        }
+        for i in range(rows)
+    ])
+    db.execute(insert(TransactionDB), [
+        {
+            "product_id": i + 1,
+            "asset_id": 1,
+            "investment_date": base,
+            "maturity_date": base + timedelta(days=90 + i % 365),
+            "interest_rate": 2.5,
+            "quantity": 1000.0,
+            "unit_net_price": 100.0,
+            "unit_full_price": 101.0,
+            "settlement_amount": 101000.0,
+        }
+        for i in range(rows)
+    ])
+    db.commit()
+
+
+def _time_per_row(fn: Callable[[], object], rows: int, repeat: int) -> float:
+    """取 repeat 次中的最佳耗时，返回单行微秒数"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / rows * 1e6
+
+
+def run(rows: int = 20000, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """运行基准测试，返回 {接口: {模式: 单行微秒}}"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    results: Dict[str, Dict[str, float]] = {"get_transactions": {}, "query_dynamic": {}}
+    with Session(engine) as db:
+        _seed(db, rows)
+        for mode in READ_MODES:
+            results["get_transactions"][mode] = _time_per_row(
+                lambda: get_transactions(db, limit=rows, mode=mode), rows, repeat
+            )
+            results["query_dynamic"][mode] = _time_per_row(
+                lambda: query_dynamic(db, "2025-06-30", mode=mode), rows, repeat
+            )
+            db.expunge_all()
+    engine.dispose()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """命令行入口：打印各模式的单行耗时及相对 validate 的加速比"""
+    parser = argparse.ArgumentParser(description="读取模式单行开销基准测试")
+    parser.add_argument("--rows", type=int, default=20000, help="测试行数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数（取最佳）")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.repeat)
+    for api, per_mode in results.items():
+        baseline = per_mode["validate"]
+        print(f"{api}（{args.rows} 行）")
+        for mode, micros in per_mode.items():
+            print(f"  {mode:<10} {micros:8.2f} µs/行  x{baseline / micros:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
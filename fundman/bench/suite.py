@@ -0,0 +1,236 @@
+"""
+基准测试套件：在临时库上生成确定性数据，测量导入、导出、查询、列表与分析的耗时
+
+每项基准重复执行 repeat 次，报告单次耗时的分位数（点查询按单次调用统计）、吞吐量（行/秒），
+并额外执行一次 tracemalloc 采样得到峰值内存；结果为可直接 json.dump 的字典，便于版本间对比。
+"""
+import contextlib
+import io
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..models import Base
+from .generator import DEFAULT_BASE_DATE, DEFAULT_SEED, generate_dataset, populate_database, write_dataset
+
+PERCENTILES = (50, 95, 99)
+# 点查询基准的调用次数
+LOOKUP_CALLS = 1000
+
+
+def _new_engine(path: Path) -> Engine:
+    """在指定路径创建空库"""
+    if path.exists():
+        path.unlink()
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """进程峰值常驻内存（MB）；不支持 resource 模块的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _summarize(samples: List[float], rows: int, peak_bytes: Optional[int]) -> Dict[str, Any]:
+    """汇总耗时样本（秒）"""
+    values = np.array(samples) * 1000.0
+    median_seconds = float(np.median(samples))
+    result: Dict[str, Any] = {"rows": rows, "runs": len(samples), "mean_ms": round(float(values.mean()), 3)}
+    for q in PERCENTILES:
+        result[f"p{q}_ms"] = round(float(np.percentile(values, q)), 3)
+    result["max_ms"] = round(float(values.max()), 3)
+    result["rows_per_sec"] = round(rows / median_seconds, 1) if median_seconds > 0 else None
+    result["peak_memory_mb"] = None if peak_bytes is None else round(peak_bytes / (1024 * 1024), 2)
+    return result
+
+
+def measure(
+    fn: Callable[[], Any],
+    rows: int,
+    repeat: int = 3,
+    setup: Optional[Callable[[], Any]] = None,
+    memory: bool = True,
+) -> Dict[str, Any]:
+    """重复执行 fn 并统计耗时；setup 在每次执行前调用且不计时，memory 为真时额外执行一次统计峰值内存"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    peak = None
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return _summarize(samples, rows, peak)
+
+
+def measure_calls(fn: Callable[[Any], Any], args: Iterable[Any]) -> Dict[str, Any]:
+    """逐次调用 fn(arg) 并按单次调用统计延迟分位数（用于点查询）"""
+    samples = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - start)
+    result = _summarize(samples, len(samples), None)
+    result["rows_per_sec"] = round(len(samples) / sum(samples), 1) if samples else None
+    return result
+
+
+def environment() -> Dict[str, Any]:
+    """运行环境信息"""
+    try:
+        from importlib.metadata import version
+        fundman_version = version("fundman")
+    except Exception:
+        fundman_version = "unknown"
+    import pandas as pd
+    import sqlalchemy
+    return {
+        "fundman": fundman_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlite": sqlite3.sqlite_version,
+        "sqlalchemy": sqlalchemy.__version__,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def run_suite(
+    products: int = 1000,
+    assets: int = 500,
+    transactions: int = 20000,
+    seed: int = DEFAULT_SEED,
+    repeat: int = 3,
+    query_date: date = DEFAULT_BASE_DATE,
+    data_dir: Optional[str] = None,
+    file_format: str = "csv",
+    only: Optional[Iterable[str]] = None,
+    memory: bool = True,
+) -> Dict[str, Any]:
+    """运行基准测试套件
+
+    Args:
+        products/assets/transactions: 生成的产品、资产、交易数量
+        seed: 随机种子
+        repeat: 每项重复次数
+        query_date: 查询与分析使用的日期（默认与生成器基准日一致）
+        data_dir: 生成文件与临时库所在目录（默认使用临时目录并在结束后删除）
+        file_format: 生成的产品导入文件格式（csv/xlsx）
+        only: 仅运行名称以这些前缀开头的基准
+        memory: 是否统计峰值内存
+
+    Returns:
+        Dict[str, Any]: {environment, params, results: {基准名: 指标}, peak_rss_mb}
+    """
+    from ..analytics import ProductTable, concentration_report, liquidity_mismatch, portfolio_analytics, project_cash_flows
+    from ..crud import get_asset_by_code, get_assets, get_transactions, query_dynamic
+    from ..data_processor import export_data_file, import_data_file
+    from ..database.connection import bind_engine
+
+    prefixes = tuple(only or ())
+    selected = (lambda name: not prefixes or name.startswith(prefixes))
+    qd = query_date.isoformat()
+    results: Dict[str, Dict[str, Any]] = {}
+
+    with contextlib.ExitStack() as stack:
+        if data_dir is None:
+            directory = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="fundman-bench-")))
+        else:
+            directory = Path(data_dir)
+            directory.mkdir(parents=True, exist_ok=True)
+        # 被测函数的输出（如“导入完成”）不混入报告
+        stack.enter_context(contextlib.redirect_stdout(io.StringIO()))
+
+        dataset = generate_dataset(products, assets, transactions, seed, query_date)
+        total_rows = products + assets + transactions
+        if selected("generate"):
+            results["generate"] = measure(
+                lambda: generate_dataset(products, assets, transactions, seed, query_date), total_rows, repeat, memory=memory)
+        files = {path.stem: path for path in write_dataset(dataset, directory, file_format)}
+
+        scratch: Dict[str, Engine] = {}
+
+        def fresh_db() -> None:
+            if "engine" in scratch:
+                scratch.pop("engine").dispose()
+            scratch["engine"] = _new_engine(directory / "scratch.db")
+
+        if selected("db_write"):
+            results["db_write"] = measure(
+                lambda: populate_database(scratch["engine"], dataset), total_rows, repeat, setup=fresh_db, memory=memory)
+
+        if selected("import"):
+            def import_products() -> None:
+                with bind_engine(scratch["engine"]):
+                    import_data_file(str(files["products"]), qd)
+            results[f"import_{file_format}"] = measure(import_products, products, repeat, setup=fresh_db, memory=memory)
+        if "engine" in scratch:
+            scratch.pop("engine").dispose()
+
+        engine = _new_engine(directory / "bench.db")
+        stack.callback(engine.dispose)
+        populate_database(engine, dataset)
+        stack.enter_context(bind_engine(engine))
+        db = stack.enter_context(Session(engine))
+
+        def timed(name: str, fn: Callable[[], Any], rows: int) -> None:
+            if selected(name):
+                results[name] = measure(lambda: (fn(), db.expunge_all()), rows, repeat, memory=memory)
+
+        for ext, mode in (("csv", "validate"), ("csv", "dataframe"), ("xlsx", "dataframe")):
+            label = "trusted" if mode != "validate" else mode
+            timed(f"export_{ext}_{label}", lambda ext=ext, mode=mode: export_data_file(
+                str(directory / f"export.{ext}"), mode=mode), products)
+
+        for mode in ("validate", "row"):
+            timed(f"query_dynamic_{mode}", lambda mode=mode: query_dynamic(db, qd, mode=mode), products)
+            timed(f"list_assets_{mode}", lambda mode=mode: get_assets(db, limit=assets, mode=mode), assets)
+            timed(f"list_transactions_{mode}", lambda mode=mode: get_transactions(db, limit=transactions, mode=mode),
+                  transactions)
+
+        if selected("lookup_asset_by_code") and assets:
+            codes = dataset["assets"]["asset_code"].to_numpy()
+            picks = np.random.default_rng(seed).integers(0, assets, LOOKUP_CALLS)
+            results["lookup_asset_by_code"] = measure_calls(lambda code: get_asset_by_code(db, code), codes[picks])
+
+        timed("product_table_load", lambda: ProductTable.load(db), products)
+        timed("analytics_portfolio", lambda: portfolio_analytics(db, qd), transactions)
+        timed("analytics_concentration", lambda: concentration_report(db, qd, use_cache=False), transactions)
+        timed("analytics_liquidity", lambda: liquidity_mismatch(db, qd), transactions)
+        timed("analytics_projection", lambda: project_cash_flows(db, qd, 365), transactions)
+
+    return {
+        "environment": environment(),
+        "params": {"products": products, "assets": assets, "transactions": transactions, "seed": seed,
+                   "repeat": repeat, "query_date": qd, "file_format": file_format},
+        "results": results,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
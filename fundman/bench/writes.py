@@ -0,0 +1,107 @@
+"""
+并发写入基准测试：比较多个线程直接写 SQLite 与经写入队列（单写线程、分组事务）的吞吐量
+
+用法::
+
+    python -m fundman.bench.writes --threads 8 --writes 200
+"""
+import argparse
+import tempfile
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from ..crud.investment_crud import create_transaction
+from ..models import AssetDB, Base, TransactionCreate, WealthProductDB
+from ..server.writer import WriteBehindQueue
+
+
+def _new_database(path: Path, timeout: float) -> Any:
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": timeout})
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.execute(insert(AssetDB), [{"asset_id": 1, "asset_name": "基准资产", "asset_code": "BENCH", "asset_type": "债券"}])
+        db.execute(insert(WealthProductDB), [{
+            "product_id": 1, "product_name": "基准产品", "product_yindeng_code": "YD_BENCH",
+            "product_start_date": date(2025, 1, 1), "product_end_date": date(2025, 12, 31), "product_days_total": 364,
+        }])
+        db.commit()
+    return engine
+
+
+def _payload(i: int) -> TransactionCreate:
+    return TransactionCreate(product_id=1, asset_id=1, investment_date=date(2025, 2, 1),
+                             interest_rate=2.5, quantity=float(i + 1), unit_full_price=101.0)
+
+
+def _hammer(threads: int, writes: int, write_one: Callable[[int], Any]) -> Dict[str, Any]:
+    """threads 个线程各写 writes 条，返回耗时、吞吐量与失败数"""
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def worker(offset: int) -> None:
+        for i in range(writes):
+            try:
+                write_one(offset + i)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{type(e).__name__}: {e}".splitlines()[0])
+
+    workers = [threading.Thread(target=worker, args=(n * writes,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    succeeded = threads * writes - len(errors)
+    return {"seconds": elapsed, "writes_per_second": succeeded / elapsed, "failed": len(errors),
+            "errors": sorted(set(errors))[:3]}
+
+
+def run(threads: int = 8, writes: int = 200, timeout: float = 0.1, max_latency: float = 0.0) -> Dict[str, Dict[str, Any]]:
+    """运行基准测试；timeout 为 SQLite 忙等待秒数（直接写入时锁冲突超过该时间即报错）"""
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        engine = _new_database(Path(directory) / "direct.db", timeout)
+
+        def direct(i: int) -> Any:
+            with Session(engine) as db:
+                return create_transaction(db, _payload(i))
+
+        results["direct"] = _hammer(threads, writes, direct)
+        engine.dispose()
+
+        engine = _new_database(Path(directory) / "queued.db", timeout)
+        with WriteBehindQueue(engine, max_latency=max_latency) as writer:
+            results["queued"] = _hammer(threads, writes, lambda i: writer.write("create_transaction", _payload(i)))
+            results["queued"].update(writer.stats())
+        engine.dispose()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """命令行入口：打印两种方式的吞吐量与失败数"""
+    parser = argparse.ArgumentParser(description="并发写入基准测试")
+    parser.add_argument("--threads", type=int, default=8, help="并发写入线程数")
+    parser.add_argument("--writes", type=int, default=200, help="每个线程写入条数")
+    parser.add_argument("--timeout", type=float, default=0.1, help="SQLite 忙等待秒数")
+    parser.add_argument("--max-latency-ms", type=float, default=0.0, help="写入队列凑组的最长等待（毫秒）")
+    args = parser.parse_args(argv)
+
+    results = run(args.threads, args.writes, args.timeout, args.max_latency_ms / 1000)
+    for name, result in results.items():
+        print(f"{name:<8} {result['writes_per_second']:10.1f} 条/秒  耗时 {result['seconds']:.2f}s  失败 {result['failed']}")
+        for error in result["errors"]:
+            print(f"         {error}")
+    queued = results["queued"]
+    print(f"写入队列: {queued['groups']} 组，平均每组 {queued['mean_group']:.1f} 条，最大 {queued['max_group']} 条")
+
+
+if __name__ == "__main__":
+    main()
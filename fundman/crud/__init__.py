@@ -3,28 +3,40 @@ from .wealth_product_crud import (
     get_product_by_yindeng_code,
     get_products,
     create_product,
+    create_products,
     update_product,
     upsert_product_by_yindeng_code,
+    update_products_where,
+    delete_products_where,
+    rollforward_products,
     get_all_products,
     get_products_by_query_date,
+    get_products_in_date_range,
+    get_top_products,
     query_dynamic
 )
 
 from .investment_crud import (
     create_asset,
+    create_assets,
+    upsert_assets,
     get_asset,
     get_asset_by_code,
     get_assets,
     update_asset,
     delete_asset,
     create_transaction,
+    create_transactions,
+    insert_transaction_columns,
     get_transaction,
     get_transactions,
     get_transactions_by_product,
     get_transactions_by_asset,
     get_transactions_by_date_range,
     update_transaction,
-    delete_transaction
+    delete_transaction,
+    update_transactions_where,
+    delete_transactions_where
 )
 
 __all__ = [
@@ -32,20 +44,30 @@ __all__ = [
     "get_product_by_yindeng_code",
     "get_products",
     "create_product",
+    "create_products",
     "update_product",
     "upsert_product_by_yindeng_code",
+    "update_products_where",
+    "delete_products_where",
+    "rollforward_products",
     "get_all_products",
     "get_products_by_query_date",
+    "get_products_in_date_range",
+    "get_top_products",
     "query_dynamic",
     
     # Investment CRUD operations
     "create_asset",
+    "create_assets",
+    "upsert_assets",
     "get_asset",
     "get_asset_by_code",
     "get_assets",
     "update_asset",
     "delete_asset",
     "create_transaction",
+    "create_transactions",
+    "insert_transaction_columns",
     "get_transaction",
     "get_transactions",
     "get_transactions_by_product",
@@ -53,4 +75,6 @@ __all__ = [
     "get_transactions_by_date_range",
     "update_transaction",
     "delete_transaction",
+    "update_transactions_where",
+    "delete_transactions_where",
 ]
\ No newline at end of file
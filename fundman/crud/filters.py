@@ -0,0 +1,87 @@
+"""
+按条件批量操作的辅助函数：过滤条件构造与写入值校验
+"""
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def build_filters(orm_model: type, filters: Optional[Dict[str, Any]], allow_all: bool = False) -> List[ColumnElement]:
+    """将 {列名: 值} 转换为 WHERE 条件
+
+    标量值按等值匹配，list/tuple/set 按 IN 匹配，None 按 IS NULL 匹配。
+
+    Args:
+        orm_model: SQLAlchemy 模型类
+        filters: 过滤条件字典
+        allow_all: 为 False 时拒绝空条件，避免误操作整张表
+
+    Returns:
+        List[ColumnElement]: 可直接传给 where() 的条件列表
+    """
+    filters = filters or {}
+    if not filters and not allow_all:
+        raise ValueError("过滤条件为空；如需作用于整张表请显式指定 allow_all=True")
+
+    columns = orm_model.__table__.columns
+    clauses = []
+    for key, value in filters.items():
+        if key not in columns:
+            raise ValueError(f"{orm_model.__tablename__} 不存在列: {key}")
+        column = columns[key]
+        if value is None:
+            clauses.append(column.is_(None))
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            clauses.append(column.in_(list(value)))
+        else:
+            clauses.append(column == value)
+    return clauses
+
+
+def validate_values(schema: Type[BaseModel], values: Dict[str, Any]) -> Dict[str, Any]:
+    """按 Pydantic 模型的字段类型逐项校验待写入的值（写入路径保持校验）"""
+    if not values:
+        raise ValueError("更新内容为空")
+    validated = {}
+    for key, value in values.items():
+        field = schema.model_fields.get(key)
+        if field is None:
+            raise ValueError(f"{schema.__name__} 不存在字段: {key}")
+        validated[key] = TypeAdapter(field.annotation).validate_python(value)
+    return validated
+
+
+def validate_columns(schema: Type[BaseModel], columns: Dict[str, List[Any]], ignore: Tuple[str, ...] = ()) -> None:
+    """按 Pydantic 模型的字段类型整列校验待写入的列（列式写入路径的校验），不合法时抛出 ValueError
+
+    必填字段必须有对应的列；每列作为 List[字段类型] 交给 pydantic-core 一次校验，不逐行构造模型。
+    ignore 中的列（如主键）不校验。
+    """
+    missing = [name for name, field in schema.model_fields.items() if field.is_required() and name not in columns]
+    if missing:
+        raise ValueError(f"{schema.__name__} 缺少必填列: {', '.join(missing)}")
+    for name, values in columns.items():
+        if name in ignore:
+            continue
+        field = schema.model_fields.get(name)
+        if field is None:
+            raise ValueError(f"{schema.__name__} 不存在字段: {name}")
+        try:
+            _column_adapter(schema, name).validate_python(values)
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            row = error["loc"][0] if error["loc"] else 0
+            raise ValueError(f"{name} 第{row + 1}行不合法: {error['msg']}（值: {error['input']!r}）") from exc
+
+
+# (模型, 字段) -> List[字段类型] 的校验器；构造 TypeAdapter 有开销，按字段缓存
+_column_adapters: Dict[Tuple[type, str], TypeAdapter] = {}
+
+
+def _column_adapter(schema: Type[BaseModel], name: str) -> TypeAdapter:
+    """字段的整列校验器（List[字段类型]）"""
+    key = (schema, name)
+    if key not in _column_adapters:
+        _column_adapters[key] = TypeAdapter(List[schema.model_fields[name].annotation])
+    return _column_adapters[key]
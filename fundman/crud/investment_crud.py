@@ -1,17 +1,21 @@
 """
 投资组合相关CRUD操作模块
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, delete, func, insert, or_, select, update
 from datetime import date
 
 from ..models import (
     AssetDB, AssetCreate, AssetUpdate, AssetInDB,
-    TransactionDB, TransactionCreate, TransactionUpdate, TransactionInDB
+    TransactionDB, TransactionBase, TransactionCreate, TransactionUpdate, TransactionInDB
 )
+from .filters import build_filters, validate_columns, validate_values
+from .read_modes import read_rows
+from ..utils.profiling import profiled
 
 
+@profiled("crud")
 def create_asset(db: Session, asset: AssetCreate) -> AssetInDB:
     """创建新资产"""
     db_asset = AssetDB(**asset.model_dump())
@@ -21,6 +25,81 @@ def create_asset(db: Session, asset: AssetCreate) -> AssetInDB:
     return AssetInDB.model_validate(db_asset)
 
 
+@profiled("crud")
+def create_assets(db: Session, assets: List[AssetCreate]) -> List[int]:
+    """批量创建资产（一条多行 INSERT），按输入顺序返回新资产ID"""
+    if not assets:
+        return []
+    stmt = insert(AssetDB).returning(AssetDB.asset_id, sort_by_parameter_order=True)
+    ids = db.scalars(stmt, [asset.model_dump() for asset in assets]).all()
+    db.commit()
+    return list(ids)
+
+
+# 按资产编码 upsert 时更新的列（created_date 只在新建时写入）
+ASSET_UPSERT_COLUMNS = ("asset_name", "asset_type", "issuer", "industry", "region")
+
+
+def upsert_statement(dialect: str, table: Any) -> Any:
+    """带 ON CONFLICT 子句的 INSERT 构造器（sqlite / postgresql）"""
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        raise ValueError(f"不支持的数据库方言: {dialect}")
+    return dialect_insert(table)
+
+
+@profiled("crud")
+def upsert_assets(db: Session, assets: List[AssetCreate]) -> Dict[str, int]:
+    """按资产编码批量插入或更新资产（INSERT ... ON CONFLICT DO UPDATE 以 executemany 执行），提交后返回计数
+
+    同一批内的资产编码须唯一。写入前以一条查询读出已有资产，据此分类计数：已存在且各列均未变化的资产不发出写入，
+    计入 skipped；无资产编码的资产总是新建。
+
+    Returns:
+        Dict[str, int]: {"inserted": 新建数, "updated": 更新数, "skipped": 未变化数}
+    """
+    if not assets:
+        return {"inserted": 0, "updated": 0, "skipped": 0}
+    rows = [asset.model_dump() for asset in assets]
+    codes = [row["asset_code"] for row in rows if row["asset_code"] is not None]
+    # 计数由写入前读出的已有行比较得出（executemany 的 rowcount 在不同驱动下不可靠）
+    existing = {}
+    if codes:
+        stmt = select(AssetDB.asset_code, *[getattr(AssetDB, name) for name in ASSET_UPSERT_COLUMNS])
+        existing = {row[0]: tuple(row[1:]) for row in db.execute(stmt.where(AssetDB.asset_code.in_(codes)))}
+    pending = []
+    inserted = updated = 0
+    for row in rows:
+        current = existing.get(row["asset_code"]) if row["asset_code"] is not None else None
+        if current is None:
+            inserted += 1
+        elif current != tuple(row[name] for name in ASSET_UPSERT_COLUMNS):
+            updated += 1
+        else:
+            continue  # 未变化的资产不发出写入
+        if row["created_date"] is None:
+            row["created_date"] = date.today()
+        pending.append(row)
+
+    if pending:
+        # 单条语句按参数列表执行（语句只编译一次，避免多行 VALUES 为每个值生成绑定参数）
+        stmt = upsert_statement(db.get_bind().dialect.name, AssetDB)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AssetDB.asset_code],
+            set_={name: excluded[name] for name in ASSET_UPSERT_COLUMNS},
+            # 只更新确有变化的行（读取之后被并发修改为相同值时不重复写）
+            where=or_(*[getattr(AssetDB, name).is_distinct_from(excluded[name]) for name in ASSET_UPSERT_COLUMNS]),
+        )
+        db.connection().execute(stmt, pending)
+    db.commit()
+    return {"inserted": inserted, "updated": updated, "skipped": len(rows) - inserted - updated}
+
+
+@profiled("crud")
 def get_asset(db: Session, asset_id: int) -> Optional[AssetInDB]:
     """根据ID获取资产"""
     db_asset = db.query(AssetDB).filter(AssetDB.asset_id == asset_id).first()
@@ -29,6 +108,7 @@ def get_asset(db: Session, asset_id: int) -> Optional[AssetInDB]:
     return None
 
 
+@profiled("crud")
 def get_asset_by_code(db: Session, asset_code: str) -> Optional[AssetInDB]:
     """根据资产代码获取资产"""
     db_asset = db.query(AssetDB).filter(AssetDB.asset_code == asset_code).first()
@@ -37,12 +117,14 @@ def get_asset_by_code(db: Session, asset_code: str) -> Optional[AssetInDB]:
     return None
 
 
-def get_assets(db: Session, skip: int = 0, limit: int = 100) -> List[AssetInDB]:
-    """获取资产列表"""
-    db_assets = db.query(AssetDB).offset(skip).limit(limit).all()
-    return [AssetInDB.model_validate(asset) for asset in db_assets]
+@profiled("crud")
+def get_assets(db: Session, skip: int = 0, limit: int = 100, mode: str = "validate") -> Any:
+    """获取资产列表（mode 见 read_modes.READ_MODES，默认逐行校验）"""
+    query = db.query(AssetDB).offset(skip).limit(limit)
+    return read_rows(query, AssetDB, AssetInDB, mode)
 
 
+@profiled("crud")
 def update_asset(db: Session, asset_id: int, asset: AssetUpdate) -> Optional[AssetInDB]:
     """更新资产信息"""
     db_asset = db.query(AssetDB).filter(AssetDB.asset_id == asset_id).first()
@@ -55,6 +137,7 @@ def update_asset(db: Session, asset_id: int, asset: AssetUpdate) -> Optional[Ass
     return None
 
 
+@profiled("crud")
 def delete_asset(db: Session, asset_id: int) -> bool:
     """删除资产"""
     db_asset = db.query(AssetDB).filter(AssetDB.asset_id == asset_id).first()
@@ -65,6 +148,7 @@ def delete_asset(db: Session, asset_id: int) -> bool:
     return False
 
 
+@profiled("crud")
 def create_transaction(db: Session, transaction: TransactionCreate) -> TransactionInDB:
     """创建新交易"""
     # 如果没有提供清算金额，根据数量和单位全价计算
@@ -79,6 +163,54 @@ def create_transaction(db: Session, transaction: TransactionCreate) -> Transacti
     return TransactionInDB.model_validate(db_transaction)
 
 
+@profiled("crud")
+def create_transactions(db: Session, transactions: List[TransactionCreate]) -> List[int]:
+    """批量创建交易（一条多行 INSERT），按输入顺序返回新交易ID；清算金额规则同 create_transaction"""
+    if not transactions:
+        return []
+    rows = []
+    for transaction in transactions:
+        data = transaction.model_dump()
+        if data["settlement_amount"] is None and data["unit_full_price"] is not None:
+            data["settlement_amount"] = data["quantity"] * data["unit_full_price"]
+        rows.append(data)
+    stmt = insert(TransactionDB).returning(TransactionDB.transaction_id, sort_by_parameter_order=True)
+    ids = db.scalars(stmt, rows).all()
+    db.commit()
+    return list(ids)
+
+
+@profiled("crud")
+def insert_transaction_columns(db: Session, columns: Dict[str, List[Any]]) -> int:
+    """按列插入交易（列名同 TransactionDB；日期为 YYYY-MM-DD 字符串，缺失值为 None），提交后返回插入行数
+
+    供大批量导入使用：先按 TransactionCreate 的字段类型整列校验（不合法时抛出 ValueError，不写入），
+    再把各行组成元组以 executemany 直接交给数据库驱动，不构造 ORM 对象、Pydantic 模型与参数字典。
+    """
+    names = list(columns)
+    unknown = set(names) - set(TransactionDB.__table__.columns.keys())
+    if unknown:
+        raise ValueError(f"transactions 不存在列: {', '.join(sorted(unknown))}")
+    count = len(columns[names[0]]) if names else 0
+    if not count:
+        return 0
+    validate_columns(TransactionCreate, columns, ignore=("transaction_id",))
+    connection = db.connection()
+    paramstyle = connection.dialect.paramstyle
+    if paramstyle == "qmark":
+        marker = "?"
+    elif paramstyle in ("format", "pyformat"):
+        marker = "%s"
+    else:
+        raise ValueError(f"不支持的参数风格: {paramstyle}")
+    sql = (f"INSERT INTO {TransactionDB.__tablename__} ({', '.join(names)}) "
+           f"VALUES ({', '.join([marker] * len(names))})")
+    connection.exec_driver_sql(sql, list(zip(*(columns[name] for name in names))))
+    db.commit()
+    return count
+
+
+@profiled("crud")
 def get_transaction(db: Session, transaction_id: int) -> Optional[TransactionInDB]:
     """根据ID获取交易"""
     db_transaction = db.query(TransactionDB).filter(TransactionDB.transaction_id == transaction_id).first()
@@ -87,35 +219,40 @@ def get_transaction(db: Session, transaction_id: int) -> Optional[TransactionInD
     return None
 
 
-def get_transactions(db: Session, skip: int = 0, limit: int = 100) -> List[TransactionInDB]:
-    """获取交易列表"""
-    db_transactions = db.query(TransactionDB).offset(skip).limit(limit).all()
-    return [TransactionInDB.model_validate(transaction) for transaction in db_transactions]
+@profiled("crud")
+def get_transactions(db: Session, skip: int = 0, limit: int = 100, mode: str = "validate") -> Any:
+    """获取交易列表（mode 见 read_modes.READ_MODES，默认逐行校验）"""
+    query = db.query(TransactionDB).offset(skip).limit(limit)
+    return read_rows(query, TransactionDB, TransactionInDB, mode)
 
 
-def get_transactions_by_product(db: Session, product_id: int) -> List[TransactionInDB]:
+@profiled("crud")
+def get_transactions_by_product(db: Session, product_id: int, mode: str = "validate") -> Any:
     """根据产品ID获取交易列表"""
-    db_transactions = db.query(TransactionDB).filter(TransactionDB.product_id == product_id).all()
-    return [TransactionInDB.model_validate(transaction) for transaction in db_transactions]
+    query = db.query(TransactionDB).filter(TransactionDB.product_id == product_id)
+    return read_rows(query, TransactionDB, TransactionInDB, mode)
 
 
-def get_transactions_by_asset(db: Session, asset_id: int) -> List[TransactionInDB]:
+@profiled("crud")
+def get_transactions_by_asset(db: Session, asset_id: int, mode: str = "validate") -> Any:
     """根据资产ID获取交易列表"""
-    db_transactions = db.query(TransactionDB).filter(TransactionDB.asset_id == asset_id).all()
-    return [TransactionInDB.model_validate(transaction) for transaction in db_transactions]
+    query = db.query(TransactionDB).filter(TransactionDB.asset_id == asset_id)
+    return read_rows(query, TransactionDB, TransactionInDB, mode)
 
 
-def get_transactions_by_date_range(db: Session, start_date: date, end_date: date) -> List[TransactionInDB]:
+@profiled("crud")
+def get_transactions_by_date_range(db: Session, start_date: date, end_date: date, mode: str = "validate") -> Any:
     """根据日期范围获取交易列表"""
-    db_transactions = db.query(TransactionDB).filter(
+    query = db.query(TransactionDB).filter(
         and_(
             TransactionDB.investment_date >= start_date,
             TransactionDB.investment_date <= end_date
         )
-    ).all()
-    return [TransactionInDB.model_validate(transaction) for transaction in db_transactions]
+    )
+    return read_rows(query, TransactionDB, TransactionInDB, mode)
 
 
+@profiled("crud")
 def update_transaction(db: Session, transaction_id: int, transaction: TransactionUpdate) -> Optional[TransactionInDB]:
     """更新交易信息"""
     db_transaction = db.query(TransactionDB).filter(TransactionDB.transaction_id == transaction_id).first()
@@ -136,6 +273,7 @@ def update_transaction(db: Session, transaction_id: int, transaction: Transactio
     return None
 
 
+@profiled("crud")
 def delete_transaction(db: Session, transaction_id: int) -> bool:
     """删除交易"""
     db_transaction = db.query(TransactionDB).filter(TransactionDB.transaction_id == transaction_id).first()
@@ -143,4 +281,44 @@ def delete_transaction(db: Session, transaction_id: int) -> bool:
         db.delete(db_transaction)
         db.commit()
         return True
-    return False
\ No newline at end of file
+    return False
+
+
+@profiled("crud")
+def update_transactions_where(db: Session, filters: Dict[str, Any], values: Dict[str, Any]) -> int:
+    """按条件批量更新交易（单条 UPDATE 语句）
+
+    更新数量或单位全价且未显式给出清算金额时，在 SQL 中按 数量*全价 重算清算金额（未给出的一方取该行原值）；
+    显式置为 None 时不重算，乘积为 NULL 的行保留原清算金额（与 update_transaction 一致）。
+
+    Args:
+        db: 数据库会话
+        filters: 过滤条件，如 {"asset_id": 3, "investment_date": date(2025, 8, 1)}
+        values: 待更新的字段与值
+
+    Returns:
+        int: 受影响的行数
+    """
+    clauses = build_filters(TransactionDB, filters)
+    data: Dict[str, Any] = validate_values(TransactionBase, values)
+    recompute = ('quantity' in data or 'unit_full_price' in data) and 'settlement_amount' not in data
+    if recompute and data.get('quantity', 0) is not None and data.get('unit_full_price', 0) is not None:
+        # 只有未出现在 values 中的一方才取该行原值
+        quantity = data['quantity'] if 'quantity' in data else TransactionDB.quantity
+        unit_full_price = data['unit_full_price'] if 'unit_full_price' in data else TransactionDB.unit_full_price
+        data['settlement_amount'] = func.coalesce(quantity * unit_full_price, TransactionDB.settlement_amount)
+
+    stmt = update(TransactionDB).where(*clauses).values(**data).execution_options(synchronize_session=False)
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+@profiled("crud")
+def delete_transactions_where(db: Session, filters: Dict[str, Any]) -> int:
+    """按条件批量删除交易（单条 DELETE 语句），返回受影响的行数"""
+    clauses = build_filters(TransactionDB, filters)
+    stmt = delete(TransactionDB).where(*clauses).execution_options(synchronize_session=False)
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
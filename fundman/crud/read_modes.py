@@ -0,0 +1,108 @@
+"""
+只读查询的快速路径（trusted read）
+
+读接口默认逐行执行 ``Model.model_validate(orm_obj)``，在大批量读取时校验开销占主导。
+数据库中的数据已在写入路径上校验过，因此读路径可按调用方要求跳过校验：
+
+- ``validate``：默认模式，加载 ORM 对象并逐行 Pydantic 校验（原有行为）
+- ``construct``：按列查询，使用 ``model_construct`` 构造 Pydantic 实例（不校验）
+- ``row``：按列查询，构造带 ``__slots__`` 的轻量行对象
+- ``tuple``：按列查询，直接返回原始元组（列顺序与表定义一致）
+- ``dataframe``：通过 ``pd.read_sql`` 返回 DataFrame（日期列解析为 datetime64）
+"""
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Date
+from sqlalchemy.orm import Query
+
+READ_MODES: Tuple[str, ...] = ("validate", "construct", "row", "tuple", "dataframe")
+
+_ROW_CLASSES: Dict[str, type] = {}
+
+
+class SlotRow:
+    """带 ``__slots__`` 的轻量行对象基类（字段由子类的 ``__slots__`` 决定）"""
+    __slots__ = ()
+
+    def __init__(self, *values: Any) -> None:
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def model_dump(self) -> Dict[str, Any]:
+        """转换为字典（与 Pydantic 模型的 model_dump 保持一致的调用方式）"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.model_dump() == other.model_dump()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def column_names(orm_model: type) -> List[str]:
+    """按表定义顺序返回 ORM 模型的列名"""
+    return [column.key for column in orm_model.__table__.columns]
+
+
+def row_class(schema: Type[BaseModel], fields: Sequence[str]) -> type:
+    """获取（并缓存）与 Pydantic 模型同名字段的 ``__slots__`` 行类"""
+    name = f"{schema.__name__}Row"
+    cls = _ROW_CLASSES.get(name)
+    if cls is None:
+        cls = type(name, (SlotRow,), {"__slots__": tuple(fields)})
+        _ROW_CLASSES[name] = cls
+    return cls
+
+
+def check_read_mode(mode: str) -> None:
+    """校验读取模式名称"""
+    if mode not in READ_MODES:
+        raise ValueError(f"不支持的读取模式: {mode}（可选: {', '.join(READ_MODES)}）")
+
+
+def read_rows(query: Query, orm_model: type, schema: Type[BaseModel], mode: str = "validate") -> Any:
+    """按指定模式执行查询
+
+    Args:
+        query: 以 ORM 实体为查询对象的 Query（可带过滤、排序、分页）
+        orm_model: SQLAlchemy 模型类
+        schema: 对应的 Pydantic 模型类（validate/construct 模式使用）
+        mode: 读取模式，见 READ_MODES
+
+    Returns:
+        validate/construct/row/tuple 模式返回列表，dataframe 模式返回 DataFrame
+    """
+    check_read_mode(mode)
+    if mode == "validate":
+        return [schema.model_validate(obj) for obj in query.all()]
+
+    columns = list(orm_model.__table__.columns)
+    column_query = query.with_entities(*columns)
+    fields = [column.key for column in columns]
+
+    if mode == "dataframe":
+        import pandas as pd
+        date_columns = [column.key for column in columns if isinstance(column.type, Date)]
+        return pd.read_sql(column_query.statement, query.session.connection(), parse_dates=date_columns)
+
+    rows = column_query.all()
+    if mode == "tuple":
+        return [tuple(row) for row in rows]
+    if mode == "row":
+        cls = row_class(schema, fields)
+        return [cls(*row) for row in rows]
+    # construct
+    construct = schema.model_construct
+    return [construct(**dict(zip(fields, row))) for row in rows]
+
+
+def iter_rows(query: Query, orm_model: type, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """按列流式读取（yield_per 分批拉取），逐行产出字典，供大结果集流式输出"""
+    columns = list(orm_model.__table__.columns)
+    fields = [column.key for column in columns]
+    for row in query.with_entities(*columns).yield_per(batch_size):
+        yield dict(zip(fields, row))
@@ -1,20 +1,27 @@
+from sqlalchemy import case, cast, delete, func, insert, literal, update, Integer
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import date
-from ..models import WealthProductDB, WealthProductCreate, WealthProductUpdate, WealthProductInDB
+from ..models import WealthProductDB, WealthProductBase, WealthProductCreate, WealthProductUpdate, WealthProductInDB
 from ..utils.date_utils import parse_date, days_remaining_on
+from .filters import build_filters, validate_values
+from .read_modes import check_read_mode, column_names, read_rows
+from ..utils.profiling import profiled
 
 
+@profiled("crud")
 def get_product_by_yindeng_code(db: Session, yindeng_code: str) -> Optional[WealthProductDB]:
     """根据银登编码获取产品"""
     return db.query(WealthProductDB).filter(WealthProductDB.product_yindeng_code == yindeng_code).first()
 
 
+@profiled("crud")
 def get_products(db: Session, skip: int = 0, limit: int = 100) -> List[WealthProductDB]:
     """获取产品列表"""
     return db.query(WealthProductDB).offset(skip).limit(limit).all()
 
 
+@profiled("crud")
 def create_product(db: Session, product: WealthProductCreate) -> WealthProductDB:
     """创建产品"""
     db_product = WealthProductDB(**product.model_dump())
@@ -24,6 +31,18 @@ def create_product(db: Session, product: WealthProductCreate) -> WealthProductDB
     return db_product
 
 
+@profiled("crud")
+def create_products(db: Session, products: List[WealthProductCreate]) -> List[int]:
+    """批量创建产品（一条多行 INSERT），按输入顺序返回新产品ID；银登编码重复时整批失败"""
+    if not products:
+        return []
+    stmt = insert(WealthProductDB).returning(WealthProductDB.product_id, sort_by_parameter_order=True)
+    ids = db.scalars(stmt, [product.model_dump() for product in products]).all()
+    db.commit()
+    return list(ids)
+
+
+@profiled("crud")
 def update_product(db: Session, product_id: int, product: WealthProductUpdate) -> Optional[WealthProductDB]:
     """更新产品"""
     db_product = db.query(WealthProductDB).filter(WealthProductDB.product_id == product_id).first()
@@ -36,6 +55,7 @@ def update_product(db: Session, product_id: int, product: WealthProductUpdate) -
     return db_product
 
 
+@profiled("crud")
 def upsert_product_by_yindeng_code(db: Session, product: WealthProductCreate) -> WealthProductDB:
     """根据银登编码插入或更新产品"""
     # 检查银登编码是否为空
@@ -57,27 +77,154 @@ def upsert_product_by_yindeng_code(db: Session, product: WealthProductCreate) ->
         return create_product(db, product)
 
 
+@profiled("crud")
+def update_products_where(db: Session, filters: Dict[str, Any], values: Dict[str, Any]) -> int:
+    """按条件批量更新产品（单条 UPDATE 语句），返回受影响的行数"""
+    clauses = build_filters(WealthProductDB, filters)
+    data = validate_values(WealthProductBase, values)
+    stmt = update(WealthProductDB).where(*clauses).values(**data).execution_options(synchronize_session=False)
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+@profiled("crud")
+def delete_products_where(db: Session, filters: Dict[str, Any]) -> int:
+    """按条件批量删除产品（单条 DELETE 语句，不级联删除交易），返回受影响的行数"""
+    clauses = build_filters(WealthProductDB, filters)
+    stmt = delete(WealthProductDB).where(*clauses).execution_options(synchronize_session=False)
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+def days_until_expression(end_column: Any, query_date: date, dialect: str) -> Any:
+    """SQL 表达式：查询日期到 end_column 的天数（不小于 0），供整表 UPDATE 使用"""
+    if dialect == "sqlite":
+        days = cast(func.julianday(end_column) - func.julianday(query_date.isoformat()), Integer)
+    elif dialect == "postgresql":
+        # date - date 直接得到整数天数
+        days = end_column - literal(query_date)
+    else:
+        raise ValueError(f"不支持的数据库方言: {dialect}")
+    return case((days < 0, 0), else_=days)
+
+
+@profiled("crud")
+def rollforward_products(db: Session, query_date_str: str, filters: Optional[Dict[str, Any]] = None) -> int:
+    """把产品滚动到新的查询日期：单条 UPDATE 写入 product_query_date 并在库内重算 product_days_remaining
+
+    filters 同 update_products_where（为空时作用于全部产品），返回受影响的行数。
+    """
+    query_date = date.fromisoformat(parse_date(query_date_str))
+    clauses = build_filters(WealthProductDB, filters, allow_all=True)
+    days = days_until_expression(WealthProductDB.product_end_date, query_date, db.get_bind().dialect.name)
+    stmt = (
+        update(WealthProductDB)
+        .where(*clauses)
+        .values(product_query_date=query_date, product_days_remaining=days)
+        .execution_options(synchronize_session=False)
+    )
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+@profiled("crud")
 def get_all_products(db: Session) -> List[WealthProductDB]:
     """获取所有产品"""
     return db.query(WealthProductDB).all()
 
 
+# 可按日期范围查询的列、可取前 N 名的列（均建有索引，范围扫描与 ORDER BY ... LIMIT 直接走索引）
+PRODUCT_DATE_COLUMNS = ("product_end_date", "product_start_date")
+PRODUCT_RANK_COLUMNS = ("product_raise_amount", "product_performance_benchmark")
+
+
+def _indexed_column(name: str, allowed: tuple) -> Any:
+    if name not in allowed:
+        raise ValueError(f"不支持的列: {name}（可选: {', '.join(allowed)}）")
+    return getattr(WealthProductDB, name)
+
+
+def products_in_date_range_query(
+    db: Session,
+    column: str = "product_end_date",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: Optional[int] = None,
+) -> Any:
+    """日期列落在 [date_from, date_to]（含两端，缺省为不限）内的产品查询，按该列升序"""
+    col = _indexed_column(column, PRODUCT_DATE_COLUMNS)
+    query = db.query(WealthProductDB)
+    if date_from is not None:
+        query = query.filter(col >= date_from)
+    if date_to is not None:
+        query = query.filter(col <= date_to)
+    # 单列索引隐含 rowid（即 product_id），按 (列, product_id) 排序仍由索引直接给出
+    query = query.order_by(col, WealthProductDB.product_id)
+    return query.limit(limit) if limit is not None else query
+
+
+def top_products_query(db: Session, column: str = "product_raise_amount", limit: int = 50, ascending: bool = False) -> Any:
+    """按数值列排序取前 limit 个产品的查询（忽略空值），默认降序"""
+    col = _indexed_column(column, PRODUCT_RANK_COLUMNS)
+    order = (col.asc(), WealthProductDB.product_id.asc()) if ascending else (col.desc(), WealthProductDB.product_id.desc())
+    return db.query(WealthProductDB).filter(col.isnot(None)).order_by(*order).limit(limit)
+
+
+@profiled("crud")
+def get_products_in_date_range(
+    db: Session,
+    column: str = "product_end_date",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: Optional[int] = None,
+    mode: str = "validate",
+) -> Any:
+    """按到期日/起息日范围获取产品（如未来 30 天内到期），mode 见 read_modes.READ_MODES"""
+    return read_rows(products_in_date_range_query(db, column, date_from, date_to, limit),
+                     WealthProductDB, WealthProductInDB, mode)
+
+
+@profiled("crud")
+def get_top_products(
+    db: Session,
+    column: str = "product_raise_amount",
+    limit: int = 50,
+    ascending: bool = False,
+    mode: str = "validate",
+) -> Any:
+    """按募集金额/业绩基准取前 N 个产品，mode 见 read_modes.READ_MODES"""
+    return read_rows(top_products_query(db, column, limit, ascending), WealthProductDB, WealthProductInDB, mode)
+
+
+@profiled("crud")
 def get_products_by_query_date(db: Session, query_date: date) -> List[WealthProductDB]:
     """根据查询日期获取产品"""
     return db.query(WealthProductDB).filter(WealthProductDB.product_query_date == query_date).all()
 
 
-def query_dynamic(db: Session, query_date_str: str) -> List[WealthProductDB]:
+@profiled("crud")
+def query_dynamic(db: Session, query_date_str: str, mode: str = "validate", business_days: bool = False) -> Any:
     """动态查询产品（根据查询日期计算剩余期限）
     
     Args:
         db: 数据库会话
         query_date_str: 查询日期字符串
+        mode: 读取模式（见 read_modes.READ_MODES）；非 validate 模式跳过逐行 Pydantic 校验
+        business_days: 为真时剩余天数按工作日日历计算（整列一次计算）
         
     Returns:
-        List[WealthProductDB]: 产品列表，包含动态计算的剩余天数
+        List[WealthProductDB]: 产品列表，包含动态计算的剩余天数；
+        dataframe 模式返回 DataFrame
     """
     query_date = parse_date(query_date_str)
+    check_read_mode(mode)
+    if business_days:
+        return _query_dynamic_business_days(db, query_date, mode)
+    if mode != "validate":
+        return _query_dynamic_trusted(db, query_date, mode)
     
     # 获取所有产品
     all_products = get_all_products(db)
@@ -97,4 +244,64 @@ def query_dynamic(db: Session, query_date_str: str) -> List[WealthProductDB]:
             product_data.product_days_remaining = days_remaining
             results.append(product_data)
     
-    return results
\ No newline at end of file
+    return results
+
+
+def _query_dynamic_business_days(db: Session, query_date: str, mode: str) -> Any:
+    """query_dynamic 的工作日版本：先读出全部产品，再对到期日整列计算剩余工作日"""
+    from ..utils.calendar import get_calendar
+
+    query = db.query(WealthProductDB).filter(WealthProductDB.product_end_date.isnot(None))
+    if mode == "validate":
+        rows = [WealthProductInDB.model_validate(product) for product in query.all()]
+    else:
+        rows = read_rows(query, WealthProductDB, WealthProductInDB, mode)
+
+    calendar = get_calendar()
+    if mode == "dataframe":
+        rows["product_days_remaining"] = calendar.business_days_remaining(rows["product_end_date"], query_date)
+        return rows
+    if mode == "tuple":
+        names = column_names(WealthProductDB)
+        end_idx = names.index("product_end_date")
+        days_idx = names.index("product_days_remaining")
+        remaining = calendar.business_days_remaining([row[end_idx] for row in rows], query_date).tolist()
+        results = []
+        for row, days in zip(rows, remaining):
+            values = list(row)
+            values[days_idx] = days
+            results.append(tuple(values))
+        return results
+    remaining = calendar.business_days_remaining([row.product_end_date for row in rows], query_date).tolist()
+    for row, days in zip(rows, remaining):
+        row.product_days_remaining = days
+    return rows
+
+
+def _query_dynamic_trusted(db: Session, query_date: str, mode: str) -> Any:
+    """query_dynamic 的免校验实现（按列读取后再计算剩余天数）"""
+    query = db.query(WealthProductDB).filter(WealthProductDB.product_end_date.isnot(None))
+    rows = read_rows(query, WealthProductDB, WealthProductInDB, mode)
+    qd = date.fromisoformat(query_date)
+
+    if mode == "dataframe":
+        import pandas as pd
+        remaining = (rows["product_end_date"] - pd.Timestamp(qd)).dt.days
+        rows["product_days_remaining"] = remaining.clip(lower=0).astype("int64")
+        return rows
+
+    if mode == "tuple":
+        names = column_names(WealthProductDB)
+        end_idx = names.index("product_end_date")
+        days_idx = names.index("product_days_remaining")
+        results = []
+        for row in rows:
+            values = list(row)
+            values[days_idx] = max(0, (row[end_idx] - qd).days)
+            results.append(tuple(values))
+        return results
+
+    # row / construct：直接在对象上写入剩余天数
+    for row in rows:
+        row.product_days_remaining = max(0, (row.product_end_date - qd).days)
+    return rows
@@ -1,13 +1,23 @@
 import csv
+import json
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+from sqlalchemy.orm import Session
 from .utils.date_utils import parse_date, days_between, days_remaining_on
 from .database import get_db
-from .crud import get_all_products, upsert_product_by_yindeng_code
-from .models import WealthProductCreate, WealthProductInDB
+from .crud import get_all_products, insert_transaction_columns, upsert_assets, upsert_product_by_yindeng_code
+from .crud.read_modes import check_read_mode
+from .models import AssetCreate, WealthProductCreate, WealthProductInDB
+from .utils.memory import MemoryBudget, format_size
+from .utils.profiling import span
 from datetime import date
 
+if TYPE_CHECKING:
+    from .analytics.product_table import ProductTable
+
 
 def parse_float(s: Optional[str]) -> Optional[float]:
     """解析浮点数，支持百分比格式"""
@@ -23,8 +33,12 @@ def parse_float(s: Optional[str]) -> Optional[float]:
     return float(s.replace(",", ""))
 
 
-def import_data_file(file_path: str, query_date: Optional[str] = None) -> None:
-    """从数据文件（CSV/XLS/XLSX）导入数据"""
+def import_data_file(file_path: str, query_date: Optional[str] = None, max_memory: Optional[int] = None) -> None:
+    """从数据文件（CSV/XLS/XLSX）导入数据
+
+    max_memory（字节）为空时一次读入整个文件并在最后统一提交；
+    设置后按批流式读取，每批提交并清空会话，批大小随内存占用在预算内自适应调整（见 _import_bounded）。
+    """
     # 如果路径不是绝对路径，尝试在data目录中查找
     path = Path(file_path)
     if not path.exists() and not path.is_absolute():
@@ -35,15 +49,20 @@ def import_data_file(file_path: str, query_date: Optional[str] = None) -> None:
     # 检测文件扩展名并选择适当的读取方法
     file_extension = path.suffix.lower()
     
-    if file_extension == '.csv':
-        df = pd.read_csv(path, encoding='utf-8')
-    elif file_extension in ['.xls', '.xlsx']:
-        df = pd.read_excel(path)
-    else:
+    if file_extension not in ['.csv', '.xls', '.xlsx']:
         raise ValueError(f"不支持的文件格式: {file_extension}")
-    
+
     # 统一为 YYYY-MM-DD 字符串契约，再按需要转换为 date
     qd_norm = parse_date(query_date) if query_date else None
+    if max_memory is not None:
+        _import_bounded(path, qd_norm, max_memory)
+        return
+
+    with span("import.read", path=path):
+        if file_extension == '.csv':
+            df = pd.read_csv(path, encoding='utf-8')
+        else:
+            df = pd.read_excel(path)
 
     # 获取数据库会话
     db_gen = get_db()
@@ -52,121 +71,928 @@ def import_data_file(file_path: str, query_date: Optional[str] = None) -> None:
         count = 0
         # 将DataFrame转换为字典列表并逐行处理
         for row_num, (index, row) in enumerate(df.iterrows(), start=1):
-            # 将pandas的NaN值转换为None，以便数据库处理
-            r = {k: v if pd.notna(v) else None for k, v in row.to_dict().items()}
-            
-            name = (r.get("产品名称") or r.get("product_name") or "").strip()
-            if not name:
-                raise ValueError(f"第{row_num}行缺少 产品名称")
-
-            start_date_str = r.get("起息日") or r.get("product_start_date") or ""
-            end_date_str = r.get("到期日") or r.get("product_end_date") or ""
-            
-            # 规范化为 YYYY-MM-DD 字符串（date_utils 合同）
-            start_date_norm = parse_date(start_date_str) if start_date_str else None
-            end_date_norm = parse_date(end_date_str) if end_date_str else None
-            
-            # 只有当起息日和到期日都存在时才计算总天数
-            days_total_val = days_between(start_date_norm, end_date_norm) if start_date_norm and end_date_norm else 0
-
-            perf = parse_float(r.get("业绩基准") or r.get("product_performance_benchmark"))
-            raise_target = parse_float(r.get("募集目标") or r.get("product_raise_target"))
-            raise_amount = parse_float(r.get("募集金额") or r.get("product_raise_amount"))
-            raise_inst = parse_float(r.get("机构募集") or r.get("product_raise_institutional"))
-            raise_retail = parse_float(r.get("个人募集") or r.get("product_raise_retail"))
-
-            # 将规范化字符串转为 date 对象；若缺失则使用今天作为保底，满足 Pydantic 字段为 date 的类型要求
-            start_date_obj = date.fromisoformat(start_date_norm) if start_date_norm else date.today()
-            end_date_obj = date.fromisoformat(end_date_norm) if end_date_norm else date.today()
-            query_date_obj = date.fromisoformat(qd_norm) if qd_norm else None
-            
-            product_create = WealthProductCreate(
-                product_name=name,
-                product_yindeng_code=(r.get("银登编码") or r.get("product_yindeng_code") or "").strip() or None,
-                product_jinshu_code=(r.get("金数编码") or r.get("product_jinshu_code") or "").strip() or None,
-                product_custody_code=(r.get("托管编码") or r.get("product_custody_code") or "").strip() or None,
-                product_start_date=start_date_obj,
-                product_end_date=end_date_obj,
-                product_days_total=days_total_val,
-                product_query_date=query_date_obj,
-                product_days_remaining=days_remaining_on(end_date_norm, qd_norm) if end_date_norm and qd_norm else None,
-                product_performance_benchmark=perf,
-                product_raise_target=raise_target,
-                product_raise_amount=raise_amount,
-                product_raise_institutional=raise_inst,
-                product_raise_retail=raise_retail,
-            )
-            
-            # 使用CRUD操作插入或更新产品
-            upsert_product_by_yindeng_code(db, product_create)
-            count += 1
-        db.commit()
+            product_create = _build_product(row.to_dict(), row_num, qd_norm)
+            with span("import.write"):
+                # 使用CRUD操作插入或更新产品
+                upsert_product_by_yindeng_code(db, product_create)
+                count += 1
+        with span("import.commit"):
+            db.commit()
         print(f"导入完成：{count} 条")
     finally:
         db.close()
 
-def export_data_file(output_path: str, query_date: Optional[str] = None) -> None:
-    """导出数据到文件(CSV/XLS/XLSX)"""
+
+def _build_product(record: dict, row_num: int, qd_norm: Optional[str]) -> WealthProductCreate:
+    """将一行原始记录（中文或英文表头）规范化并校验为 WealthProductCreate"""
+    with span("import.normalize"):
+        # 将pandas的NaN值转换为None，以便数据库处理
+        r = {k: v if pd.notna(v) else None for k, v in record.items()}
+
+        name = (r.get("产品名称") or r.get("product_name") or "").strip()
+        if not name:
+            raise ValueError(f"第{row_num}行缺少 产品名称")
+
+        start_date_str = r.get("起息日") or r.get("product_start_date") or ""
+        end_date_str = r.get("到期日") or r.get("product_end_date") or ""
+
+        # 规范化为 YYYY-MM-DD 字符串（date_utils 合同）
+        start_date_norm = parse_date(start_date_str) if start_date_str else None
+        end_date_norm = parse_date(end_date_str) if end_date_str else None
+
+        # 只有当起息日和到期日都存在时才计算总天数
+        days_total_val = days_between(start_date_norm, end_date_norm) if start_date_norm and end_date_norm else 0
+
+        perf = parse_float(r.get("业绩基准") or r.get("product_performance_benchmark"))
+        raise_target = parse_float(r.get("募集目标") or r.get("product_raise_target"))
+        raise_amount = parse_float(r.get("募集金额") or r.get("product_raise_amount"))
+        raise_inst = parse_float(r.get("机构募集") or r.get("product_raise_institutional"))
+        raise_retail = parse_float(r.get("个人募集") or r.get("product_raise_retail"))
+
+        # 将规范化字符串转为 date 对象；若缺失则使用今天作为保底，满足 Pydantic 字段为 date 的类型要求
+        start_date_obj = date.fromisoformat(start_date_norm) if start_date_norm else date.today()
+        end_date_obj = date.fromisoformat(end_date_norm) if end_date_norm else date.today()
+        query_date_obj = date.fromisoformat(qd_norm) if qd_norm else None
+
+    with span("import.validate"):
+        return WealthProductCreate(
+            product_name=name,
+            product_yindeng_code=(r.get("银登编码") or r.get("product_yindeng_code") or "").strip() or None,
+            product_jinshu_code=(r.get("金数编码") or r.get("product_jinshu_code") or "").strip() or None,
+            product_custody_code=(r.get("托管编码") or r.get("product_custody_code") or "").strip() or None,
+            product_start_date=start_date_obj,
+            product_end_date=end_date_obj,
+            product_days_total=days_total_val,
+            product_query_date=query_date_obj,
+            product_days_remaining=days_remaining_on(end_date_norm, qd_norm) if end_date_norm and qd_norm else None,
+            product_performance_benchmark=perf,
+            product_raise_target=raise_target,
+            product_raise_amount=raise_amount,
+            product_raise_institutional=raise_inst,
+            product_raise_retail=raise_retail,
+        )
+
+
+def _read_batches(path: Path, batch_size: Callable[[], int]) -> Iterator[List[dict]]:
+    """按批读取数据文件为记录列表；每批读取前调用 batch_size() 决定本批行数"""
+    file_extension = path.suffix.lower()
+    if file_extension == '.csv':
+        # 按字符串读取，避免各块独立推断出不同的列类型
+        with pd.read_csv(path, encoding='utf-8', dtype=str, iterator=True) as reader:
+            while True:
+                try:
+                    chunk = reader.get_chunk(batch_size())
+                except StopIteration:
+                    return
+                yield chunk.to_dict("records")
+    elif file_extension == '.xlsx':
+        from openpyxl import load_workbook
+        # 只读模式逐行解析工作表，不在内存中保留整个工作簿
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = ["" if value is None else str(value) for value in next(rows, ())]
+            batch: List[dict] = []
+            for values in rows:
+                if all(value is None for value in values):
+                    continue
+                batch.append(dict(zip(header, values)))
+                if len(batch) >= batch_size():
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+        finally:
+            workbook.close()
+    else:
+        # xlrd 不支持流式读取，.xls 只能整体读入后分批处理
+        df = pd.read_excel(path)
+        offset = 0
+        while offset < len(df):
+            size = batch_size()
+            yield df.iloc[offset:offset + size].to_dict("records")
+            offset += size
+
+
+def _import_bounded(path: Path, qd_norm: Optional[str], max_memory: int) -> None:
+    """在内存预算内分批导入：每批提交后清空会话身份映射，并按本批峰值调整下一批大小"""
+    db_gen = get_db()
+    db = next(db_gen)
+    count = 0
+    try:
+        with MemoryBudget(max_memory) as budget:
+            batches = _read_batches(path, lambda: budget.batch_size)
+            while True:
+                with span("import.read", path=path):
+                    records = next(batches, None)
+                if records is None:
+                    break
+                budget.sample()
+                for record in records:
+                    count += 1
+                    product_create = _build_product(record, count, qd_norm)
+                    with span("import.write"):
+                        upsert_product_by_yindeng_code(db, product_create)
+                with span("import.commit"):
+                    db.commit()
+                # 已提交的 ORM 对象不再需要，释放身份映射与本批记录
+                db.expunge_all()
+                rows = len(records)
+                del records
+                budget.update(rows)
+        measured = "常驻内存增量" if budget.source == "rss" else "导入分配内存"
+        print(f"导入完成：{count} 条（{budget.batches} 批，{measured}峰值 {format_size(budget.peak)}，"
+              f"预算 {format_size(max_memory)}）")
+        if budget.exceeded:
+            print("警告: 导入峰值超出内存预算（批大小已按预算调整，首批或单行过大时仍可能超出）")
+    finally:
+        db.close()
+
+
+# 导入文件的中英文表头：字段 -> (中文表头, 英文表头)；两者都有值时以中文表头为准（与 _build_product 一致）
+IMPORT_HEADERS = {
+    "product_name": ("产品名称", "product_name"),
+    "product_yindeng_code": ("银登编码", "product_yindeng_code"),
+    "product_jinshu_code": ("金数编码", "product_jinshu_code"),
+    "product_custody_code": ("托管编码", "product_custody_code"),
+    "product_start_date": ("起息日", "product_start_date"),
+    "product_end_date": ("到期日", "product_end_date"),
+    "product_performance_benchmark": ("业绩基准", "product_performance_benchmark"),
+    "product_raise_target": ("募集目标", "product_raise_target"),
+    "product_raise_amount": ("募集金额", "product_raise_amount"),
+    "product_raise_institutional": ("机构募集", "product_raise_institutional"),
+    "product_raise_retail": ("个人募集", "product_raise_retail"),
+}
+_TEXT_FIELDS = ("product_name", "product_yindeng_code", "product_jinshu_code", "product_custody_code")
+_FLOAT_FIELDS = ("product_performance_benchmark", "product_raise_target", "product_raise_amount",
+                 "product_raise_institutional", "product_raise_retail")
+_DATE_FIELDS = ("product_start_date", "product_end_date", "product_query_date")
+_INT_FIELDS = ("product_days_total", "product_days_remaining")
+# 对账比较的字段（导入时写入的全部字段）
+DIFF_FIELDS = _TEXT_FIELDS[:1] + _TEXT_FIELDS[2:] + _DATE_FIELDS + _INT_FIELDS + _FLOAT_FIELDS
+_NULL_TEXTS = {"", "null", "none", "nan"}
+
+
+def _resolve_import_path(file_path: str) -> Path:
+    """定位导入文件（相对路径找不到时在 data 目录下查找）并检查格式"""
+    path = Path(file_path)
+    if not path.exists() and not path.is_absolute():
+        path = Path("data") / file_path
+    if not path.exists():
+        raise FileNotFoundError(f"文件未找到: {file_path}")
+    if path.suffix.lower() not in ['.csv', '.xls', '.xlsx']:
+        raise ValueError(f"不支持的文件格式: {path.suffix.lower()}")
+    return path
+
+
+def read_import_file(path: Path) -> pd.DataFrame:
+    """读取导入文件为 DataFrame（CSV 按字符串读取，保留编码前导零等原样文本）"""
+    if path.suffix.lower() == '.csv':
+        return pd.read_csv(path, encoding='utf-8', dtype=str)
+    return pd.read_excel(path)
+
+
+def _pick(df: pd.DataFrame, headers: Tuple[str, ...]) -> pd.Series:
+    """按表头顺序取列并去除首尾空白：前面的表头为空时回退到后面的表头，空白视为缺失（返回 object 列）"""
+    result = pd.Series(None, index=df.index, dtype=object)
+    for header in reversed(headers):
+        if header in df:
+            text = _text(df[header])
+            result = text.where(text.notna() & (text != ""), result)
+    return result
+
+
+def _bad_rows(mask: np.ndarray, values: pd.Series, message: str) -> None:
+    if mask.any():
+        row = int(np.flatnonzero(mask)[0])
+        raise ValueError(f"第{row + 1}行{message}: {values.iloc[row]}（共 {int(mask.sum())} 行）")
+
+
+def _text(values: pd.Series) -> pd.Series:
+    """整列转为去除首尾空白的字符串（缺失值保持缺失）；CSV 按字符串读入时直接走 .str"""
+    values = values.astype(object)
+    if pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"):
+        return values.str.strip()
+    return values.map(lambda v: v.strftime("%Y-%m-%d") if isinstance(v, date) else str(v).strip(),
+                      na_action="ignore").astype(object)
+
+
+def _parse_dates(text: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    """整列解析日期（格式同 parse_date：- / . 分隔或 年月日），返回 (datetime64 列, 无法解析的行掩码)
+
+    text 为 _pick 的结果。先按 YYYY-MM-DD 整列解析，只对未解析的行替换分隔符后重试。
+    """
+    parsed = pd.to_datetime(text, format="%Y-%m-%d", errors="coerce")
+    retry = (parsed.isna() & text.notna()).to_numpy()
+    if retry.any():
+        normalized = (text[retry].str.replace("年", "-", regex=False).str.replace("月", "-", regex=False)
+                      .str.replace("日", "", regex=False).str.replace(".", "-", regex=False).str.replace("/", "-", regex=False))
+        parsed[retry] = pd.to_datetime(normalized, format="%Y-%m-%d", errors="coerce")
+    return parsed, (parsed.isna() & text.notna()).to_numpy()
+
+
+def _parse_floats(text: pd.Series, percent_as_fraction: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """整列解析数值（规则同 parse_float：千分位逗号、百分号、null/none/nan 为空），返回 (float64, 无法解析的行掩码)
+
+    text 为 _pick 的结果。先整列按数字解析，只对未解析的行处理百分号与逗号；
+    percent_as_fraction 为 False 时百分号只被去掉（用于本身以百分数存储的列，如收益率）。
+    """
+    try:
+        # 全是数字的列直接转换（比 to_numeric 快数倍）
+        numbers = text.to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    except (TypeError, ValueError):
+        numbers = pd.to_numeric(text, errors="coerce").to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    retry = np.isnan(numbers) & text.notna().to_numpy()
+    if retry.any():
+        rest = text[retry]
+        rest = rest.where(~rest.str.lower().isin(_NULL_TEXTS))
+        percent = rest.str.endswith("%").fillna(False).to_numpy(dtype=bool)
+        body = rest.str.replace(r"%$", "", regex=True).str.replace(",", "", regex=False)
+        values = pd.to_numeric(body, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        numbers[retry] = np.where(percent, values / 100.0, values) if percent_as_fraction else values
+        retry[retry] = rest.notna().to_numpy()  # null/none 为缺失而非错误
+    return numbers, retry & np.isnan(numbers)
+
+
+def _column_dates(values: pd.Series, label: str) -> pd.Series:
+    """整列解析日期，无法解析时报错"""
+    parsed, bad = _parse_dates(values)
+    _bad_rows(bad, values, f"无法解析{label}")
+    return parsed
+
+
+def _column_floats(values: pd.Series, label: str) -> np.ndarray:
+    """整列解析数值（百分号转小数），无法解析时报错"""
+    numbers, bad = _parse_floats(values)
+    _bad_rows(bad, values, f"无法解析{label}")
+    return numbers
+
+
+def normalize_products_frame(df: pd.DataFrame, query_date: Optional[str] = None) -> pd.DataFrame:
+    """把导入文件整列规范化为产品表的列（规则与逐行导入的 _build_product 一致）
+
+    缺少起息日/到期日时以当天代替且总天数记为 0；文本列去除首尾空白，空串为 None。
+    """
+    qd_norm = parse_date(query_date) if query_date else None
+    out = pd.DataFrame(index=df.index)
+    for field in _TEXT_FIELDS:
+        text = _pick(df, IMPORT_HEADERS[field])
+        out[field] = text.where(text.notna(), None)
+    _bad_rows(out["product_name"].isna().to_numpy(), out["product_name"], "缺少 产品名称")
+
+    today = pd.Timestamp(date.today())
+    start = _column_dates(_pick(df, IMPORT_HEADERS["product_start_date"]), "起息日")
+    end = _column_dates(_pick(df, IMPORT_HEADERS["product_end_date"]), "到期日")
+    both = (start.notna() & end.notna()).to_numpy()
+    out["product_start_date"] = start.fillna(today).to_numpy("datetime64[D]")
+    out["product_end_date"] = end.fillna(today).to_numpy("datetime64[D]")
+    out["product_days_total"] = np.where(both, (end - start).dt.days.fillna(0), 0).astype("int64")
+    if qd_norm:
+        qd = np.datetime64(qd_norm, "D")
+        out["product_query_date"] = np.full(len(df), qd)
+        remaining = np.maximum((out["product_end_date"].to_numpy("datetime64[D]") - qd).astype("int64"), 0)
+        out["product_days_remaining"] = pd.Series(remaining, index=df.index, dtype="Int64").mask(end.isna())
+    else:
+        out["product_query_date"] = np.full(len(df), np.datetime64("NaT", "D"))
+        out["product_days_remaining"] = pd.array([pd.NA] * len(df), dtype="Int64")
+    for field in _FLOAT_FIELDS:
+        out[field] = _column_floats(_pick(df, IMPORT_HEADERS[field]), IMPORT_HEADERS[field][0])
+    return out
+
+
+def _field_equal(old: pd.Series, new: pd.Series, field: str) -> np.ndarray:
+    """两列逐元素是否相等（空值与空值相等；数值按相对误差 1e-9 比较）"""
+    if field in _FLOAT_FIELDS or field in _INT_FIELDS:
+        a = old.to_numpy(dtype="float64", na_value=np.nan)
+        b = new.to_numpy(dtype="float64", na_value=np.nan)
+        return (np.isnan(a) & np.isnan(b)) | np.isclose(a, b, rtol=1e-9, atol=0.0)
+    if field in _DATE_FIELDS:
+        a = old.to_numpy("datetime64[D]")
+        b = new.to_numpy("datetime64[D]")
+        return (np.isnat(a) & np.isnat(b)) | (a == b)
+    a = old.astype(object).to_numpy()
+    b = new.astype(object).to_numpy()
+    return (pd.isna(a) & pd.isna(b)) | (a == b)
+
+
+def _display(values: pd.Series, field: str) -> pd.Series:
+    if field in _DATE_FIELDS:
+        return pd.Series(values.to_numpy("datetime64[D]"), index=values.index).dt.strftime("%Y-%m-%d")
+    return values.astype(object)
+
+
+def diff_products(file_frame: pd.DataFrame, db_frame: pd.DataFrame) -> Tuple[Dict[str, Any], pd.DataFrame]:
+    """按银登编码对账（一次外连接 + 整列比较），返回 (汇总, 明细)
+
+    明细每行一条差异：change_type 为 added（文件新增）、removed（库中有、文件中没有）或 changed（字段变化，
+    附 field/old_value/new_value）。文件中无银登编码的行导入时总是新建，计入 added；重复编码以最后一行为准。
+    """
+    key = "product_yindeng_code"
+    has_code = file_frame[key].notna()
+    without_code = file_frame[~has_code]
+    keyed = file_frame[has_code]
+    duplicates = int(keyed.duplicated(key, keep="last").sum())
+    keyed = keyed.drop_duplicates(key, keep="last")
+    db_keyed = db_frame[db_frame[key].notna()]
+
+    merged = keyed.merge(db_keyed, on=key, how="outer", suffixes=("_new", "_old"), indicator=True, sort=False)
+    side = merged["_merge"].to_numpy()
+    added = merged[side == "left_only"]
+    removed = merged[side == "right_only"]
+    both = merged[side == "both"]
+
+    details = [
+        pd.DataFrame({"change_type": "added", key: list(added[key]) + [None] * len(without_code),
+                      "product_name": list(added["product_name_new"]) + list(without_code["product_name"])}),
+        pd.DataFrame({"change_type": "removed", key: removed[key].to_numpy(),
+                      "product_name": removed["product_name_old"].astype(object).to_numpy()}),
+    ]
+    changed_any = np.zeros(len(both), dtype=bool)
+    field_counts: Dict[str, int] = {}
+    for field in DIFF_FIELDS:
+        old, new = both[f"{field}_old"], both[f"{field}_new"]
+        mask = ~_field_equal(old, new, field)
+        if not mask.any():
+            continue
+        changed_any |= mask
+        field_counts[field] = int(mask.sum())
+        details.append(pd.DataFrame({
+            "change_type": "changed",
+            key: both[key].to_numpy()[mask],
+            "product_name": both["product_name_new"].to_numpy()[mask],
+            "field": field,
+            "old_value": _display(old, field).to_numpy()[mask],
+            "new_value": _display(new, field).to_numpy()[mask],
+        }))
+    detail = pd.concat(details, ignore_index=True)
+    detail = detail.reindex(columns=["change_type", key, "product_name", "field", "old_value", "new_value"])
+    summary = {
+        "file_rows": len(file_frame),
+        "added": len(added) + len(without_code),
+        "without_code": len(without_code),
+        "duplicates": duplicates,
+        "removed": len(removed),
+        "changed": int(changed_any.sum()),
+        "unchanged": int((~changed_any).sum()),
+        "fields": field_counts,
+    }
+    return summary, detail
+
+
+def diff_data_file(file_path: str, query_date: Optional[str] = None, output_path: Optional[str] = None) -> Dict[str, Any]:
+    """导入前对账：整列规范化输入文件，与库中产品（单条查询按列读入）按银登编码比较
+
+    output_path 给定时写出差异明细（CSV/XLSX）。返回汇总字典。
+    """
+    path = _resolve_import_path(file_path)
+    with span("diff.read", path=path):
+        file_frame = normalize_products_frame(read_import_file(path), query_date)
+    db_gen = get_db()
+    db = next(db_gen)
+    try:
+        with span("diff.load"):
+            db_frame = _product_snapshot(db).to_frame()
+    finally:
+        db.close()
+    with span("diff.compare"):
+        summary, detail = diff_products(file_frame, db_frame)
+    if output_path:
+        with span("diff.write", path=output_path):
+            _write_frame(detail, Path(output_path))
+    return summary
+
+
+# 资产导入文件的中英文表头：字段 -> (中文表头, 英文表头)
+ASSET_HEADERS = {
+    "asset_name": ("资产名称", "asset_name"),
+    "asset_code": ("资产编码", "asset_code"),
+    "asset_type": ("资产类型", "asset_type"),
+    "issuer": ("发行人", "issuer"),
+    "industry": ("行业", "industry"),
+    "region": ("地区", "region"),
+    "created_date": ("创建日期", "created_date"),
+}
+ASSET_BATCH_ROWS = 1000
+
+
+def normalize_assets_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """整列规范化资产导入文件：文本列去除首尾空白（空串为 None），创建日期按导入日期格式解析"""
+    out = pd.DataFrame(index=df.index)
+    for field, headers in ASSET_HEADERS.items():
+        if field == "created_date":
+            parsed = _column_dates(_pick(df, headers), "创建日期")
+            out[field] = parsed.dt.date.astype(object).where(parsed.notna(), None)
+            continue
+        text = _pick(df, headers)
+        out[field] = text.where(text.notna(), None)
+    _bad_rows(out["asset_name"].isna().to_numpy(), out["asset_name"], "缺少 资产名称")
+    _bad_rows(out["asset_type"].isna().to_numpy(), out["asset_type"], "缺少 资产类型")
+    return out
+
+
+def import_assets_file(file_path: str, batch_size: int = ASSET_BATCH_ROWS) -> Dict[str, int]:
+    """从 CSV/XLS/XLSX 批量导入资产：按资产编码 upsert，每批一条 INSERT ... ON CONFLICT 并单独提交
+
+    文件中重复的资产编码以最后一行为准，其余计入 skipped。返回 {"inserted", "updated", "skipped", "rows"}。
+    """
+    from pydantic import TypeAdapter, ValidationError
+
+    path = _resolve_import_path(file_path)
+    started = time.perf_counter()
+    with span("import_assets.read", path=path):
+        frame = normalize_assets_frame(read_import_file(path))
+    rows = len(frame)
+    duplicated = frame["asset_code"].notna() & frame.duplicated("asset_code", keep="last")
+    frame = frame[~duplicated.to_numpy()]
+
+    with span("import_assets.validate"):
+        records = frame.to_dict("records")
+        try:
+            # 整个列表一次校验（pydantic-core 批量执行）
+            assets = TypeAdapter(List[AssetCreate]).validate_python(records)
+        except ValidationError as e:
+            error = e.errors()[0]
+            row = int(frame.index[error["loc"][0]]) + 1
+            raise ValueError(f"第{row}行 {'.'.join(str(part) for part in error['loc'][1:])}: {error['msg']}") from e
+
+    counts = {"inserted": 0, "updated": 0, "skipped": int(duplicated.sum())}
+    db_gen = get_db()
+    db = next(db_gen)
+    try:
+        for offset in range(0, len(assets), batch_size):
+            with span("import_assets.batch", rows=min(batch_size, len(assets) - offset)):
+                for key, value in upsert_assets(db, assets[offset:offset + batch_size]).items():
+                    counts[key] += value
+    finally:
+        db.close()
+    elapsed = time.perf_counter() - started
+    counts["rows"] = rows
+    print(f"资产导入完成：共 {rows} 行，新增 {counts['inserted']}，更新 {counts['updated']}，跳过 {counts['skipped']}"
+          f"（{elapsed:.2f}s，{rows / elapsed if elapsed else 0:,.0f} 行/秒）")
+    return counts
+
+
+# 交易导入文件的中英文表头：字段 -> (中文表头, 英文表头...)
+TRANSACTION_HEADERS = {
+    "product_yindeng_code": ("银登编码", "product_yindeng_code", "product_code"),
+    "asset_code": ("资产编码", "asset_code"),
+    "investment_date": ("投资日期", "investment_date"),
+    "maturity_date": ("到期日期", "maturity_date"),
+    "interest_rate": ("收益率", "interest_rate"),
+    "quantity": ("数量", "quantity"),
+    "unit_net_price": ("单位净价", "unit_net_price"),
+    "unit_full_price": ("单位全价", "unit_full_price"),
+    "settlement_amount": ("清算金额", "settlement_amount"),
+}
+TRANSACTION_BATCH_ROWS = 50000
+# 编码数不超过该值时用 IN 查询只取用到的编码，否则一次读出整张映射表
+CODE_LOOKUP_IN_LIMIT = 5000
+
+
+def _iso_dates(values: np.ndarray) -> List[Optional[str]]:
+    """datetime64[D] 数组转为 YYYY-MM-DD 字符串列表（NaT 为 None）"""
+    return np.where(np.isnat(values), None, np.datetime_as_string(values).astype(object)).tolist()
+
+
+def _code_lookup(db: Session, code_column: Any, id_column: Any, codes: np.ndarray) -> pd.Series:
+    """以一条查询把编码解析为ID：返回以编码为索引、ID 为 .values 的映射（pd.Series）"""
+    from sqlalchemy import select
+
+    stmt = select(code_column, id_column).where(code_column.isnot(None))
+    if len(codes) <= CODE_LOOKUP_IN_LIMIT:
+        stmt = stmt.where(code_column.in_(codes.tolist()))
+    rows = db.execute(stmt).all()
+    return pd.Series([row[1] for row in rows], index=pd.Index([row[0] for row in rows], dtype=object), dtype="int64")
+
+
+def _resolve_codes(codes: pd.Series, mapping: pd.Series) -> np.ndarray:
+    """整列按映射取ID，未找到的为 -1"""
+    positions = mapping.index.get_indexer(codes.to_numpy(dtype=object))
+    if mapping.empty:
+        return positions
+    return np.where(positions >= 0, mapping.to_numpy()[positions], -1)
+
+
+def import_transactions_file(
+    file_path: str,
+    reject_path: Optional[str] = None,
+    batch_size: int = TRANSACTION_BATCH_ROWS,
+) -> Dict[str, int]:
+    """从成交流水文件（CSV/XLS/XLSX）分块导入交易
+
+    每块 batch_size 行：CSV 按字符串分块读取，XLSX 以只读模式逐行解析（.xls 只能整体读入后切分）。
+    银登编码与资产编码各以一条查询解析为ID（字典查找），清算金额缺失时整列按 数量 × 单位全价 补齐。
+    编码无法解析或必填字段缺失/无法解析的行写入拒收文件（原始列 + reject_reason，默认为 <文件名>_rejects.csv），
+    其余行经 insert_transaction_columns 按 TransactionCreate 整列校验后 executemany 插入，每块单独提交。
+    返回 {"rows", "inserted", "rejected"}。
+    """
+    path = _resolve_import_path(file_path)
+    started = time.perf_counter()
+    rows = inserted = 0
+    rejects: List[pd.DataFrame] = []
+
+    db_gen = get_db()
+    db = next(db_gen)
+    try:
+        chunks = _read_frames(path, batch_size)
+        while True:
+            with span("import_transactions.read", path=path):
+                raw = next(chunks, None)
+            if raw is None:
+                break
+            rows += len(raw)
+            columns, reason = _prepare_transactions(db, raw)
+            with span("import_transactions.batch", rows=len(columns["product_id"])):
+                inserted += insert_transaction_columns(db, columns)
+            rejected_rows = reason != ""
+            if rejected_rows.any():
+                chunk_rejects = raw.loc[rejected_rows].copy()
+                chunk_rejects.insert(0, "reject_reason", reason[rejected_rows])
+                rejects.append(chunk_rejects)
+    finally:
+        db.close()
+
+    rejected = sum(len(frame) for frame in rejects)
+    if rejected:
+        target = Path(reject_path) if reject_path else path.with_name(f"{path.stem}_rejects.csv")
+        _write_frame(pd.concat(rejects, ignore_index=True), target)
+        print(f"拒收 {rejected} 行，已写入: {target}")
+    elapsed = time.perf_counter() - started
+    print(f"交易导入完成：共 {rows} 行，导入 {inserted}，拒收 {rejected}（{elapsed:.2f}s，{rows / elapsed if elapsed else 0:,.0f} 行/秒）")
+    return {"rows": rows, "inserted": inserted, "rejected": rejected}
+
+
+def _read_frames(path: Path, rows: int) -> Iterator[pd.DataFrame]:
+    """按块读取导入文件为 DataFrame（CSV 按字符串读取，保留编码前导零等原样文本）"""
+    if path.suffix.lower() == '.csv':
+        with pd.read_csv(path, encoding='utf-8', dtype=str, chunksize=rows) as reader:
+            yield from reader
+        return
+    for records in _read_batches(path, lambda: rows):
+        yield pd.DataFrame.from_records(records)
+
+
+def _prepare_transactions(db: Session, raw: pd.DataFrame) -> Tuple[Dict[str, List[Any]], np.ndarray]:
+    """整列解析一块成交流水并解析编码，返回 (可插入行的列, 每行的拒收原因（空串为接受）)"""
+    from .models import AssetDB, WealthProductDB
+
+    with span("import_transactions.normalize"):
+        columns = {field: _pick(raw, headers) for field, headers in TRANSACTION_HEADERS.items()}
+        product_codes = columns["product_yindeng_code"]
+        asset_codes = columns["asset_code"]
+        investment, bad_investment = _parse_dates(columns["investment_date"])
+        maturity, bad_maturity = _parse_dates(columns["maturity_date"])
+        numbers = {}
+        bad_numbers = {}
+        for field in ("interest_rate", "quantity", "unit_net_price", "unit_full_price", "settlement_amount"):
+            # 收益率以百分数存储："2.5%" 与 "2.5" 相同
+            numbers[field], bad_numbers[field] = _parse_floats(columns[field], percent_as_fraction=field != "interest_rate")
+        settlement = numbers["settlement_amount"]
+        numbers["settlement_amount"] = np.where(np.isnan(settlement), numbers["quantity"] * numbers["unit_full_price"], settlement)
+
+    with span("import_transactions.resolve"):
+        products = _code_lookup(db, WealthProductDB.product_yindeng_code, WealthProductDB.product_id,
+                                product_codes.dropna().unique())
+        assets = _code_lookup(db, AssetDB.asset_code, AssetDB.asset_id, asset_codes.dropna().unique())
+        product_ids = _resolve_codes(product_codes, products)
+        asset_ids = _resolve_codes(asset_codes, assets)
+
+    # 拒收原因：按以下顺序取第一条
+    reasons = [
+        (product_codes.isna().to_numpy(), "缺少 银登编码"),
+        (asset_codes.isna().to_numpy(), "缺少 资产编码"),
+        (product_ids < 0, "银登编码未找到"),
+        (asset_ids < 0, "资产编码未找到"),
+        (investment.isna().to_numpy() & ~bad_investment, "缺少 投资日期"),
+        (bad_investment, "无法解析 投资日期"),
+        (bad_maturity, "无法解析 到期日期"),
+        (np.isnan(numbers["quantity"]) & ~bad_numbers["quantity"], "缺少 数量"),
+    ] + [(bad, f"无法解析 {TRANSACTION_HEADERS[field][0]}") for field, bad in bad_numbers.items()]
+    reason = np.select([mask for mask, _ in reasons], [text for _, text in reasons], default="")
+    accepted = reason == ""
+
+    result = {
+        "product_id": product_ids[accepted].tolist(),
+        "asset_id": asset_ids[accepted].tolist(),
+        "investment_date": _iso_dates(investment.to_numpy("datetime64[D]")[accepted]),
+        "maturity_date": _iso_dates(maturity.to_numpy("datetime64[D]")[accepted]),
+    }
+    for field, values in numbers.items():
+        values = values[accepted]
+        result[field] = np.where(np.isnan(values), None, values.astype(object)).tolist()
+    return result, reason
+
+
+def _product_snapshot(db: Session) -> "ProductTable":
+    """产品快照：常驻进程内复用进程级快照，否则整表加载"""
+    from .analytics.product_table import ProductTable, resident_product_table
+
+    table = resident_product_table(db)
+    return table if table is not None else ProductTable.load(db)
+
+
+def _load_products_frame(db: Session, query_date: Optional[str] = None) -> pd.DataFrame:
+    """免校验读取产品表为 DataFrame（按列读入产品快照，日期列格式化为 YYYY-MM-DD 字符串）"""
+    table = _product_snapshot(db)
+    if query_date:
+        table = table.filter(table["product_query_date"] == np.datetime64(parse_date(query_date), "D"))
+    df = table.to_frame()
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = df[column].dt.strftime("%Y-%m-%d")
+    return df
+
+
+def _collect_products_frame(db: Session, query_date: Optional[str] = None) -> pd.DataFrame:
+    """逐行经 Pydantic 校验后汇总为 DataFrame（默认导出路径）"""
+    # 使用CRUD操作获取产品数据
+    if query_date:
+        qd_norm = parse_date(query_date)
+        # 这里我们需要实现一个根据查询日期获取产品的CRUD操作
+        # 由于我们没有直接的CRUD操作来根据查询日期筛选，我们先获取所有产品然后筛选
+        all_products = get_all_products(db)
+        # 筛选符合查询日期的产品
+        products = []
+        for p in all_products:
+            # 将SQLAlchemy模型转换为Pydantic模型，再进行比较
+            product_in_db = WealthProductInDB.model_validate(p)
+            if product_in_db.product_query_date and product_in_db.product_query_date.isoformat() == qd_norm:
+                products.append(p)
+    else:
+        products = get_all_products(db)
+    
+    # 将产品数据转换为字典列表
+    products_data = []
+    for product in products:
+        # 将SQLAlchemy模型转换为Pydantic模型，再转换为字典
+        product_in_db = WealthProductInDB.model_validate(product)
+        product_dict = product_in_db.model_dump()
+        # 处理日期字段，将其转换为字符串格式
+        for key, value in product_dict.items():
+            if isinstance(value, date):
+                product_dict[key] = value.isoformat()
+        products_data.append(product_dict)
+    
+    # 创建DataFrame
+    return pd.DataFrame(products_data)
+
+
+# 增量导出时每批读取与写出的行数
+EXPORT_CHUNK_ROWS = 10000
+
+
+def export_data_file(
+    output_path: str,
+    query_date: Optional[str] = None,
+    mode: str = "validate",
+    since: Optional[int] = None,
+    table: str = "wealth_products",
+) -> Optional[int]:
+    """导出数据到文件(CSV/XLS/XLSX)
+
+    mode 为 validate（默认）时逐行经 Pydantic 校验；其他读取模式直接按列读取为 DataFrame。
+    since 为变更日志水位：给定时只导出 table 在该水位之后被修改过的行（CSV/XLSX 流式写出），并返回新水位。
+    新水位为已读到的最大 seq，仅在 SQLite（写入串行，seq 顺序即提交顺序）上保证不漏行，见 database/changelog.py。
+    """
     path = Path(output_path)
     file_extension = path.suffix.lower()
     
     # 支持 .csv / .xls / .xlsx
     if file_extension not in ['.csv', '.xls', '.xlsx']:
         raise ValueError(f"不支持的文件格式: {file_extension}")
+    check_read_mode(mode)
+    if since is not None and query_date:
+        raise ValueError("增量导出不支持按查询日期过滤")
+    if since is not None and file_extension == '.xls':
+        raise ValueError("增量导出不支持 .xls（无法流式写出），请使用 .csv 或 .xlsx")
 
     # 获取数据库会话
     db_gen = get_db()
     db = next(db_gen)
     try:
-        # 使用CRUD操作获取产品数据
-        if query_date:
-            qd_norm = parse_date(query_date)
-            # 这里我们需要实现一个根据查询日期获取产品的CRUD操作
-            # 由于我们没有直接的CRUD操作来根据查询日期筛选，我们先获取所有产品然后筛选
-            all_products = get_all_products(db)
-            # 筛选符合查询日期的产品
-            products = []
-            for p in all_products:
-                # 将SQLAlchemy模型转换为Pydantic模型，再进行比较
-                product_in_db = WealthProductInDB.model_validate(p)
-                if product_in_db.product_query_date and product_in_db.product_query_date.isoformat() == qd_norm:
-                    products.append(p)
-        else:
-            products = get_all_products(db)
-        
-        # 将产品数据转换为字典列表
-        products_data = []
-        for product in products:
-            # 将SQLAlchemy模型转换为Pydantic模型，再转换为字典
-            product_in_db = WealthProductInDB.model_validate(product)
-            product_dict = product_in_db.model_dump()
-            # 处理日期字段，将其转换为字符串格式
-            for key, value in product_dict.items():
-                if isinstance(value, date):
-                    product_dict[key] = value.isoformat()
-            products_data.append(product_dict)
-        
-        # 创建DataFrame
-        df = pd.DataFrame(products_data)
-        
-        if file_extension == '.csv':
-            df.to_csv(path, index=False, encoding='utf-8')
-        elif file_extension == '.xlsx':
-            # 默认使用openpyxl写入xlsx
-            df.to_excel(path, index=False, engine='openpyxl')
-        else:  # '.xls'
-            # 尝试使用xlwt写入xls格式
-            try:
-                df.to_excel(path, index=False, engine='xlwt')
-            except Exception as e:
-                # 如果xlwt不可用，提供友好的错误信息
-                error_msg = f"无法使用xlwt引擎导出XLS格式: {e}"
-                suggestion = "提示: 您可以尝试导出为XLSX格式以获得更好的兼容性"
-                print(f"警告: {error_msg}")
-                print(suggestion)
-                # 重新抛出异常，让调用者决定如何处理
-                raise Exception(f"{error_msg}. {suggestion}") from e
+        if since is not None:
+            return _export_changes(db, path, table, since)
+        with span("export.read", mode=mode):
+            if mode == "validate":
+                df = _collect_products_frame(db, query_date)
+            else:
+                df = _load_products_frame(db, query_date)
+
+        with span("export.write", path=path):
+            _write_frame(df, path)
             
         print(f"导出完成: {len(df)} 条")
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def _export_changes(db: Session, path: Path, table: str, since: int) -> int:
+    """增量导出：单条语句读取水位之后的变更行，按批流式写出 CSV/XLSX；返回新水位（无变更时不变）"""
+    from .database.changelog import changes_statement
+
+    stmt = changes_statement(table, since)
+    watermark, total, counts = since, 0, {"upsert": 0, "delete": 0}
+
+    def tracked(partitions: Iterator[Any]) -> Iterator[Any]:
+        # 写出的同时记录水位与各操作计数（结果按 change_seq 升序，前两列为 change_seq、change_operation）
+        nonlocal watermark, total
+        for rows in partitions:
+            watermark = int(rows[-1][0])
+            for row in rows:
+                counts[row[1]] += 1
+            total += len(rows)
+            yield rows
+
+    with span("export.changes", table=table, since=since):
+        result = db.connection().execute(stmt.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        fields = list(result.keys())
+        if path.suffix.lower() == '.xlsx':
+            _stream_xlsx(tracked(result.partitions()), fields, path, sheet_name=table)
+        else:
+            _stream_text(tracked(result.partitions()), fields, path)
+
+    print(f"增量导出完成: {total} 条（更新 {counts['upsert']}，删除 {counts['delete']}），水位 {since} -> {watermark}")
+    return watermark
+
+
+# 交易明细导出的列：交易 ⋈ 产品 ⋈ 资产（模型名, 列名）
+TRANSACTION_EXPORT_COLUMNS = (
+    ("TransactionDB", "transaction_id"),
+    ("WealthProductDB", "product_yindeng_code"),
+    ("WealthProductDB", "product_name"),
+    ("WealthProductDB", "product_query_date"),
+    ("WealthProductDB", "product_end_date"),
+    ("AssetDB", "asset_code"),
+    ("AssetDB", "asset_name"),
+    ("AssetDB", "asset_type"),
+    ("AssetDB", "issuer"),
+    ("AssetDB", "industry"),
+    ("AssetDB", "region"),
+    ("TransactionDB", "investment_date"),
+    ("TransactionDB", "maturity_date"),
+    ("TransactionDB", "interest_rate"),
+    ("TransactionDB", "quantity"),
+    ("TransactionDB", "unit_net_price"),
+    ("TransactionDB", "unit_full_price"),
+    ("TransactionDB", "settlement_amount"),
+)
+TRANSACTION_EXPORT_FORMATS = ('.csv', '.xlsx', '.jsonl')
+# XLSX 单个工作表的最大行数（含表头）
+XLSX_MAX_ROWS = 1048576
+
+
+def transaction_export_statement(
+    product_codes: Optional[List[str]] = None,
+    asset_codes: Optional[List[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    query_date: Optional[str] = None,
+):
+    """交易明细导出的单条联表查询（按交易ID排序）
+
+    Args:
+        product_codes: 仅导出这些银登编码的产品
+        asset_codes: 仅导出这些资产编码的资产
+        date_from: 投资日期不早于该日期
+        date_to: 投资日期不晚于该日期
+        query_date: 仅导出产品查询日期为该日期的产品
+    """
+    from sqlalchemy import select
+    from . import models
+
+    stmt = (
+        select(*[getattr(getattr(models, model), name) for model, name in TRANSACTION_EXPORT_COLUMNS])
+        .join(models.WealthProductDB, models.TransactionDB.product_id == models.WealthProductDB.product_id)
+        .join(models.AssetDB, models.TransactionDB.asset_id == models.AssetDB.asset_id)
+        .order_by(models.TransactionDB.transaction_id)
+    )
+    if product_codes:
+        stmt = stmt.where(models.WealthProductDB.product_yindeng_code.in_(list(product_codes)))
+    if asset_codes:
+        stmt = stmt.where(models.AssetDB.asset_code.in_(list(asset_codes)))
+    if date_from:
+        stmt = stmt.where(models.TransactionDB.investment_date >= date.fromisoformat(parse_date(date_from)))
+    if date_to:
+        stmt = stmt.where(models.TransactionDB.investment_date <= date.fromisoformat(parse_date(date_to)))
+    if query_date:
+        stmt = stmt.where(models.WealthProductDB.product_query_date == date.fromisoformat(parse_date(query_date)))
+    return stmt
+
+
+def export_transactions_file(
+    output_path: str,
+    product_codes: Optional[List[str]] = None,
+    asset_codes: Optional[List[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    query_date: Optional[str] = None,
+    batch_size: int = EXPORT_CHUNK_ROWS,
+) -> int:
+    """流式导出交易明细（附产品与资产信息）到 CSV/XLSX/JSONL，返回导出的行数
+
+    单条联表查询以 yield_per 分批拉取，每批写出后即释放，内存占用与台账大小无关。
+    """
+    path = Path(output_path)
+    file_extension = path.suffix.lower()
+    if file_extension not in TRANSACTION_EXPORT_FORMATS:
+        raise ValueError(f"不支持的文件格式: {file_extension}（可选: {', '.join(TRANSACTION_EXPORT_FORMATS)}）")
+    stmt = transaction_export_statement(product_codes, asset_codes, date_from, date_to, query_date)
+    if file_extension != '.xlsx':
+        # 文本格式不需要日期对象：日期列按库内存储原样取出（SQLite 中即 YYYY-MM-DD），省去逐值解析再格式化
+        from sqlalchemy import Date, String, type_coerce
+
+        stmt = stmt.with_only_columns(*[
+            type_coerce(column, String).label(column.key) if isinstance(column.type, Date) else column
+            for column in stmt.selected_columns
+        ])
+    fields = [name for _, name in TRANSACTION_EXPORT_COLUMNS]
+
+    db_gen = get_db()
+    db = next(db_gen)
+    started = time.perf_counter()
+    try:
+        with span("export.transactions", path=path):
+            # Core 连接执行：结果为普通行元组，不经 ORM 加载
+            if file_extension == '.xlsx':
+                # 先计数：超出单表上限时在创建工作簿之前报错，不留下写了一半的文件
+                from sqlalchemy import func, select
+
+                rows = db.connection().scalar(select(func.count()).select_from(stmt.subquery()))
+                if rows > XLSX_MAX_ROWS - 1:
+                    raise ValueError(f"共 {rows} 行，超过 XLSX 单表上限 {XLSX_MAX_ROWS - 1} 行，请导出为 CSV 或 JSONL")
+            result = db.connection().execute(stmt.execution_options(yield_per=batch_size))
+            if file_extension == '.xlsx':
+                total = _stream_xlsx(result.partitions(), fields, path)
+            else:
+                total = _stream_text(result.partitions(), fields, path)
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"交易导出完成：{total} 行（{elapsed:.2f}s，{total / elapsed if elapsed else 0:.0f} 行/秒）")
+    return total
+
+
+def _stream_text(partitions: Iterator[Any], fields: List[str], path: Path) -> int:
+    """逐批写出 CSV 或 JSON lines（日期经 str 序列化为 YYYY-MM-DD，空值为空/ null）"""
+    jsonl = path.suffix.lower() == '.jsonl'
+    total = 0
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        if jsonl:
+            dumps = json.JSONEncoder(ensure_ascii=False, default=str).encode
+            for rows in partitions:
+                handle.writelines(dumps(dict(zip(fields, row))) + '\n' for row in rows)
+                total += len(rows)
+        else:
+            writer = csv.writer(handle, lineterminator='\n')
+            writer.writerow(fields)
+            for rows in partitions:
+                writer.writerows(rows)
+                total += len(rows)
+    return total
+
+
+def _stream_xlsx(partitions: Iterator[Any], fields: List[str], path: Path, sheet_name: str = "transactions") -> int:
+    """以 openpyxl 只写模式逐行写出 XLSX（行直接落盘，不在内存中保留整个工作表）"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(fields)
+    total = 0
+    try:
+        for rows in partitions:
+            # 计数之后又有新行写入时的兜底
+            if total + len(rows) > XLSX_MAX_ROWS - 1:
+                raise ValueError(f"超过 XLSX 单表上限 {XLSX_MAX_ROWS - 1} 行，请导出为 CSV 或 JSONL")
+            for row in rows:
+                sheet.append(tuple(row))
+            total += len(rows)
+    except BaseException:
+        # 结束只写工作表的行写入器；未 save，目标文件不会生成
+        sheet.close()
+        raise
+    workbook.save(path)
+    return total
+
+
+def _write_frame(df: pd.DataFrame, path: Path) -> None:
+    """按扩展名写出 DataFrame（CSV/XLSX/XLS）"""
+    file_extension = path.suffix.lower()
+    if file_extension == '.csv':
+        df.to_csv(path, index=False, encoding='utf-8')
+    elif file_extension == '.xlsx':
+        # 默认使用openpyxl写入xlsx
+        df.to_excel(path, index=False, engine='openpyxl')
+    else:  # '.xls'
+        # 尝试使用xlwt写入xls格式
+        try:
+            df.to_excel(path, index=False, engine='xlwt')
+        except Exception as e:
+            # 如果xlwt不可用，提供友好的错误信息
+            error_msg = f"无法使用xlwt引擎导出XLS格式: {e}"
+            suggestion = "提示: 您可以尝试导出为XLSX格式以获得更好的兼容性"
+            print(f"警告: {error_msg}")
+            print(suggestion)
+            # 重新抛出异常，让调用者决定如何处理
+            raise Exception(f"{error_msg}. {suggestion}") from e
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+变更日志（CDC）：触发器把 wealth_products、assets、transactions 的增删改写入 change_log，seq 单调递增
+
+- 建表（Base.metadata.create_all / init_db）后自动安装触发器（IF NOT EXISTS），已有数据库执行一次 init 即可补装
+- 触发器在写入语句所在事务内执行：回滚的修改不留日志，批量 UPDATE/DELETE 按行记录
+- 水位（watermark）即下游已读取到的最大 seq；``changes_statement`` 以单条语句返回水位之后每个被修改行的最新状态，
+  已删除的行只保留主键，因此增量读取在同一快照内完成
+- 以“已读到的最大 seq”作为下次的水位仅适用于 SQLite：写入串行，seq 的顺序就是提交顺序。PostgreSQL 上并发事务可能
+  先取得较小的 seq 却在导出之后才提交，这些变更会被永久跳过；在 PostgreSQL 上增量同步需保证同步期间只有单个写入方
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Select, case, delete, event, func, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..models import Base, ChangeLogDB
+
+# 记录变更的表 -> 主键列
+TRACKED_TABLES: Dict[str, str] = {
+    "wealth_products": "product_id",
+    "assets": "asset_id",
+    "transactions": "transaction_id",
+}
+OPERATIONS = ("insert", "update", "delete")
+
+_POSTGRESQL_FUNCTION = """
+CREATE OR REPLACE FUNCTION fundman_change_log() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO change_log (table_name, row_id, operation)
+        VALUES (TG_TABLE_NAME, (to_jsonb(OLD) ->> TG_ARGV[0])::bigint, 'delete');
+        RETURN OLD;
+    END IF;
+    INSERT INTO change_log (table_name, row_id, operation)
+    VALUES (TG_TABLE_NAME, (to_jsonb(NEW) ->> TG_ARGV[0])::bigint, lower(TG_OP));
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def trigger_statements(dialect: str) -> List[str]:
+    """安装变更触发器的 DDL（sqlite / postgresql）；不支持的方言返回空列表"""
+    statements = []
+    if dialect == "sqlite":
+        for table, pk in TRACKED_TABLES.items():
+            for operation in OPERATIONS:
+                row = "OLD" if operation == "delete" else "NEW"
+                statements.append(
+                    f"CREATE TRIGGER IF NOT EXISTS change_log_{table}_{operation} "
+                    f"AFTER {operation.upper()} ON {table} FOR EACH ROW BEGIN "
+                    f"INSERT INTO change_log (table_name, row_id, operation) "
+                    f"VALUES ('{table}', {row}.{pk}, '{operation}'); END"
+                )
+    elif dialect == "postgresql":
+        statements.append(_POSTGRESQL_FUNCTION)
+        for table, pk in TRACKED_TABLES.items():
+            statements.append(f"DROP TRIGGER IF EXISTS change_log_{table} ON {table}")
+            statements.append(
+                f"CREATE TRIGGER change_log_{table} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+                f"FOR EACH ROW EXECUTE FUNCTION fundman_change_log('{pk}')"
+            )
+    return statements
+
+
+def install_change_triggers(connection: Connection) -> None:
+    """在连接上安装变更触发器（幂等）"""
+    for statement in trigger_statements(connection.dialect.name):
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_after_create(target: Any, connection: Connection, **kw: Any) -> None:
+    """create_all 建表后安装触发器"""
+    install_change_triggers(connection)
+
+
+# 已确认有 change_log 表的数据库（按 URL），避免每次检查表结构
+_with_change_log = set()
+
+
+def has_change_log(db: Session) -> bool:
+    """数据库中是否已有 change_log 表（早于该功能创建且未重新 init 的库没有）"""
+    key = str(db.get_bind().url)
+    if key not in _with_change_log:
+        if not inspect(db.connection()).has_table(ChangeLogDB.__tablename__):
+            return False
+        _with_change_log.add(key)
+    return True
+
+
+def current_watermark(db: Session, table_name: Optional[str] = None) -> int:
+    """当前最大 seq（指定表时为该表的最大 seq）；无变更时为 0"""
+    stmt = select(func.coalesce(func.max(ChangeLogDB.seq), 0))
+    if table_name is not None:
+        stmt = stmt.where(ChangeLogDB.table_name == _check_table(table_name))
+    return int(db.execute(stmt).scalar_one())
+
+
+def changes_statement(table_name: str, since: int = 0) -> Select:
+    """水位之后被修改过的行的最新状态（按最后一次变更的 seq 排序）
+
+    结果列为 change_seq、change_operation（upsert / delete）以及表的全部列；已删除的行除主键外均为空。
+    """
+    model = _model_for(_check_table(table_name))
+    pk_name = TRACKED_TABLES[table_name]
+    pk = getattr(model, pk_name)
+    latest = (
+        select(ChangeLogDB.row_id, func.max(ChangeLogDB.seq).label("change_seq"))
+        .where(ChangeLogDB.table_name == table_name, ChangeLogDB.seq > since)
+        .group_by(ChangeLogDB.row_id)
+        .subquery()
+    )
+    columns = [latest.c.row_id.label(pk_name) if column.key == pk_name else column
+               for column in model.__table__.columns]
+    return (
+        select(
+            latest.c.change_seq,
+            case((pk.is_(None), "delete"), else_="upsert").label("change_operation"),
+            *columns,
+        )
+        .select_from(latest.outerjoin(model, pk == latest.c.row_id))
+        .order_by(latest.c.change_seq)
+    )
+
+
+def change_summary(db: Session) -> List[Dict[str, Any]]:
+    """按表与操作汇总变更日志：[{table_name, operation, count, min_seq, max_seq}]"""
+    stmt = (
+        select(ChangeLogDB.table_name, ChangeLogDB.operation, func.count(),
+               func.min(ChangeLogDB.seq), func.max(ChangeLogDB.seq))
+        .group_by(ChangeLogDB.table_name, ChangeLogDB.operation)
+        .order_by(ChangeLogDB.table_name, ChangeLogDB.operation)
+    )
+    keys = ("table_name", "operation", "count", "min_seq", "max_seq")
+    return [dict(zip(keys, row)) for row in db.execute(stmt)]
+
+
+def prune_change_log(db: Session, before: int) -> int:
+    """删除 seq 不超过 before 的日志（所有下游都已同步到该水位后调用），返回删除的行数
+
+    始终保留最新一条日志，使 current_watermark 不因清理而回退。
+    """
+    before = min(before, current_watermark(db) - 1)
+    result = db.execute(delete(ChangeLogDB).where(ChangeLogDB.seq <= before))
+    db.commit()
+    return result.rowcount
+
+
+def _check_table(table_name: str) -> str:
+    """校验表名是否记录变更，返回原表名"""
+    if table_name not in TRACKED_TABLES:
+        raise ValueError(f"不支持的表: {table_name}")
+    return table_name
+
+
+def _model_for(table_name: str) -> type:
+    """按表名查找对应的 ORM 模型类"""
+    for mapper in Base.registry.mappers:
+        if mapper.local_table.name == table_name:
+            return mapper.class_
+    raise ValueError(f"不支持的表: {table_name}")
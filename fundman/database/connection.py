@@ -1,9 +1,13 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
 from pathlib import Path
 import os
 from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional, Union
 from ..models import Base
+from . import changelog  # noqa: F401  建表后安装变更日志触发器
 
 # 数据库配置（可配置化）
 # 优先读取环境变量 FUNDMAN_DB_URL 或 DATABASE_URL；否则回退到项目 data/fund_report.db
@@ -19,9 +23,61 @@ if SQLALCHEMY_DATABASE_URL.startswith("sqlite:///"):
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 慢查询日志（可选）：设置 FUNDMAN_SLOW_QUERY_MS 后记录超过阈值（毫秒）的语句及执行计划
+DEFAULT_SLOW_QUERY_LOG = PROJECT_ROOT / "data" / "slow_queries.log"
+SLOW_QUERY_LOG_PATH = os.getenv("FUNDMAN_SLOW_QUERY_LOG") or str(DEFAULT_SLOW_QUERY_LOG)
+slow_query_log = None
+if os.getenv("FUNDMAN_SLOW_QUERY_MS"):
+    from .slowlog import install_slow_query_log
+    slow_query_log = install_slow_query_log(engine, float(os.getenv("FUNDMAN_SLOW_QUERY_MS")), SLOW_QUERY_LOG_PATH)
+
+# 作用域内替代默认 engine 的绑定：共享连接（批处理，见 bind_connection）或其他引擎（基准测试，见 bind_engine）
+_session_bind: ContextVar[Optional[Union[Connection, Engine]]] = ContextVar("fundman_session_bind", default=None)
+
+
+def new_session() -> Session:
+    """创建数据库会话；处于 bind_connection/bind_engine 作用域内时使用对应绑定"""
+    bind = _session_bind.get()
+    if bind is None:
+        return SessionLocal()
+    if isinstance(bind, Engine):
+        return SessionLocal(bind=bind)
+    # 会话内的 commit/rollback 只作用于保存点，外层事务由调用方统一提交
+    return SessionLocal(bind=bind, join_transaction_mode="create_savepoint")
+
+
+def begin_transaction(connection: Connection) -> None:
+    """在共享连接上开启外层事务"""
+    connection.begin()
+    if connection.dialect.name == "sqlite":
+        # pysqlite 直到第一条 DML 才发出 BEGIN，先于它执行的 SAVEPOINT 会自成事务并在 RELEASE 时提交；
+        # 显式 BEGIN 保证保存点嵌套在外层事务内
+        connection.exec_driver_sql("BEGIN")
+
+
+@contextmanager
+def bind_connection(connection: Connection) -> Iterator[Connection]:
+    """在作用域内让 get_db/get_db_ctx 产生的会话共享同一连接与外层事务"""
+    token = _session_bind.set(connection)
+    try:
+        yield connection
+    finally:
+        _session_bind.reset(token)
+
+
+@contextmanager
+def bind_engine(bind: Engine) -> Iterator[Engine]:
+    """在作用域内让 get_db/get_db_ctx 产生的会话使用指定引擎（如基准测试的临时库）"""
+    token = _session_bind.set(bind)
+    try:
+        yield bind
+    finally:
+        _session_bind.reset(token)
+
+
 def get_db():
     """获取数据库会话（生成器形式，兼容现有调用）"""
-    db = SessionLocal()
+    db = new_session()
     try:
         yield db
     finally:
@@ -30,15 +86,27 @@ def get_db():
 @contextmanager
 def get_db_ctx():
     """获取数据库会话（上下文管理形式，推荐在新代码中使用）"""
-    db = SessionLocal()
+    db = new_session()
     try:
         yield db
     finally:
         db.close()
 
-def init_db():
-    """初始化数据库（基于当前配置的 engine）"""
+# 本进程内是否已完成建表检查（常驻进程中避免每条命令重复检查表结构）
+_initialized = False
+
+
+def init_db(force: bool = False):
+    """初始化数据库（基于当前配置的 engine）；同一进程内重复调用时跳过，force 为真时强制执行"""
+    global _initialized
+    if _initialized and not force:
+        return
     # 如果是默认 sqlite，确保目录存在
     if SQLALCHEMY_DATABASE_URL.startswith("sqlite:///"):
         Path(SQLALCHEMY_DATABASE_URL.replace("sqlite:///", "")).parent.mkdir(parents=True, exist_ok=True)
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    # create_all 不会给已存在的表补建索引：逐个补建后来新增的索引
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    _initialized = True
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+慢查询日志：记录超过阈值的 SQL 语句及其执行计划
+
+在 Engine 上注册 before/after_cursor_execute 钩子，超过阈值的语句以 JSON 行写入滚动日志文件，
+字段包括耗时、参数、调用方（最近的 fundman 函数）与执行计划（SQLite 为 EXPLAIN QUERY PLAN，PostgreSQL 为 EXPLAIN）。
+执行计划通过原始 DBAPI 游标获取，不会再次触发钩子。
+"""
+import json
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 3
+# 参数与执行计划的保留长度
+MAX_PARAMETERS_LENGTH = 500
+
+# 可获取执行计划的语句类型（DDL/PRAGMA 等不做 EXPLAIN）
+EXPLAINABLE_VERBS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+# 查找调用方时跳过的模块前缀
+_SKIP_MODULES = ("sqlalchemy", "fundman.database", "fundman.utils.profiling", "fundman.crud.read_modes")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+|\$\d+))*\s*\)")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|(?<!:):\w+|\$\d+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """归一化语句用于分组：字面量与占位符统一为 ?，IN 列表折叠，空白压缩"""
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(?)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def find_caller() -> Optional[str]:
+    """返回调用栈中最近的 fundman 函数（跳过 SQLAlchemy 与数据库层）"""
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(_SKIP_MODULES) and module != __name__:
+            name = f"{module}.{frame.f_code.co_name}"
+            if module.startswith("fundman"):
+                return name
+            fallback = fallback or name
+        frame = frame.f_back
+    return fallback
+
+
+def explain(connection: Any, statement: str, parameters: Any) -> List[str]:
+    """获取语句的执行计划（使用原始 DBAPI 游标，失败时返回错误说明）"""
+    if not statement.lstrip()[:6].upper().startswith(EXPLAINABLE_VERBS):
+        return []
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return [f"不支持的数据库: {dialect}"]
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception as e:
+        return [f"无法获取执行计划: {e}"]
+    finally:
+        cursor.close()
+    if dialect == "sqlite":
+        # (id, parent, notused, detail)
+        return [str(row[-1]) for row in rows]
+    return [str(row[0]) for row in rows]
+
+
+class SlowQueryLog:
+    """慢查询记录器（阈值单位毫秒）"""
+
+    def __init__(self, path: Union[str, Path], threshold_ms: float = 500.0, explain_plans: bool = True,
+                 max_bytes: int = DEFAULT_MAX_BYTES, backup_count: int = DEFAULT_BACKUP_COUNT) -> None:
+        self.path = Path(path)
+        self.threshold_ms = threshold_ms
+        self.explain_plans = explain_plans
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handler = RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+        self._logger = logging.getLogger(f"fundman.slowlog.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(self._handler)
+        self._engines: List[Engine] = []
+
+    def install(self, engine: Engine) -> "SlowQueryLog":
+        """在引擎上注册钩子"""
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        self._engines.append(engine)
+        return self
+
+    def uninstall(self) -> None:
+        """移除钩子并关闭日志文件"""
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._before)
+            event.remove(engine, "after_cursor_execute", self._after)
+        self._engines = []
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
+
+    def _before(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        conn.info.setdefault("fundman_slowlog_start", []).append(time.perf_counter())
+
+    def _after(self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        duration_ms = (time.perf_counter() - conn.info["fundman_slowlog_start"].pop()) * 1000.0
+        if duration_ms < self.threshold_ms:
+            return
+        entry = {
+            "ts": datetime.now().isoformat(timespec="milliseconds"),
+            "duration_ms": round(duration_ms, 3),
+            "statement": statement,
+            "normalized": normalize_statement(statement),
+            "parameters": repr(parameters)[:MAX_PARAMETERS_LENGTH],
+            "executemany": executemany,
+            "caller": find_caller(),
+            "plan": explain(conn, statement, parameters) if self.explain_plans and not executemany else [],
+        }
+        self._logger.info(json.dumps(entry, ensure_ascii=False))
+
+
+def install_slow_query_log(engine: Engine, threshold_ms: float, path: Union[str, Path]) -> SlowQueryLog:
+    """在引擎上启用慢查询日志"""
+    return SlowQueryLog(path, threshold_ms).install(engine)
+
+
+def log_files(path: Union[str, Path]) -> List[Path]:
+    """日志文件及其滚动备份（按从旧到新排序）"""
+    path = Path(path)
+    backups = sorted(path.parent.glob(f"{path.name}.*"), key=lambda p: int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0,
+                     reverse=True)
+    return [p for p in backups if p.suffix[1:].isdigit()] + ([path] if path.exists() else [])
+
+
+def read_entries(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """读取日志（含滚动备份）中的全部记录，跳过无法解析的行"""
+    for file in log_files(path):
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def summarize(entries: Iterable[Dict[str, Any]], top: Optional[int] = 10) -> List[Dict[str, Any]]:
+    """按归一化语句分组，按总耗时降序返回前 top 组"""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        key = entry.get("normalized") or normalize_statement(entry.get("statement", ""))
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"normalized": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                   "callers": Counter(), "last_seen": None, "plan": []}
+        duration = float(entry.get("duration_ms", 0.0))
+        group["count"] += 1
+        group["total_ms"] += duration
+        if duration >= group["max_ms"]:
+            group["max_ms"] = duration
+            # 保留最慢一次的执行计划作为样例
+            group["plan"] = entry.get("plan") or []
+        if entry.get("caller"):
+            group["callers"][entry["caller"]] += 1
+        group["last_seen"] = max(filter(None, [group["last_seen"], entry.get("ts")]), default=None)
+    rows = sorted(groups.values(), key=lambda group: group["total_ms"], reverse=True)
+    for row in rows:
+        row["mean_ms"] = row["total_ms"] / row["count"]
+        row["callers"] = [name for name, _ in row["callers"].most_common(3)]
+    return rows[:top] if top else rows
@@ -0,0 +1,18 @@
+"""
+数据版本：用于缓存失效判断的变更日志水位（任意表任意列的新增、修改、删除都会推进水位）
+"""
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .changelog import current_watermark, has_change_log
+
+
+def data_version(db: Session) -> Optional[str]:
+    """数据版本：变更日志的全局水位（max(seq)，走主键索引，不扫描业务表）
+
+    清理日志总会保留最新一条，水位不会回退。数据库没有变更日志时返回 None：无法识别原地修改，调用方不应缓存。
+    """
+    if not has_change_log(db):
+        return None
+    return str(current_watermark(db))
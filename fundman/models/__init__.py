@@ -1,13 +1,34 @@
 # Models package
-from .wealth_product import (
-    Base, WealthProductDB,
-    WealthProductBase, WealthProductCreate, WealthProductUpdate, WealthProductInDB
-)
-from .investment import (
-    AssetDB, TransactionDB,
-    AssetBase, AssetCreate, AssetUpdate, AssetInDB,
-    TransactionBase, TransactionCreate, TransactionUpdate, TransactionInDB
-)
+# SQLAlchemy 表模型直接导入；Pydantic 模型按需加载，只需表结构的模块不必导入 Pydantic
+import importlib
+
+from .orm import Base, WealthProductDB, AssetDB, TransactionDB, ChangeLogDB
+
+_PYDANTIC_MODELS = {
+    "WealthProductBase": ".wealth_product",
+    "WealthProductCreate": ".wealth_product",
+    "WealthProductUpdate": ".wealth_product",
+    "WealthProductInDB": ".wealth_product",
+    "AssetBase": ".investment",
+    "AssetCreate": ".investment",
+    "AssetUpdate": ".investment",
+    "AssetInDB": ".investment",
+    "TransactionBase": ".investment",
+    "TransactionCreate": ".investment",
+    "TransactionUpdate": ".investment",
+    "TransactionInDB": ".investment",
+}
+
+
+def __getattr__(name: str):
+    """按需导入 Pydantic 模型（PEP 562）"""
+    module = _PYDANTIC_MODELS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     # Wealth Product Models
@@ -29,4 +50,7 @@ __all__ = [
     "TransactionCreate",
     "TransactionUpdate",
     "TransactionInDB",
-]
\ No newline at end of file
+
+    # Change Data Capture
+    "ChangeLogDB",
+]
@@ -0,0 +1,87 @@
+"""
+SQLAlchemy 表模型（不依赖 Pydantic，供只需表结构的模块轻量导入）
+"""
+from sqlalchemy import Column, Integer, String, Date, DateTime, Float, ForeignKey, Index, func
+from sqlalchemy.orm import DeclarativeBase, relationship
+from datetime import date
+
+
+# SQLAlchemy models
+class Base(DeclarativeBase):
+    pass
+
+
+class WealthProductDB(Base):
+    """理财产品数据库模型"""
+    __tablename__ = "wealth_products"
+    
+    product_id = Column(Integer, primary_key=True, index=True)
+    product_name = Column(String, nullable=False)
+    product_yindeng_code = Column(String, unique=True, index=True)
+    product_jinshu_code = Column(String)
+    product_custody_code = Column(String)
+    product_start_date = Column(Date, nullable=False, index=True)
+    product_end_date = Column(Date, nullable=False, index=True)
+    product_days_total = Column(Integer, nullable=False)
+    product_query_date = Column(Date)
+    product_days_remaining = Column(Integer)
+    product_performance_benchmark = Column(Float, index=True)
+    product_raise_target = Column(Float)
+    product_raise_amount = Column(Float, index=True)
+    product_raise_institutional = Column(Float)
+    product_raise_retail = Column(Float)
+    
+    # 关系
+    transactions = relationship("TransactionDB", back_populates="product")
+
+
+class AssetDB(Base):
+    """资产数据库模型（静态信息）"""
+    __tablename__ = "assets"
+    
+    asset_id = Column(Integer, primary_key=True, index=True)
+    asset_name = Column(String, nullable=False)
+    asset_code = Column(String, unique=True, index=True)  # 资产编码
+    asset_type = Column(String, nullable=False)  # 资产类型：股票、债券、存款等
+    issuer = Column(String)  # 资产发行人
+    industry = Column(String)  # 资产所属行业
+    region = Column(String)  # 资产所属地区
+    created_date = Column(Date, default=date.today)
+    
+    # 关系
+    transactions = relationship("TransactionDB", back_populates="asset")
+
+
+class TransactionDB(Base):
+    """交易数据库模型（动态投资信息）"""
+    __tablename__ = "transactions"
+    
+    transaction_id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("wealth_products.product_id"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.asset_id"), nullable=False)
+    investment_date = Column(Date, nullable=False)  # 投资日期
+    maturity_date = Column(Date)  # 到期日期
+    interest_rate = Column(Float)  # 收益率
+    quantity = Column(Float, nullable=False)  # 投资数量
+    unit_net_price = Column(Float)  # 单位净价
+    unit_full_price = Column(Float)  # 单位全价
+    settlement_amount = Column(Float)  # 清算金额（数量*全价）
+    
+    # 关系
+    product = relationship("WealthProductDB", back_populates="transactions")
+    asset = relationship("AssetDB", back_populates="transactions")
+
+
+class ChangeLogDB(Base):
+    """变更日志（由触发器写入，seq 单调递增且不复用）"""
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_table_seq", "table_name", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True)
+    table_name = Column(String, nullable=False)  # 被修改的表
+    row_id = Column(Integer, nullable=False)  # 被修改行的主键
+    operation = Column(String, nullable=False)  # insert / update / delete
+    changed_at = Column(DateTime, server_default=func.current_timestamp())
@@ -0,0 +1,372 @@
+"""
+本地 HTTP/JSON 接口（标准库 http.server）
+
+- 有界工作线程池处理连接；线程池饱和时响应后关闭 keep-alive 连接，让排队的客户端尽快得到服务
+- 每个请求使用独立的数据库会话
+- 列表接口支持 ``format=jsonl`` 以分块传输流式输出 JSON 行
+- GET 响应带基于数据版本（变更日志水位）的 ETag，支持 If-None-Match 条件请求（304）；没有变更日志的数据库不带 ETag
+
+接口：
+- ``GET  /health``
+- ``GET  /products``：``query_date`` 给出时返回 query_dynamic 结果，否则列出产品
+- ``GET  /assets``、``GET /transactions``：支持按列等值过滤、``skip``/``limit``
+- ``POST /products``、``/assets``、``/transactions``：JSON 数组或 JSON 行批量创建
+"""
+import hashlib
+import json
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from datetime import date, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 16
+# keep-alive 连接空闲超时（秒），超时后释放工作线程
+KEEP_ALIVE_TIMEOUT = 5.0
+# 流式输出时每个分块的目标大小
+CHUNK_SIZE = 64 * 1024
+# 非流式列表的默认条数（与 CRUD 层一致）
+DEFAULT_LIMIT = 100
+
+# 资源 -> (表名, 可过滤列)
+RESOURCES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "products": ("wealth_products", ("product_id", "product_yindeng_code", "product_jinshu_code", "product_custody_code")),
+    "assets": ("assets", ("asset_id", "asset_code", "asset_type", "issuer", "industry", "region")),
+    "transactions": ("transactions", ("transaction_id", "product_id", "asset_id")),
+}
+
+SessionFactory = Callable[[], AbstractContextManager]
+
+
+class ApiError(Exception):
+    """带 HTTP 状态码的请求错误"""
+
+    def __init__(self, status: HTTPStatus, message: str, detail: Any = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.detail = detail
+
+
+def _json_default(value: Any) -> Any:
+    """JSON 序列化日期等非原生类型"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """序列化为 UTF-8 JSON"""
+    return json.dumps(value, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def _int_param(params: Dict[str, str], name: str, default: Optional[int]) -> Optional[int]:
+    """读取整数查询参数"""
+    if name not in params:
+        return default
+    try:
+        return int(params[name])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"参数 {name} 必须是整数")
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """请求处理：路由、条件 GET、流式输出"""
+    protocol_version = "HTTP/1.1"
+    server_version = "FundManAPI/1.0"
+    timeout = KEEP_ALIVE_TIMEOUT
+
+    def handle(self) -> None:
+        """处理 keep-alive 连接上的多个请求；线程池有排队连接时处理完当前请求即关闭"""
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and not self.server.saturated():
+            self.handle_one_request()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """仅在 verbose 模式下输出访问日志"""
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # 路由
+
+    def do_GET(self) -> None:
+        """处理 GET 请求"""
+        self._dispatch(self._get)
+
+    def do_POST(self) -> None:
+        """处理 POST 请求"""
+        self._dispatch(self._post)
+
+    def _dispatch(self, handler: Callable[[str, Dict[str, str]], None]) -> None:
+        """解析路径与查询参数后交给 handler，错误转换为 JSON 错误响应
+
+        响应已开始（如流式输出途中出错）时不能再写第二个响应，只记录错误并关闭连接，客户端据此得知响应不完整。
+        """
+        parts = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self._responded = False
+        try:
+            handler(parts.path.rstrip("/") or "/", params)
+        except Exception as e:
+            if self._responded:
+                traceback.print_exc()
+                self.close_connection = True
+            elif isinstance(e, ApiError):
+                self._send_json(e.status, {"error": str(e), "detail": e.detail})
+            else:
+                traceback.print_exc()
+                self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"})
+
+    def _resource(self, path: str) -> str:
+        """路径对应的资源名，未知路径抛出 404"""
+        name = path.lstrip("/")
+        if name not in RESOURCES:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未知路径: {path}")
+        return name
+
+    def _get(self, path: str, params: Dict[str, str]) -> None:
+        """列表查询：带 ETag 的条件 GET，format=jsonl 时流式输出"""
+        if path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+            return
+        name = self._resource(path)
+        stream = params.pop("format", "json") == "jsonl"
+        with self.server.session_factory() as db:
+            from fundman.database.versions import data_version
+
+            # 没有变更日志时无法可靠判断数据是否变化：不带 ETag，不做条件响应
+            version = data_version(db)
+            etag = self._etag(version) if version is not None else None
+            if etag and etag in self._if_none_match():
+                self._send_empty(HTTPStatus.NOT_MODIFIED, etag)
+                return
+            rows = self.server.list_rows(db, name, params, stream)
+            if stream:
+                self._send_stream(rows, etag)
+            else:
+                self._send_json(HTTPStatus.OK, list(rows), etag)
+
+    def _post(self, path: str, params: Dict[str, str]) -> None:
+        """批量创建记录，返回新记录ID"""
+        name = self._resource(path)
+        records = self._read_records()
+        with self.server.session_factory() as db:
+            ids = self.server.create_rows(db, name, records)
+        self._send_json(HTTPStatus.CREATED, {"created": len(ids), "ids": ids})
+
+    # 请求与响应
+
+    def _etag(self, version: str) -> str:
+        """由数据版本与请求路径（含查询参数）计算 ETag"""
+        digest = hashlib.sha1(f"{version}\0{self.path}".encode("utf-8")).hexdigest()[:20]
+        return f'"{digest}"'
+
+    def _if_none_match(self) -> List[str]:
+        """If-None-Match 中的 ETag 列表（弱校验，去掉 W/ 前缀）"""
+        header = self.headers.get("If-None-Match", "")
+        return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+    def _read_records(self) -> List[Any]:
+        """读取请求体：JSON 数组（或单个对象）或 JSON 行"""
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode("utf-8") if length else ""
+        try:
+            content_type = self.headers.get("Content-Type") or ""
+            if "ndjson" in content_type or "jsonl" in content_type:
+                return [json.loads(line) for line in body.splitlines() if line.strip()]
+            data = json.loads(body or "[]")
+        except ValueError as e:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"请求体不是有效的 JSON: {e}")
+        return data if isinstance(data, list) else [data]
+
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        """写出状态行，并记录本请求已开始响应"""
+        self._responded = True
+        super().send_response(code, message)
+
+    def _send_empty(self, status: HTTPStatus, etag: Optional[str] = None) -> None:
+        """无响应体的响应（如 304）"""
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_json(self, status: HTTPStatus, payload: Any, etag: Optional[str] = None) -> None:
+        """JSON 响应（带 Content-Length）"""
+        body = dumps(payload)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, rows: Iterable[Dict[str, Any]], etag: Optional[str] = None) -> None:
+        """以分块传输编码输出 JSON 行"""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        buffer = bytearray()
+        for row in rows:
+            buffer += dumps(row) + b"\n"
+            if len(buffer) >= CHUNK_SIZE:
+                self._write_chunk(bytes(buffer))
+                buffer.clear()
+        if buffer:
+            self._write_chunk(bytes(buffer))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: bytes) -> None:
+        """写出一个分块传输编码的分块"""
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+
+class ApiServer(HTTPServer):
+    """有界线程池的 HTTP 服务"""
+    request_queue_size = 1024
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        workers: int = DEFAULT_WORKERS,
+        session_factory: Optional[SessionFactory] = None,
+        verbose: bool = False,
+    ) -> None:
+        if session_factory is None:
+            from fundman.database.connection import get_db_ctx
+            session_factory = get_db_ctx
+        self.session_factory = session_factory
+        self.verbose = verbose
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fundman-api")
+        self._lock = threading.Lock()
+        self._queued = 0
+        super().__init__(address, ApiHandler)
+
+    # 线程池调度
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """把连接交给线程池处理，并记录排队数"""
+        with self._lock:
+            self._queued += 1
+        self._pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request: Any, client_address: Any) -> None:
+        """工作线程中处理一个连接，结束后关闭"""
+        with self._lock:
+            self._queued -= 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def saturated(self) -> bool:
+        """是否有连接在排队等待工作线程"""
+        return self._queued > 0
+
+    def server_close(self) -> None:
+        """关闭监听套接字并等待线程池退出"""
+        super().server_close()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    # CRUD 适配
+
+    def list_rows(self, db: Any, name: str, params: Dict[str, str], stream: bool) -> Iterable[Dict[str, Any]]:
+        """按资源与查询参数列出记录；stream 为真时分批流式读取且默认不限条数"""
+        from fundman.crud.filters import build_filters
+        from fundman.crud.read_modes import iter_rows
+        from fundman.models import AssetDB, TransactionDB, WealthProductDB
+
+        skip = _int_param(params, "skip", 0)
+        limit = _int_param(params, "limit", None if stream else DEFAULT_LIMIT)
+        query_date = params.pop("query_date", None)
+        if name == "products" and query_date:
+            from fundman.analytics.product_table import resident_product_table
+            from fundman.crud import query_dynamic
+            from fundman.utils.date_utils import parse_date
+
+            end = None if limit is None else skip + limit
+            try:
+                # 常驻进程内使用按变更日志增量刷新的产品快照
+                snapshot = resident_product_table(db)
+                if snapshot is None:
+                    rows = query_dynamic(db, query_date, mode="row")
+                    return (row.model_dump() for row in rows[skip:end])
+                table = snapshot.query_dynamic(parse_date(query_date))
+            except ValueError as e:
+                raise ApiError(HTTPStatus.BAD_REQUEST, str(e))
+            return iter(table.take(slice(skip, end)).to_records())
+
+        model = {"products": WealthProductDB, "assets": AssetDB, "transactions": TransactionDB}[name]
+        filterable = RESOURCES[name][1]
+        unknown = set(params) - set(filterable) - {"skip", "limit"}
+        if unknown:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"不支持的参数: {', '.join(sorted(unknown))}")
+        filters = {}
+        for key in filterable:
+            if key in params:
+                try:
+                    filters[key] = model.__table__.columns[key].type.python_type(params[key])
+                except ValueError:
+                    raise ApiError(HTTPStatus.BAD_REQUEST, f"参数 {key} 类型错误")
+        pk = model.__table__.primary_key.columns.values()[0]
+        query = db.query(model).filter(*build_filters(model, filters, allow_all=True)).order_by(pk).offset(skip)
+        if limit is not None:
+            query = query.limit(limit)
+        return iter_rows(query, model)
+
+    def create_rows(self, db: Any, name: str, records: List[Any]) -> List[int]:
+        """校验并批量创建记录，返回新记录ID"""
+        from pydantic import TypeAdapter, ValidationError
+        from sqlalchemy.exc import IntegrityError
+
+        from fundman import crud
+        from fundman.models import AssetCreate, TransactionCreate, WealthProductCreate
+
+        schema, create = {
+            "products": (WealthProductCreate, crud.create_products),
+            "assets": (AssetCreate, crud.create_assets),
+            "transactions": (TransactionCreate, crud.create_transactions),
+        }[name]
+        try:
+            items = TypeAdapter(List[schema]).validate_python(records)
+        except ValidationError as e:
+            raise ApiError(HTTPStatus.UNPROCESSABLE_ENTITY, "数据校验失败",
+                           json.loads(e.json(include_url=False, include_input=False)))
+        try:
+            return create(db, items)
+        except IntegrityError as e:
+            db.rollback()
+            raise ApiError(HTTPStatus.CONFLICT, "违反唯一性或外键约束", str(e.orig))
+
+
+def serve_api(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = DEFAULT_WORKERS,
+              verbose: bool = False) -> None:
+    """启动 HTTP 接口并阻塞运行，直至 Ctrl+C"""
+    from fundman.database.connection import init_db
+
+    init_db()
+    # 常驻进程：产品读取复用进程级快照
+    from fundman.analytics.product_table import use_resident_tables
+    use_resident_tables()
+    server = ApiServer((host, port), workers=workers, verbose=verbose)
+    print(f"HTTP 接口已启动: http://{host}:{server.server_address[1]} (工作线程 {workers})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
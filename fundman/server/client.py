@@ -0,0 +1,109 @@
+"""
+守护进程客户端：将 CLI 命令转发给常驻进程执行
+
+仅依赖标准库，保证转发路径不加载 SQLAlchemy/pandas。
+"""
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SOCKET_PATH = Path(__file__).parent.parent.parent / "data" / "fundman.sock"
+
+# 设为 1/true 时禁用转发
+NO_DAEMON_ENV = "FUNDMAN_NO_DAEMON"
+
+# 影响命令结果的环境变量：随每条请求发送，与守护进程不一致时守护进程拒绝执行、客户端回退到本进程
+FORWARDED_ENV = ("FUNDMAN_DB_URL", "DATABASE_URL", "FUNDMAN_HOLIDAY_FILE", "FUNDMAN_SLOW_QUERY_MS",
+                 "FUNDMAN_SLOW_QUERY_LOG", "FUNDMAN_CACHE_DIR")
+_PATH_ENV = ("FUNDMAN_HOLIDAY_FILE", "FUNDMAN_SLOW_QUERY_LOG", "FUNDMAN_CACHE_DIR")
+_SQLITE_PREFIX = "sqlite:///"
+
+
+def environment() -> Dict[str, str]:
+    """FORWARDED_ENV 中已设置的环境变量；相对路径（含相对路径的 SQLite URL）按当前目录展开为绝对路径"""
+    env = {}
+    for key in FORWARDED_ENV:
+        value = os.environ.get(key)
+        if not value:
+            continue
+        if key in _PATH_ENV:
+            value = os.path.abspath(value)
+        elif value.startswith(_SQLITE_PREFIX) and not value.startswith(_SQLITE_PREFIX + "/") \
+                and value != _SQLITE_PREFIX + ":memory:":
+            value = _SQLITE_PREFIX + os.path.abspath(value[len(_SQLITE_PREFIX):])
+        env[key] = value
+    return env
+
+
+def socket_path(path: Optional[str] = None) -> Path:
+    """套接字路径：参数 > 环境变量 FUNDMAN_SOCKET > data/fundman.sock"""
+    return Path(path or os.getenv("FUNDMAN_SOCKET") or DEFAULT_SOCKET_PATH)
+
+
+class DaemonError(RuntimeError):
+    """请求已发给守护进程但未收到完整响应（连接中断、超时）：命令可能已执行，调用方不得在本进程内重试"""
+
+
+def request(payload: Dict[str, Any], path: Optional[str] = None, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """发送一条 JSON 请求并读取一行 JSON 响应
+
+    仅在连接守护进程失败（未运行、套接字残留）时返回 None；连接建立后发送或读取失败时抛出 DaemonError。
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    target = socket_path(path)
+    if not target.exists():
+        return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(str(target))
+        except OSError:
+            return None
+        try:
+            sock.sendall(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+        except OSError as exc:
+            raise DaemonError(f"守护进程未返回结果（{exc}），请求可能已执行，未在本进程内重试") from exc
+    if not line:
+        raise DaemonError("守护进程在返回结果前断开连接，请求可能已执行，未在本进程内重试")
+    return json.loads(line)
+
+
+def run_remote(argv: List[str], path: Optional[str] = None) -> Optional[int]:
+    """转发命令给守护进程并回显输出
+
+    Returns:
+        Optional[int]: 命令退出码；守护进程未运行、已禁用转发或其配置（数据库等，见 FORWARDED_ENV）与本进程不一致时
+        返回 None，由调用方在本进程内执行
+
+    Raises:
+        DaemonError: 命令已发出但未收到结果
+    """
+    if os.getenv(NO_DAEMON_ENV, "").lower() in {"1", "true", "yes"}:
+        return None
+    response = request({"op": "run", "argv": argv, "cwd": os.getcwd(), "env": environment()}, path)
+    if response is None or response.get("mismatch"):
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return int(response.get("exit_code", 0))
+
+
+def write_remote(operation: str, payload: Dict[str, Any], path: Optional[str] = None,
+                 timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """经守护进程的写入队列执行写操作（如 create_transaction），返回结果字典
+
+    守护进程未运行（或其数据库与本进程配置不一致）时返回 None，由调用方改为本进程内写入；写入失败时抛出 RuntimeError，
+    请求已发出但未收到结果时抛出 DaemonError（写入可能已生效，不得重试）。
+    """
+    response = request({"op": "write", "operation": operation, "payload": payload, "env": environment()}, path, timeout)
+    if response is None or response.get("mismatch"):
+        return None
+    if response.get("exit_code"):
+        raise RuntimeError(response.get("stderr", "").strip() or f"写入失败: {operation}")
+    return response.get("result")
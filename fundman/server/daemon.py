@@ -0,0 +1,211 @@
+"""
+常驻守护进程：保持数据库连接、缓存与已加载模块，在 Unix 域套接字上执行 CLI 命令
+
+协议为按行分隔的 JSON：
+    请求 {"op": "run", "argv": [...], "cwd": "...", "env": {...}} / {"op": "ping"} / {"op": "shutdown"}
+         {"op": "write", "operation": "create_transaction", "payload": {...}, "env": {...}}
+    响应 {"stdout": "...", "stderr": "...", "exit_code": 0}（write 另带 "result"）
+
+run/write 请求的 env 为客户端的数据库等配置（见 client.FORWARDED_ENV）；与守护进程启动时的配置不一致时不执行，
+返回 {"mismatch": true}，客户端回退到本进程内执行，避免命令落到另一个数据库上。
+客户端只在连接失败时回退；请求发出后连接中断或超时则报错退出，不重复执行（写命令可能已生效）。
+
+write 请求交给写入队列（见 writer.py），多个进程的并发写由同一写线程合并为分组事务。
+"""
+import contextlib
+import io
+import json
+import os
+import signal
+import sys
+import socketserver
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .client import DaemonError, environment, request, socket_path
+
+
+class CommandExecutor:
+    """在守护进程内执行 CLI 命令
+
+    命令逐条串行执行（切换工作目录、重定向标准输出都是进程级操作），
+    并发连接的处理开销由线程承担。
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._parser = None
+        self.started_at = time.time()
+        self.commands_run = 0
+
+    def warm_up(self) -> None:
+        """预热：建表检查、加载各子命令依赖，预读产品/资产表以建立连接池与页缓存（常驻模式下同时建立产品快照）"""
+        from fundman import app
+        from fundman.crud import get_assets, query_dynamic
+        import fundman.analytics  # noqa: F401
+        import fundman.data_processor  # noqa: F401
+
+        app.__getattr__("init_db")()
+        db = next(app.__getattr__("get_db")())
+        try:
+            query_dynamic(db, time.strftime("%Y-%m-%d"), mode="row")
+            get_assets(db, limit=1_000_000, mode="row")
+            # 常驻模式下建立进程级产品快照
+            fundman.analytics.resident_product_table(db)
+        finally:
+            db.close()
+
+    def run(self, argv: List[str], cwd: Optional[str] = None) -> Dict[str, Any]:
+        """执行一条命令，返回捕获的输出与退出码"""
+        from fundman.app import build_parser, run_command
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        exit_code = 0
+        with self._lock:
+            # 解析器只构建一次（构建开销远大于一次解析）
+            if self._parser is None:
+                self._parser = build_parser()
+            previous_cwd = os.getcwd()
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    try:
+                        run_command(self._parser.parse_args(argv))
+                    except SystemExit as e:
+                        exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                    except Exception:
+                        traceback.print_exc()
+                        exit_code = 1
+            finally:
+                os.chdir(previous_cwd)
+                self.commands_run += 1
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit_code": exit_code}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """读取一行 JSON 请求并写回一行 JSON 响应"""
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            payload = None
+            response = {"stdout": "", "stderr": "无效请求\n", "exit_code": 2}
+        else:
+            response = self.server.dispatch(payload)
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+        if isinstance(payload, dict) and payload.get("op") == "shutdown":
+            # 响应写出后再停止服务，避免客户端读不到响应
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    """守护进程套接字服务"""
+    daemon_threads = True
+
+    def __init__(self, path: Path, executor: Optional[CommandExecutor] = None, writer: Any = None) -> None:
+        self.path = path
+        self.executor = executor or CommandExecutor()
+        # 写入队列在第一条 write 请求时创建
+        self.writer = writer
+        self._writer_lock = threading.Lock()
+        # 守护进程的数据库等配置（进程启动时确定，之后不再变化）
+        self.environment = environment()
+        super().__init__(str(path), _RequestHandler)
+
+    def get_writer(self) -> Any:
+        """获取（必要时创建并启动）写入队列"""
+        with self._writer_lock:
+            if self.writer is None:
+                from .writer import WriteBehindQueue
+                self.writer = WriteBehindQueue()
+            return self.writer.start()
+
+    def write(self, operation: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """经写入队列执行一条写请求（阻塞至其所在分组提交）"""
+        from .writer import serialize_result
+
+        try:
+            result = self.get_writer().write(operation, payload)
+            return {"stdout": "", "stderr": "", "exit_code": 0, "result": serialize_result(operation, result)}
+        except Exception as e:
+            return {"stdout": "", "stderr": f"{type(e).__name__}: {e}\n", "exit_code": 1}
+
+    def server_close(self) -> None:
+        super().server_close()
+        if self.writer is not None:
+            self.writer.close()
+
+    def dispatch(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """按 op 分发请求"""
+        op = payload.get("op", "run")
+        if op == "ping":
+            return {"stdout": "", "stderr": "", "exit_code": 0, "pid": os.getpid(),
+                    "uptime": time.time() - self.executor.started_at, "commands_run": self.executor.commands_run,
+                    "writer": self.writer.stats() if self.writer is not None else None}
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"stdout": "守护进程已停止\n", "stderr": "", "exit_code": 0}
+        if op in ("run", "write") and payload.get("env") != self.environment:
+            return {"stdout": "", "stderr": "客户端配置与守护进程不一致，改为本进程内执行\n", "exit_code": 0, "mismatch": True}
+        if op == "run":
+            return self.executor.run(list(payload.get("argv", [])), payload.get("cwd"))
+        if op == "write":
+            return self.write(str(payload.get("operation")), payload.get("payload") or {})
+        return {"stdout": "", "stderr": f"未知操作: {op}\n", "exit_code": 2}
+
+
+def _prepare_socket(path: Path) -> None:
+    """检查是否已有守护进程运行；清理残留的套接字文件"""
+    if path.exists():
+        try:
+            running = request({"op": "ping"}, str(path), timeout=1.0) is not None
+        except DaemonError:
+            # 能连接但无响应：仍有进程在监听该套接字
+            running = True
+        if running:
+            raise RuntimeError(f"守护进程已在运行: {path}")
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+
+def serve(path: Optional[str] = None, warm: bool = True) -> None:
+    """启动守护进程并阻塞运行，直至收到 shutdown 请求或 SIGTERM/SIGINT"""
+    target = socket_path(path)
+    _prepare_socket(target)
+    # 常驻进程：产品读取复用进程级快照
+    from fundman.analytics.product_table import use_resident_tables
+    use_resident_tables()
+    executor = CommandExecutor()
+    if warm:
+        executor.warm_up()
+    server = DaemonServer(target, executor)
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    print(f"守护进程已启动: {target} (pid {os.getpid()})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            target.unlink()
+
+
+def stop(path: Optional[str] = None) -> None:
+    """请求正在运行的守护进程退出"""
+    try:
+        response = request({"op": "shutdown"}, path, timeout=5.0)
+    except DaemonError as exc:
+        print(f"错误: {exc}", file=sys.stderr)
+        return
+    print(response["stdout"].strip() if response else "守护进程未运行")
@@ -0,0 +1,206 @@
+"""
+写入队列（write-behind）：多个生产者提交写请求，由单个写线程合并为分组事务执行
+
+- ``submit`` 在调用方线程校验输入后立即返回 Future；写线程取到第一条请求后收集已排队的请求（至多 ``max_batch`` 条，
+  ``max_latency`` 大于 0 时最多再等待该秒数），把这一组放进同一个外层事务。默认不等待：上一组提交期间到达的请求
+  自然构成下一组，提交延迟不超过一组的执行时间
+- 组内每条请求在各自的保存点中执行（与批处理相同）：单条失败只回滚自己的保存点，异常交给它的 Future
+- 外层事务提交成功后才设置各 Future 的结果；遇到 ``database is locked`` 时整组回滚、退避后重试
+- 进程内只有写线程持有写事务，并发写不再互相争抢 SQLite 写锁；多进程经守护进程的 ``{"op": "write"}`` 共用同一写线程
+"""
+import importlib
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import OperationalError
+
+# 可排队的写操作 -> (输入模型, 结果模型)；操作名即 fundman.crud 中的函数名
+WRITE_OPERATIONS: Dict[str, Tuple[str, str]] = {
+    "create_asset": ("AssetCreate", "AssetInDB"),
+    "create_transaction": ("TransactionCreate", "TransactionInDB"),
+    "create_product": ("WealthProductCreate", "WealthProductInDB"),
+    "upsert_product_by_yindeng_code": ("WealthProductCreate", "WealthProductInDB"),
+}
+
+DEFAULT_MAX_BATCH = 500
+DEFAULT_MAX_LATENCY = 0.0
+DEFAULT_RETRIES = 5
+
+_STOP = object()
+
+
+def _model(name: str) -> Any:
+    """按名称取 fundman.models 中的模型类（延迟导入）"""
+    return getattr(importlib.import_module("fundman.models"), name)
+
+
+def _operation(name: str) -> Any:
+    """按名称取允许的 CRUD 写函数，不在 WRITE_OPERATIONS 中时抛出 ValueError"""
+    if name not in WRITE_OPERATIONS:
+        raise ValueError(f"不支持的写操作: {name}")
+    return getattr(importlib.import_module("fundman.crud"), name)
+
+
+def _is_locked(error: BaseException) -> bool:
+    """是否为数据库写锁冲突（可退避重试）"""
+    return isinstance(error, OperationalError) and "locked" in str(error).lower()
+
+
+def serialize_result(operation: str, result: Any) -> Dict[str, Any]:
+    """写操作结果转为可 JSON 序列化的字典（经结果模型校验）"""
+    return _model(WRITE_OPERATIONS[operation][1]).model_validate(result).model_dump(mode="json")
+
+
+class WriteBehindQueue:
+    """单写线程的写入队列"""
+
+    def __init__(
+        self,
+        engine: Any = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_latency: float = DEFAULT_MAX_LATENCY,
+        retries: int = DEFAULT_RETRIES,
+    ) -> None:
+        if engine is None:
+            from fundman.database import connection as db_connection
+            engine = db_connection.engine
+        self.engine = engine
+        self.max_batch = max(1, max_batch)
+        self.max_latency = max(0.0, max_latency)
+        self.retries = retries
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # 统计：已提交的组数、请求数、最大组大小、锁冲突重试次数
+        self.groups = 0
+        self.requests = 0
+        self.max_group = 0
+        self.lock_retries = 0
+
+    # 生命周期
+
+    def start(self) -> "WriteBehindQueue":
+        """启动写线程（重复调用无副作用）"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="fundman-writer", daemon=True)
+                self._thread.start()
+        return self
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """处理完已排队的请求后停止写线程"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def __enter__(self) -> "WriteBehindQueue":
+        """启动写线程"""
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        """处理完已排队的请求后停止写线程"""
+        self.close()
+
+    # 提交
+
+    def submit(self, operation: str, payload: Any) -> "Future[Any]":
+        """提交写请求；payload 为输入模型实例或字典（在调用方线程校验，校验失败直接抛出）"""
+        _operation(operation)
+        model = _model(WRITE_OPERATIONS[operation][0])
+        if not isinstance(payload, model):
+            payload = model.model_validate(payload)
+        if self._thread is None:
+            self.start()
+        future: "Future[Any]" = Future()
+        self._queue.put((operation, payload, future))
+        return future
+
+    def write(self, operation: str, payload: Any, timeout: Optional[float] = None) -> Any:
+        """提交并等待结果"""
+        return self.submit(operation, payload).result(timeout)
+
+    # 写线程
+
+    def _run(self) -> None:
+        """写线程主循环：取出首个请求后在 max_latency 内凑满至多 max_batch 个请求，作为一组执行"""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            group = [first]
+            deadline = time.monotonic() + self.max_latency
+            while len(group) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                group.append(item)
+            group = [item for item in group if item[2].set_running_or_notify_cancel()]
+            if group:
+                self._execute_group(group)
+
+    def _execute_group(self, group: List[Tuple[str, Any, "Future[Any]"]]) -> None:
+        """在一个外层事务中执行一组请求，提交成功后设置结果；写锁冲突时整组退避重试"""
+        for attempt in range(self.retries + 1):
+            try:
+                outcomes = self._apply(group)
+                break
+            except Exception as e:
+                if _is_locked(e) and attempt < self.retries:
+                    self.lock_retries += 1
+                    time.sleep(0.01 * 2 ** attempt)
+                    continue
+                for _, _, future in group:
+                    future.set_exception(e)
+                return
+        self.groups += 1
+        self.requests += len(group)
+        self.max_group = max(self.max_group, len(group))
+        for (_, _, future), (ok, value) in zip(group, outcomes):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _apply(self, group: List[Tuple[str, Any, "Future[Any]"]]) -> List[Tuple[bool, Any]]:
+        """在同一连接的外层事务中依次执行各请求，返回 [(是否成功, 结果或异常)]；写锁冲突向上抛出以整组重试"""
+        from fundman.database.connection import begin_transaction, bind_connection, new_session
+
+        outcomes: List[Tuple[bool, Any]] = []
+        with self.engine.connect() as connection, bind_connection(connection):
+            begin_transaction(connection)
+            for operation, payload, _ in group:
+                # 各请求使用独立会话：其 commit 只释放自己的保存点
+                db = new_session()
+                try:
+                    outcomes.append((True, _operation(operation)(db, payload)))
+                except Exception as e:
+                    if _is_locked(e):
+                        raise
+                    db.rollback()
+                    outcomes.append((False, e))
+                finally:
+                    db.close()
+            connection.commit()
+        return outcomes
+
+    def stats(self) -> Dict[str, Any]:
+        """写入统计"""
+        return {
+            "groups": self.groups,
+            "requests": self.requests,
+            "max_group": self.max_group,
+            "mean_group": self.requests / self.groups if self.groups else 0.0,
+            "lock_retries": self.lock_retries,
+            "pending": self._queue.qsize(),
+        }
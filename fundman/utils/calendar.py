@@ -0,0 +1,166 @@
+"""
+工作日日历：基于 np.busdaycalendar 的向量化工作日计数、顺延与计息天数
+
+- 节假日文件（默认 data/holidays_cn_interbank.txt，可用环境变量 FUNDMAN_HOLIDAY_FILE 指定）含 ``[holidays]`` 休市日
+  与 ``[workdays]`` 调休上班的周末两节，加载后预先构建 np.busdaycalendar
+- 所有函数接受标量或整列（列表、ndarray、Series），返回 ndarray；空日期（None/NaT）在计数中记为 0、在顺延中保持 NaT
+- 调休工作日不在 weekmask 内，计数与顺延时通过有序数组二分查找补入，同样是整列运算
+"""
+import functools
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_HOLIDAY_FILE = PROJECT_ROOT / "data" / "holidays_cn_interbank.txt"
+DEFAULT_WEEKMASK = "1111100"
+
+# 计息天数惯例：年化分母
+DAY_COUNT_BASES: Dict[str, float] = {"ACT/365": 365.0, "ACT/360": 360.0}
+ROLL_CONVENTIONS = ("following", "preceding", "modified_following")
+
+_NO_DAY = np.datetime64("NaT", "D")
+
+
+def to_days(values: Any) -> np.ndarray:
+    """转换为 datetime64[D] 数组（字符串、date、Timestamp、Series 均可，None 转为 NaT）"""
+    if hasattr(values, "to_numpy"):
+        values = values.to_numpy()
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[D]")
+    if array.dtype == object:
+        return np.array([_NO_DAY if value is None or value != value else value for value in array.ravel()],
+                        dtype="datetime64[D]").reshape(array.shape)
+    return array.astype("datetime64[D]")
+
+
+def load_holiday_file(path: Union[str, Path]) -> Dict[str, np.ndarray]:
+    """读取节假日文件，返回 {"holidays": ..., "workdays": ...}（datetime64[D] 数组，已排序）"""
+    sections: Dict[str, list] = {"holidays": [], "workdays": []}
+    current = "holidays"
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            text = line.split("#", 1)[0].strip()
+            if not text:
+                continue
+            if text.startswith("[") and text.endswith("]"):
+                current = text[1:-1].strip().lower()
+                if current not in sections:
+                    raise ValueError(f"{path} 第{line_no}行: 未知的节 [{current}]")
+                continue
+            try:
+                sections[current].append(np.datetime64(date.fromisoformat(text), "D"))
+            except ValueError as e:
+                raise ValueError(f"{path} 第{line_no}行: 无法解析日期 {text}") from e
+    return {name: np.unique(np.array(days, dtype="datetime64[D]")) for name, days in sections.items()}
+
+
+class BusinessCalendar:
+    """工作日日历（周一至周五，扣除节假日，补入调休工作日）"""
+
+    def __init__(self, holidays: Iterable[Any] = (), workdays: Iterable[Any] = (), weekmask: str = DEFAULT_WEEKMASK) -> None:
+        self.holidays = np.unique(to_days(list(holidays)))
+        self.workdays = np.unique(to_days(list(workdays)))
+        self.calendar = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], weekmask: str = DEFAULT_WEEKMASK) -> "BusinessCalendar":
+        """从节假日文件构建日历"""
+        days = load_holiday_file(path)
+        return cls(days["holidays"], days["workdays"], weekmask)
+
+    def _extra_before(self, days: np.ndarray) -> np.ndarray:
+        """早于给定日期的调休工作日个数"""
+        return np.searchsorted(self.workdays, days, side="left")
+
+    def is_business_day(self, days: Any) -> np.ndarray:
+        """是否为工作日"""
+        days = to_days(days)
+        valid = ~np.isnat(days)
+        filled = np.where(valid, days, np.datetime64(0, "D"))
+        extra = np.isin(filled, self.workdays)
+        return valid & (np.is_busday(filled, busdaycal=self.calendar) | extra)
+
+    def business_days_between(self, start: Any, end: Any) -> np.ndarray:
+        """[start, end) 内的工作日数（end 早于 start 时为负），任一端为空时记为 0"""
+        start, end = np.broadcast_arrays(to_days(start), to_days(end))
+        valid = ~(np.isnat(start) | np.isnat(end))
+        zero = np.datetime64(0, "D")
+        start = np.where(valid, start, zero)
+        end = np.where(valid, end, zero)
+        counts = np.busday_count(start, end, busdaycal=self.calendar)
+        if len(self.workdays):
+            counts = counts + (self._extra_before(end) - self._extra_before(start))
+        return np.where(valid, counts, 0).astype(np.int64)
+
+    def business_days_remaining(self, end: Any, query_date: Any) -> np.ndarray:
+        """查询日（含）至到期日（不含）的剩余工作日数，不小于 0"""
+        return np.maximum(self.business_days_between(query_date, end), 0)
+
+    def roll(self, days: Any, convention: str = "following") -> np.ndarray:
+        """将非工作日按惯例顺延：following 顺延至下一工作日，preceding 提前至上一工作日，
+        modified_following 顺延但跨月时改为提前"""
+        if convention not in ROLL_CONVENTIONS:
+            raise ValueError(f"不支持的顺延惯例: {convention}")
+        days = to_days(days)
+        valid = ~np.isnat(days)
+        filled = np.where(valid, days, np.datetime64(0, "D"))
+        if convention == "preceding":
+            rolled = self._roll_backward(filled)
+        else:
+            rolled = self._roll_forward(filled)
+            if convention == "modified_following":
+                crossed = rolled.astype("datetime64[M]") != filled.astype("datetime64[M]")
+                rolled = np.where(crossed, self._roll_backward(filled), rolled)
+        return np.where(valid, rolled, _NO_DAY)
+
+    def _roll_forward(self, days: np.ndarray) -> np.ndarray:
+        rolled = np.busday_offset(days, 0, roll="forward", busdaycal=self.calendar)
+        if len(self.workdays):
+            # 位于 [days, rolled) 之间的第一个调休工作日更早
+            pos = np.searchsorted(self.workdays, days, side="left")
+            candidate = self.workdays[np.minimum(pos, len(self.workdays) - 1)]
+            use = (pos < len(self.workdays)) & (candidate < rolled)
+            rolled = np.where(use, candidate, rolled)
+        return rolled
+
+    def _roll_backward(self, days: np.ndarray) -> np.ndarray:
+        rolled = np.busday_offset(days, 0, roll="backward", busdaycal=self.calendar)
+        if len(self.workdays):
+            pos = np.searchsorted(self.workdays, days, side="right") - 1
+            candidate = self.workdays[np.maximum(pos, 0)]
+            use = (pos >= 0) & (candidate > rolled)
+            rolled = np.where(use, candidate, rolled)
+        return rolled
+
+    def next_business_day(self, days: Any) -> np.ndarray:
+        """严格晚于给定日期的下一个工作日"""
+        return self.roll(to_days(days) + np.timedelta64(1, "D"), "following")
+
+    def previous_business_day(self, days: Any) -> np.ndarray:
+        """严格早于给定日期的上一个工作日"""
+        return self.roll(to_days(days) - np.timedelta64(1, "D"), "preceding")
+
+
+def year_fraction(start: Any, end: Any, convention: str = "ACT/365") -> np.ndarray:
+    """按计息天数惯例（ACT/365、ACT/360）计算年化期限，任一端为空时为 NaN"""
+    base = DAY_COUNT_BASES.get(convention.upper())
+    if base is None:
+        raise ValueError(f"不支持的计息天数惯例: {convention}")
+    start, end = np.broadcast_arrays(to_days(start), to_days(end))
+    days = np.where(np.isnat(start) | np.isnat(end), np.nan, (end - start).astype("float64"))
+    return days / base
+
+
+@functools.lru_cache(maxsize=None)
+def _load_calendar(path: str) -> BusinessCalendar:
+    return BusinessCalendar.from_file(path)
+
+
+def get_calendar(path: Optional[Union[str, Path]] = None) -> BusinessCalendar:
+    """获取（按路径缓存的）工作日日历；默认读取 FUNDMAN_HOLIDAY_FILE 或 data/holidays_cn_interbank.txt"""
+    return _load_calendar(str(path or os.getenv("FUNDMAN_HOLIDAY_FILE") or DEFAULT_HOLIDAY_FILE))
@@ -32,4 +32,16 @@ def days_remaining_on(end_date: str, query_date: str) -> int:
     """计算在查询日期时的剩余天数"""
     d_end = datetime.strptime(end_date, "%Y-%m-%d")
     d_q = datetime.strptime(query_date, "%Y-%m-%d")
-    return max(0, (d_end - d_q).days)
\ No newline at end of file
+    return max(0, (d_end - d_q).days)
+
+
+def business_days_between(start_date: str, end_date: str) -> int:
+    """计算两个日期之间的工作日数（按银行间市场节假日日历，含起始日、不含结束日）"""
+    from .calendar import get_calendar
+    return int(get_calendar().business_days_between(start_date, end_date))
+
+
+def business_days_remaining_on(end_date: str, query_date: str) -> int:
+    """计算在查询日期时的剩余工作日数"""
+    from .calendar import get_calendar
+    return int(get_calendar().business_days_remaining(end_date, query_date))
@@ -0,0 +1,130 @@
+"""
+内存预算：按内存占用自适应调整批大小
+
+两种度量方式：
+- ``rss``（Linux 默认）：进程常驻内存相对进入作用域时的增量，读取 /proc/self/statm，开销可忽略
+  （不计 Python 解释器与已导入的 pandas 等基线内存，否则小于基线的预算从首次采样起就超出）
+- ``tracemalloc``（无 /proc 时的回退）：作用域内新分配的 Python 内存，精确但会明显拖慢分配密集的代码
+
+两种方式的预算都只约束作用域内新增的内存。
+
+每批读取后调用 ``sample()``、处理完毕后调用 ``update(rows)``：用本批内存增量估算每行占用，使下一批的峰值落在预算的
+``target`` 比例以内（单次最多放大 2 倍、缩小到 1/4，并限制在 [minimum, maximum] 之间）。
+"""
+import os
+import re
+import tracemalloc
+from typing import Optional, Tuple
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+_STATM = "/proc/self/statm"
+
+
+def parse_size(text: str) -> int:
+    """解析内存大小（如 512M、1.5G、2048K、1048576），返回字节数"""
+    match = _SIZE_PATTERN.match(str(text))
+    if not match:
+        raise ValueError(f"无法解析内存大小: {text}")
+    size = int(float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()])
+    if size <= 0:
+        raise ValueError(f"内存大小必须为正数: {text}")
+    return size
+
+
+def format_size(size: float) -> str:
+    """格式化字节数为 MB"""
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+def current_rss() -> Optional[int]:
+    """进程当前常驻内存（字节）；无 /proc 的平台返回 None"""
+    try:
+        with open(_STATM, encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryBudget:
+    """在内存预算内自适应调整批大小（上下文管理器）"""
+
+    def __init__(self, limit: int, initial: int = 100, minimum: int = 10, maximum: int = 50000,
+                 target: float = 0.75, source: Optional[str] = None) -> None:
+        if limit <= 0:
+            raise ValueError("内存预算必须为正数")
+        if source is None:
+            source = "rss" if current_rss() is not None else "tracemalloc"
+        if source not in ("rss", "tracemalloc"):
+            raise ValueError(f"不支持的内存度量方式: {source}")
+        self.limit = limit
+        self.source = source
+        self.batch_size = max(minimum, min(initial, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target = target
+        self.peak = 0
+        self.batches = 0
+        self.exceeded = False
+        self._started = False
+        self._baseline = 0
+        self._batch_base = 0
+        self._batch_peak = 0
+
+    def __enter__(self) -> "MemoryBudget":
+        if self.source == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        if self.source == "rss":
+            self._baseline = current_rss() or 0
+        self._batch_base = self._batch_peak = self._measure()[0]
+        self._record(self._batch_peak)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    def _measure(self) -> Tuple[int, int]:
+        """返回 (当前占用, 自上次测量以来的峰值)，均为进入作用域以来的增量"""
+        if self.source == "rss":
+            current = max((current_rss() or 0) - self._baseline, 0)
+            return current, current
+        if not tracemalloc.is_tracing():
+            return 0, 0
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return current, peak
+
+    def _record(self, peak: int) -> None:
+        self.peak = max(self.peak, peak)
+        self.exceeded = self.exceeded or peak > self.limit
+
+    def sample(self) -> int:
+        """记录一次中间采样（如刚读入一批之后），返回当前占用"""
+        current, peak = self._measure()
+        self._batch_peak = max(self._batch_peak, peak)
+        self._record(peak)
+        return current
+
+    def update(self, rows: int) -> int:
+        """一批处理完毕（已提交并释放）后调用，返回下一批的大小"""
+        current, peak = self._measure()
+        peak = max(self._batch_peak, peak)
+        self._record(peak)
+        self.batches += 1
+        if rows > 0:
+            growth = peak - self._batch_base
+            headroom = self.limit * self.target - current
+            if headroom <= 0:
+                proposed = 0
+            elif growth > 0:
+                proposed = int(headroom / (growth / rows))
+            else:
+                # 本批未观察到增长（复用了已释放的内存），继续放大
+                proposed = self.batch_size * 2
+            proposed = max(self.batch_size // 4, min(proposed, self.batch_size * 2))
+            self.batch_size = max(self.minimum, min(proposed, self.maximum))
+        self._batch_base = self._batch_peak = current
+        return self.batch_size
@@ -0,0 +1,228 @@
+"""
+性能剖析：分阶段计时与 SQL 语句统计
+
+- ``span(name)``：计时区段（可嵌套），记录耗时、自身耗时及区段内执行的 SQL 条数与耗时
+- ``profiled(category)``：函数装饰器，以 ``<category>.<函数名>`` 为区段名
+- ``Profiler.start()`` 在所有 Engine 上注册 before/after_cursor_execute 钩子统计 SQL，并按会话提交事件统计 COMMIT
+
+未启用剖析时 span 返回共享的空上下文，profiled 只多一次判断，开销可忽略。
+结果可打印为汇总表，或写出 Chrome trace 格式（chrome://tracing、Perfetto 可直接打开）。
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+# 当前生效的剖析器（None 表示未启用）
+_active: Optional["Profiler"] = None
+_NULL_SPAN = contextlib.nullcontext()
+# trace 中 SQL 语句的最大保留长度
+STATEMENT_PREVIEW = 200
+
+
+class Span:
+    """一次区段执行的记录"""
+    __slots__ = ("name", "category", "start", "duration", "thread_id", "child_time", "sql_count", "sql_time", "args")
+
+    def __init__(self, name: str, category: str, args: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.category = category
+        self.start = time.perf_counter_ns()
+        self.duration = 0
+        self.thread_id = threading.get_ident()
+        self.child_time = 0
+        self.sql_count = 0
+        self.sql_time = 0
+        self.args = args
+
+
+class Profiler:
+    """收集区段与 SQL 事件"""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self.statements: List[Dict[str, Any]] = []
+        self.origin = time.perf_counter_ns()
+        self._local = threading.local()
+        self._hooks: List[Tuple[Any, str, Callable]] = []
+
+    # 区段
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: Optional[str] = None, **args: Any) -> Iterator[Span]:
+        """计时区段；category 默认取名称中第一个点之前的部分"""
+        record = Span(name, category or name.split(".", 1)[0], args or None)
+        stack = self._stack()
+        stack.append(record)
+        try:
+            yield record
+        finally:
+            record.duration = time.perf_counter_ns() - record.start
+            stack.pop()
+            if stack:
+                stack[-1].child_time += record.duration
+            self.spans.append(record)
+
+    # SQL 钩子
+
+    def start(self) -> "Profiler":
+        """注册 SQL 钩子并设为当前剖析器"""
+        global _active
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        from sqlalchemy.orm import Session
+
+        def before(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            conn.info.setdefault("fundman_query_start", []).append(time.perf_counter_ns())
+
+        def after(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            started = conn.info["fundman_query_start"].pop()
+            self._record_statement(statement, started, time.perf_counter_ns() - started, executemany)
+
+        def commit_started(session: Any, *args: Any) -> None:
+            session.info["fundman_commit_start"] = time.perf_counter_ns()
+
+        def committed(session: Any) -> None:
+            # 事务提交不经过游标，按会话提交事件计时（不含提交前 flush 发出的语句）
+            started = session.info.pop("fundman_commit_start", None)
+            if started is not None:
+                self._record_statement("COMMIT", started, time.perf_counter_ns() - started, False)
+
+        self._hooks = [
+            (Engine, "before_cursor_execute", before),
+            (Engine, "after_cursor_execute", after),
+            (Session, "before_commit", commit_started),
+            (Session, "after_flush_postexec", commit_started),
+            (Session, "after_commit", committed),
+        ]
+        for target, name, fn in self._hooks:
+            event.listen(target, name, fn)
+        _active = self
+        return self
+
+    def stop(self) -> None:
+        """移除 SQL 钩子并取消当前剖析器"""
+        global _active
+        from sqlalchemy import event
+
+        for target, name, fn in self._hooks:
+            event.remove(target, name, fn)
+        self._hooks = []
+        if _active is self:
+            _active = None
+
+    def _record_statement(self, statement: str, started: int, duration: int, executemany: bool) -> None:
+        # SQL 耗时计入所有外层区段（含嵌套）
+        for record in self._stack():
+            record.sql_count += 1
+            record.sql_time += duration
+        self.statements.append({
+            "verb": statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "?",
+            "statement": statement,
+            "start": started,
+            "duration": duration,
+            "thread_id": threading.get_ident(),
+            "executemany": executemany,
+        })
+
+    # 结果
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """按区段名汇总：次数、总耗时、自身耗时、SQL 条数与耗时（毫秒）"""
+        rows: Dict[str, Dict[str, Any]] = {}
+        for record in self.spans:
+            row = rows.setdefault(record.name, {"name": record.name, "calls": 0, "total_ms": 0.0, "self_ms": 0.0,
+                                                "sql_count": 0, "sql_ms": 0.0})
+            row["calls"] += 1
+            row["total_ms"] += record.duration / 1e6
+            row["self_ms"] += (record.duration - record.child_time) / 1e6
+            row["sql_count"] += record.sql_count
+            row["sql_ms"] += record.sql_time / 1e6
+        return sorted(rows.values(), key=lambda row: row["total_ms"], reverse=True)
+
+    def sql_summary(self) -> List[Dict[str, Any]]:
+        """按语句类型（SELECT/INSERT/...）汇总 SQL 条数与耗时"""
+        rows: Dict[str, Dict[str, Any]] = {}
+        for item in self.statements:
+            row = rows.setdefault(item["verb"], {"verb": item["verb"], "count": 0, "total_ms": 0.0})
+            row["count"] += 1
+            row["total_ms"] += item["duration"] / 1e6
+        return sorted(rows.values(), key=lambda row: row["total_ms"], reverse=True)
+
+    def print_table(self, stream: TextIO) -> None:
+        """打印分阶段耗时与 SQL 汇总表"""
+        print(f"{'阶段':<40} {'次数':>8} {'总耗时ms':>12} {'自身ms':>12} {'平均ms':>10} {'SQL数':>8} {'SQL ms':>10}", file=stream)
+        print("-" * 106, file=stream)
+        for row in self.summary():
+            print(f"{row['name']:<40} {row['calls']:>8} {row['total_ms']:>12.2f} {row['self_ms']:>12.2f} "
+                  f"{row['total_ms'] / row['calls']:>10.3f} {row['sql_count']:>8} {row['sql_ms']:>10.2f}", file=stream)
+        total_ms = sum(item["duration"] for item in self.statements) / 1e6
+        print(f"\nSQL 语句: {len(self.statements)} 条，共 {total_ms:.2f}ms", file=stream)
+        for row in self.sql_summary():
+            print(f"  {row['verb']:<10} {row['count']:>8} {row['total_ms']:>12.2f}ms", file=stream)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """生成 Chrome trace（Trace Event Format，完整事件 ph=X，时间单位微秒）"""
+        pid = os.getpid()
+        events = []
+        for record in self.spans:
+            args = {"sql_count": record.sql_count, "sql_ms": round(record.sql_time / 1e6, 3)}
+            args.update({key: str(value) for key, value in (record.args or {}).items()})
+            events.append({"name": record.name, "cat": record.category, "ph": "X", "pid": pid, "tid": record.thread_id,
+                           "ts": (record.start - self.origin) / 1000, "dur": record.duration / 1000, "args": args})
+        for item in self.statements:
+            events.append({"name": item["verb"], "cat": "sql", "ph": "X", "pid": pid, "tid": item["thread_id"],
+                           "ts": (item["start"] - self.origin) / 1000, "dur": item["duration"] / 1000,
+                           "args": {"statement": item["statement"][:STATEMENT_PREVIEW],
+                                    "executemany": item["executemany"]}})
+        events.sort(key=lambda event: event["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path: str) -> None:
+        """写出 Chrome trace JSON 文件"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
+
+
+def span(name: str, category: Optional[str] = None, **args: Any) -> Any:
+    """当前剖析器上的计时区段；未启用剖析时为空上下文"""
+    profiler = _active
+    if profiler is None:
+        return _NULL_SPAN
+    return profiler.span(name, category, **args)
+
+
+def profiled(category: str) -> Callable[[Callable], Callable]:
+    """函数装饰器：启用剖析时以 ``<category>.<函数名>`` 计时"""
+    def decorate(fn: Callable) -> Callable:
+        name = f"{category}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            profiler = _active
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with profiler.span(name, category):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def profiling(name: str = "command") -> Iterator[Profiler]:
+    """在作用域内启用剖析，整个作用域记为一个顶层区段"""
+    profiler = Profiler().start()
+    try:
+        with profiler.span(name):
+            yield profiler
+    finally:
+        profiler.stop()
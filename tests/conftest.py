@@ -1,4 +1,17 @@
 import pytest
+import os
+
+import atexit
+import shutil
+import tempfile
+
+# 测试始终在进程内执行，避免转发给开发机上可能正在运行的守护进程
+os.environ.setdefault("FUNDMAN_NO_DAEMON", "1")
+# 默认引擎指向临时库：调用 init_db 的测试不得改动仓库中的 data/fund_report.db（须在导入 fundman 之前设置）
+_default_db_dir = tempfile.mkdtemp()
+atexit.register(shutil.rmtree, _default_db_dir, True)
+os.environ["FUNDMAN_DB_URL"] = f"sqlite:///{os.path.join(_default_db_dir, 'fund_report.db')}"
+
 from fundman.database.connection import init_db, get_db
 from fundman.models import Base, WealthProductDB, AssetDB, TransactionDB
 import os
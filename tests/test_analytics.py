@@ -0,0 +1,96 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+
+from fundman.models import AssetCreate, WealthProductCreate, TransactionCreate
+from fundman.crud import create_asset, upsert_product_by_yindeng_code, create_transaction
+from fundman.analytics import load_transaction_frame, compute_portfolio_analytics, portfolio_analytics
+from fundman.app import analytics_data
+
+
+@pytest.fixture
+def portfolio(db_session):
+    """两个产品：A 持有债券与存款，B 持有一笔已到期的债券"""
+    bond = create_asset(db_session, AssetCreate(asset_name="债券", asset_code="AN_BOND", asset_type="债券",
+                                                issuer="发行人甲", industry="金融", region="北京"))
+    deposit = create_asset(db_session, AssetCreate(asset_name="存款", asset_code="AN_DEP", asset_type="存款",
+                                                   issuer="银行乙", industry=None, region="上海"))
+    products = []
+    for code, benchmark in [("YD_AN_A", 0.03), ("YD_AN_B", 0.025)]:
+        products.append(upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+            product_name=f"产品{code[-1]}",
+            product_yindeng_code=code,
+            product_start_date=date(2025, 1, 1),
+            product_end_date=date(2025, 12, 31),
+            product_days_total=364,
+            product_performance_benchmark=benchmark,
+        )))
+    a, b = products
+    for product, asset, maturity, rate, amount in [
+        (a, bond, date(2025, 9, 30), 4.0, 300.0),
+        (a, deposit, date(2025, 7, 31), 2.0, 100.0),
+        (b, bond, date(2025, 5, 31), 5.0, 500.0),  # 查询日前已到期
+    ]:
+        create_transaction(db_session, TransactionCreate(
+            product_id=product.product_id, asset_id=asset.asset_id,
+            investment_date=date(2025, 2, 1), maturity_date=maturity,
+            interest_rate=rate, quantity=1.0, settlement_amount=amount,
+        ))
+    return products
+
+
+def test_summary_weighted_metrics(db_session, portfolio):
+    result = portfolio_analytics(db_session, "2025-07-01")
+    summary = result["summary"]
+    assert list(summary["product_yindeng_code"]) == ["YD_AN_A"]
+    row = summary.iloc[0]
+    assert row["settlement_total"] == pytest.approx(400.0)
+    assert row["weighted_yield"] == pytest.approx((300 * 4.0 + 100 * 2.0) / 400)
+    # 剩余期限：2025-09-30 为 91 天，2025-07-31 为 30 天
+    assert row["weighted_remaining_days"] == pytest.approx((300 * 91 + 100 * 30) / 400)
+    # 业绩基准按小数存储（0.03），换算为百分数后比较：差值单位为百分点
+    assert row["benchmark"] == pytest.approx(3.0)
+    assert row["excess_over_benchmark"] == pytest.approx(3.5 - 3.0)
+
+
+def test_summary_business_day_remaining(db_session, portfolio):
+    result = portfolio_analytics(db_session, "2025-07-01", business_days=True)
+    row = result["summary"].iloc[0]
+    # 区间内无节假日，2025-09-28（周日）为调休工作日
+    long_term = np.busday_count("2025-07-01", "2025-09-30") + 1
+    short_term = np.busday_count("2025-07-01", "2025-07-31")
+    assert row["weighted_remaining_days"] == pytest.approx((300 * long_term + 100 * short_term) / 400)
+
+
+def test_holdings_share_by_dimension(db_session, portfolio):
+    result = portfolio_analytics(db_session, "2025-07-01")
+    by_type = result["asset_type"].set_index("asset_type")
+    assert by_type.loc["债券", "share"] == pytest.approx(0.75)
+    assert by_type.loc["存款", "share"] == pytest.approx(0.25)
+    # 缺失的行业归入“未知”
+    assert "未知" in set(result["industry"]["industry"])
+
+
+def test_compute_matches_per_product_loop(db_session, portfolio):
+    frame = load_transaction_frame(db_session)
+    vectorized = compute_portfolio_analytics(frame, "2025-03-01")["summary"].set_index("product_id")
+    for product_id, group in frame.groupby("product_id"):
+        expected = np.average(group["interest_rate"], weights=group["settlement_amount"])
+        assert vectorized.loc[product_id, "weighted_yield"] == pytest.approx(expected)
+
+
+def test_filter_by_product_code(db_session, portfolio):
+    result = portfolio_analytics(db_session, "2025-03-01", product_codes=["YD_AN_B"])
+    assert list(result["summary"]["product_yindeng_code"]) == ["YD_AN_B"]
+
+
+def test_analytics_cli_writes_report(db_session, portfolio, tmp_path, capsys):
+    out = tmp_path / "analytics.csv"
+    with patch("fundman.app.get_db", return_value=iter([db_session])):
+        analytics_data("2025-07-01", output=str(out))
+    printed = capsys.readouterr().out
+    assert "1 个产品" in printed
+    assert out.exists()
+    assert (tmp_path / "analytics_issuer.csv").exists()
@@ -0,0 +1,167 @@
+import http.client
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from fundman.server.api import ApiServer
+
+
+@pytest.fixture
+def api(db_engine, db_session):
+    """在后台线程中运行 HTTP 接口；请求使用测试数据库"""
+    factory = sessionmaker(autoflush=False, bind=db_engine)
+
+    @contextmanager
+    def session_scope():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    server = ApiServer(("127.0.0.1", 0), workers=8, session_factory=session_scope)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def call(port, method, path, body=None, headers=None, conn=None):
+    conn = conn or http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+    conn.request(method, path, body=payload, headers=headers or {})
+    response = conn.getresponse()
+    return response, response.read()
+
+
+PRODUCTS = [
+    {"product_name": "产品A", "product_yindeng_code": "YD_API_A", "product_start_date": "2025-01-01",
+     "product_end_date": "2025-12-31", "product_days_total": 364},
+    {"product_name": "产品B", "product_yindeng_code": "YD_API_B", "product_start_date": "2025-01-01",
+     "product_end_date": "2026-06-30", "product_days_total": 545},
+]
+
+
+def test_bulk_create_and_list(api):
+    response, body = call(api, "POST", "/products", PRODUCTS)
+    assert response.status == 201
+    product_ids = json.loads(body)["ids"]
+    assert len(product_ids) == 2
+
+    assets = [{"asset_name": f"债{i}", "asset_code": f"API_{i}", "asset_type": "债券"} for i in range(3)]
+    response, body = call(api, "POST", "/assets", assets)
+    asset_ids = json.loads(body)["ids"]
+    transactions = [{"product_id": product_ids[0], "asset_id": asset_id, "investment_date": "2025-02-01",
+                     "quantity": 10, "unit_full_price": 1.5} for asset_id in asset_ids]
+    response, body = call(api, "POST", "/transactions", transactions)
+    assert response.status == 201
+
+    response, body = call(api, "GET", f"/transactions?product_id={product_ids[0]}&limit=2")
+    rows = json.loads(body)
+    assert response.status == 200
+    assert [row["asset_id"] for row in rows] == asset_ids[:2]
+    assert rows[0]["settlement_amount"] == pytest.approx(15.0)
+    assert rows[0]["investment_date"] == "2025-02-01"
+
+    response, body = call(api, "GET", "/products?query_date=2025-12-01")
+    remaining = {row["product_yindeng_code"]: row["product_days_remaining"] for row in json.loads(body)}
+    assert remaining == {"YD_API_A": 30, "YD_API_B": 211}
+
+
+def test_products_query_uses_resident_snapshot(api):
+    call(api, "POST", "/products", PRODUCTS)
+    path = "/products?query_date=2025-12-01&skip=1&limit=1"
+    _, expected = call(api, "GET", path)
+    with patch("fundman.analytics.product_table._tables", {}), \
+            patch("fundman.analytics.product_table._resident", True), \
+            patch("fundman.crud.query_dynamic") as crud_query:
+        response, body = call(api, "GET", path)
+        # 快照按变更日志刷新：新增产品后立即可见
+        call(api, "POST", "/products", {**PRODUCTS[0], "product_yindeng_code": "YD_API_C"})
+        _, refreshed = call(api, "GET", "/products?query_date=2025-12-01")
+    crud_query.assert_not_called()
+    assert response.status == 200 and json.loads(body) == json.loads(expected)
+    assert [row["product_yindeng_code"] for row in json.loads(body)] == ["YD_API_B"]
+    assert [row["product_yindeng_code"] for row in json.loads(refreshed)] == ["YD_API_A", "YD_API_B", "YD_API_C"]
+
+
+def test_jsonl_stream_and_etag(api):
+    call(api, "POST", "/assets", [{"asset_name": f"债{i}", "asset_code": f"ST_{i}", "asset_type": "债券"}
+                                  for i in range(250)])
+    conn = http.client.HTTPConnection("127.0.0.1", api, timeout=10)
+    response, body = call(api, "GET", "/assets?format=jsonl", conn=conn)
+    assert response.getheader("Transfer-Encoding") == "chunked"
+    lines = body.decode("utf-8").splitlines()
+    assert len(lines) == 250
+    assert json.loads(lines[-1])["asset_code"] == "ST_249"
+
+    # 同一 keep-alive 连接上的条件 GET
+    etag = response.getheader("ETag")
+    response, body = call(api, "GET", "/assets?format=jsonl", headers={"If-None-Match": etag}, conn=conn)
+    assert response.status == 304 and body == b""
+
+    call(api, "POST", "/assets", {"asset_name": "新债", "asset_code": "ST_NEW", "asset_type": "债券"})
+    response, _ = call(api, "GET", "/assets?format=jsonl", headers={"If-None-Match": etag}, conn=conn)
+    assert response.status == 200
+    assert response.getheader("ETag") != etag
+
+
+def test_no_etag_without_change_log(api):
+    call(api, "POST", "/assets", {"asset_name": "债", "asset_code": "NE_1", "asset_type": "债券"})
+    with patch("fundman.database.versions.has_change_log", return_value=False):
+        response, body = call(api, "GET", "/assets", headers={"If-None-Match": "*"})
+    assert response.status == 200 and response.getheader("ETag") is None
+    assert [row["asset_code"] for row in json.loads(body)] == ["NE_1"]
+
+
+def test_stream_error_closes_connection(api):
+    # 流式输出途中出错：不在分块响应体中再写一个 JSON 错误响应，直接关闭连接（客户端读到不完整的响应）
+    def rows(*args):
+        yield {"asset_code": "ok"}
+        raise RuntimeError("读取中断")
+
+    with patch.object(ApiServer, "list_rows", side_effect=rows), \
+            socket.create_connection(("127.0.0.1", api), timeout=10) as sock:
+        sock.sendall(b"GET /assets?format=jsonl HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        raw = b""
+        while chunk := sock.recv(65536):
+            raw += chunk
+    assert raw.count(b"HTTP/1.1 ") == 1 and raw.startswith(b"HTTP/1.1 200")
+    assert b"error" not in raw and not raw.endswith(b"0\r\n\r\n")
+    # 服务仍可正常处理后续请求
+    response, body = call(api, "GET", "/health")
+    assert response.status == 200 and json.loads(body) == {"status": "ok"}
+
+
+def test_errors(api):
+    response, body = call(api, "POST", "/assets", [{"asset_name": "缺类型"}])
+    assert response.status == 422
+    assert json.loads(body)["detail"][0]["loc"] == [0, "asset_type"]
+
+    call(api, "POST", "/assets", [{"asset_name": "债", "asset_code": "DUP", "asset_type": "债券"}])
+    response, _ = call(api, "POST", "/assets", [{"asset_name": "债", "asset_code": "DUP", "asset_type": "债券"}])
+    assert response.status == 409
+
+    assert call(api, "GET", "/nothing")[0].status == 404
+    assert call(api, "GET", "/assets?color=red")[0].status == 400
+    assert call(api, "GET", "/transactions?product_id=x")[0].status == 400
+    assert call(api, "GET", "/products?query_date=bad")[0].status == 400
+
+
+def test_many_concurrent_clients(api):
+    call(api, "POST", "/products", PRODUCTS)
+
+    def client(_):
+        response, body = call(api, "GET", "/products?query_date=2025-06-30")
+        return response.status, len(json.loads(body))
+
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        results = list(pool.map(client, range(300)))
+    assert results == [(200, 2)] * 300
@@ -0,0 +1,73 @@
+import io
+import json
+from datetime import date
+
+import pytest
+
+from fundman.batch import parse_line, run_batch
+from fundman.crud import get_assets, get_transactions, upsert_product_by_yindeng_code
+from fundman.models import WealthProductCreate
+
+
+@pytest.fixture
+def product(db_session):
+    return upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+        product_name="批处理产品", product_yindeng_code="YD_BATCH",
+        product_start_date=date(2025, 1, 1), product_end_date=date(2025, 12, 31), product_days_total=364,
+    ))
+
+
+def asset_line(code):
+    return f"investment create-asset --name 资产{code} --code {code} --type 债券"
+
+
+def test_parse_line_formats():
+    assert parse_line("  # 注释") is None
+    assert parse_line("") is None
+    assert parse_line("fundman investment create-asset --name '资产 A' --code A") == [
+        "investment", "create-asset", "--name", "资产 A", "--code", "A"]
+    assert parse_line(json.dumps(["investment", "list-assets"])) == ["investment", "list-assets"]
+    assert parse_line(json.dumps({"argv": ["query", "--query-date", "2025-08-01"]})) == [
+        "query", "--query-date", "2025-08-01"]
+    with pytest.raises(ValueError):
+        parse_line(json.dumps({"command": "query"}))
+
+
+def test_batch_runs_commands_and_reports_failures(db_engine, db_session, product, capsys):
+    lines = [
+        asset_line("B1"),
+        json.dumps(["investment", "create-asset", "--name", "资产B2", "--code", "B2", "--type", "债券"]),
+        asset_line("B1"),  # 重复编码：失败但不影响其他命令
+        "investment create-asset --name 缺少参数",
+        "investment create-transaction --product-code YD_BATCH --asset-code B2 "
+        "--investment-date 2025-02-01 --quantity 10 --unit-full-price 1.5",
+        "investment create-transaction --product-code NOPE --asset-code B2 --investment-date 2025-02-01 --quantity 1",
+        "serve",
+    ]
+    err = io.StringIO()
+    result = run_batch(lines, engine=db_engine, err=err)
+
+    assert result["total"] == 7
+    assert result["succeeded"] == 3
+    assert [number for number, _, _ in result["failed"]] == [3, 4, 6, 7]
+    assert result["commits"] == 1
+    assert "第 3 行失败" in err.getvalue()
+    assert "required" in result["failed"][1][2]
+
+    db_session.expire_all()
+    assert sorted(a.asset_code for a in get_assets(db_session)) == ["B1", "B2"]
+    transactions = get_transactions(db_session)
+    assert len(transactions) == 1
+    assert transactions[0].settlement_amount == pytest.approx(15.0)
+
+
+def test_stop_on_error_rolls_back_uncommitted(db_engine, db_session):
+    lines = [asset_line("S1"), asset_line("S2"), asset_line("S3"), asset_line("S1"), asset_line("S4")]
+    result = run_batch(lines, commit_every=2, stop_on_error=True, engine=db_engine, err=io.StringIO())
+
+    assert result["aborted"] is True
+    assert result["commits"] == 1
+    assert result["succeeded"] == 3
+    db_session.expire_all()
+    # S1、S2 已按间隔提交，S3 随未提交的部分一起回滚
+    assert sorted(a.asset_code for a in get_assets(db_session)) == ["S1", "S2"]
@@ -0,0 +1,68 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from fundman.bench.generator import generate_dataset, populate_database, to_import_frame, write_dataset
+from fundman.bench.suite import run_suite
+from fundman.data_processor import import_data_file
+from fundman.database.connection import bind_engine
+from fundman.models import Base, TransactionDB, WealthProductDB
+
+
+def test_generator_is_deterministic_and_consistent():
+    first = generate_dataset(50, 20, 400, seed=7)
+    second = generate_dataset(50, 20, 400, seed=7)
+    assert all(first[name].equals(second[name]) for name in first)
+    assert not first["transactions"].equals(generate_dataset(50, 20, 400, seed=8)["transactions"])
+
+    products = first["products"].set_index("product_id")
+    transactions = first["transactions"]
+    assert products["product_yindeng_code"].is_unique
+    assert transactions["asset_id"].between(1, 20).all()
+    # 投资日期落在所属产品的存续期内，且不晚于基准日
+    starts = products.loc[transactions["product_id"], "product_start_date"].to_numpy()
+    assert (transactions["investment_date"].to_numpy() >= starts).all()
+    assert (transactions["investment_date"] <= date(2025, 6, 30)).all()
+
+
+def test_generated_file_imports_and_database_populates(tmp_path):
+    dataset = generate_dataset(30, 10, 100, seed=3)
+    paths = write_dataset(dataset, tmp_path, "csv")
+    assert [path.name for path in paths] == ["products.csv", "assets.csv", "transactions.csv"]
+    assert list(to_import_frame(dataset["products"]).columns)[:2] == ["产品名称", "银登编码"]
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    Base.metadata.create_all(bind=engine)
+    with bind_engine(engine):
+        import_data_file(str(tmp_path / "products.csv"), "2025-06-30")
+    with Session(engine) as db:
+        benchmark = db.scalar(select(WealthProductDB.product_performance_benchmark).where(WealthProductDB.product_id == 1))
+        assert db.scalar(select(func.count()).select_from(WealthProductDB)) == 30
+    # 文件导入与直接写入得到同一口径的业绩基准
+    assert benchmark == pytest.approx(dataset["products"].loc[0, "product_performance_benchmark"])
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'direct.db'}")
+    Base.metadata.create_all(bind=engine)
+    assert populate_database(engine, dataset) == {"products": 30, "assets": 10, "transactions": 100}
+    with Session(engine) as db:
+        assert db.scalar(select(func.sum(TransactionDB.settlement_amount))) == pytest.approx(
+            dataset["transactions"]["settlement_amount"].sum())
+        assert db.scalar(select(WealthProductDB.product_performance_benchmark).where(
+            WealthProductDB.product_id == 1)) == pytest.approx(benchmark)
+
+
+def test_run_suite_reports_metrics(tmp_path):
+    report = run_suite(products=20, assets=10, transactions=200, repeat=2, data_dir=str(tmp_path),
+                       only=["import", "query_dynamic", "lookup", "analytics_portfolio"])
+    results = report["results"]
+    assert set(results) == {"import_csv", "query_dynamic_validate", "query_dynamic_row",
+                            "lookup_asset_by_code", "analytics_portfolio"}
+    metrics = results["query_dynamic_row"]
+    assert metrics["runs"] == 2 and metrics["rows"] == 20
+    assert metrics["p50_ms"] <= metrics["p99_ms"] <= metrics["max_ms"]
+    assert metrics["rows_per_sec"] > 0 and metrics["peak_memory_mb"] is not None
+    assert results["lookup_asset_by_code"]["runs"] == 1000
+    assert report["params"]["transactions"] == 200
+    assert (tmp_path / "products.csv").exists()
@@ -0,0 +1,95 @@
+import pytest
+from datetime import date
+
+from fundman.models import AssetCreate, WealthProductCreate, TransactionCreate
+from fundman.crud import (
+    create_asset, upsert_product_by_yindeng_code, create_transaction,
+    get_transaction, get_transactions, get_product_by_yindeng_code,
+    update_transactions_where, delete_transactions_where,
+    update_products_where, delete_products_where,
+)
+
+
+@pytest.fixture
+def book(db_session):
+    """两个资产、一个产品、四笔交易"""
+    bond = create_asset(db_session, AssetCreate(asset_name="债券X", asset_code="BULK_X", asset_type="债券"))
+    fund = create_asset(db_session, AssetCreate(asset_name="基金Y", asset_code="BULK_Y", asset_type="基金"))
+    product = upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+        product_name="批量产品",
+        product_yindeng_code="YD_BULK_1",
+        product_start_date=date(2025, 1, 1),
+        product_end_date=date(2025, 12, 31),
+        product_days_total=364,
+    ))
+    trades = []
+    for asset, day, price in [(bond, 1, 100.0), (bond, 1, None), (bond, 2, 100.0), (fund, 1, 1.0)]:
+        trades.append(create_transaction(db_session, TransactionCreate(
+            product_id=product.product_id,
+            asset_id=asset.asset_id,
+            investment_date=date(2025, 8, day),
+            quantity=10.0,
+            unit_full_price=price,
+            settlement_amount=None if price else 5.0,
+        )))
+    return product, bond, fund, trades
+
+
+def test_update_where_reprices_and_recomputes_settlement(db_session, book):
+    _, bond, _, trades = book
+    count = update_transactions_where(
+        db_session,
+        {"asset_id": bond.asset_id, "investment_date": date(2025, 8, 1)},
+        {"unit_full_price": 102.5},
+    )
+    assert count == 2
+    assert get_transaction(db_session, trades[0].transaction_id).settlement_amount == pytest.approx(1025.0)
+    assert get_transaction(db_session, trades[1].transaction_id).settlement_amount == pytest.approx(1025.0)
+    # 未命中条件的交易保持不变
+    assert get_transaction(db_session, trades[2].transaction_id).unit_full_price == pytest.approx(100.0)
+
+
+def test_update_where_quantity_uses_existing_price_and_keeps_null_product(db_session, book):
+    _, bond, _, trades = book
+    # 将第二笔的全价置空，再更新数量：乘积为 NULL 时保留原清算金额
+    update_transactions_where(db_session, {"transaction_id": trades[1].transaction_id}, {"unit_full_price": None})
+    count = update_transactions_where(db_session, {"asset_id": bond.asset_id}, {"quantity": 20.0})
+    assert count == 3
+    assert get_transaction(db_session, trades[0].transaction_id).settlement_amount == pytest.approx(2000.0)
+    assert get_transaction(db_session, trades[1].transaction_id).settlement_amount == pytest.approx(5.0)
+
+
+def test_update_where_explicit_none_keeps_settlement(db_session, book):
+    _, bond, _, trades = book
+    # 显式置空全价：不按旧全价重算，保留原清算金额（与 update_transaction 一致）
+    update_transactions_where(db_session, {"transaction_id": trades[0].transaction_id},
+                              {"unit_full_price": None, "quantity": 30.0})
+    updated = get_transaction(db_session, trades[0].transaction_id)
+    assert updated.unit_full_price is None and updated.quantity == pytest.approx(30.0)
+    assert updated.settlement_amount == pytest.approx(1000.0)
+
+
+def test_update_where_validates_values_and_filters(db_session, book):
+    with pytest.raises(ValueError):
+        update_transactions_where(db_session, {}, {"quantity": 1.0})
+    with pytest.raises(ValueError):
+        update_transactions_where(db_session, {"no_such_column": 1}, {"quantity": 1.0})
+    with pytest.raises(ValueError):
+        update_transactions_where(db_session, {"asset_id": 1}, {"quantity": "not-a-number"})
+
+
+def test_delete_transactions_where_in_list(db_session, book):
+    _, bond, fund, _ = book
+    assert delete_transactions_where(db_session, {"asset_id": [bond.asset_id, fund.asset_id], "investment_date": date(2025, 8, 1)}) == 3
+    assert len(get_transactions(db_session)) == 1
+
+
+def test_update_and_delete_products_where(db_session, book):
+    product, *_ = book
+    assert update_products_where(db_session, {"product_yindeng_code": "YD_BULK_1"}, {"product_performance_benchmark": 0.035}) == 1
+    db_session.expire_all()
+    assert get_product_by_yindeng_code(db_session, "YD_BULK_1").product_performance_benchmark == pytest.approx(0.035)
+
+    delete_transactions_where(db_session, {"product_id": product.product_id})
+    assert delete_products_where(db_session, {"product_yindeng_code": ["YD_BULK_1", "YD_MISSING"]}) == 1
+    assert get_product_by_yindeng_code(db_session, "YD_BULK_1") is None
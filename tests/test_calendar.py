@@ -0,0 +1,69 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fundman.utils.calendar import BusinessCalendar, get_calendar, load_holiday_file, year_fraction
+from fundman.utils.date_utils import business_days_between, business_days_remaining_on
+
+
+@pytest.fixture
+def calendar():
+    return get_calendar()
+
+
+def test_default_file_loads(calendar):
+    assert np.datetime64("2025-10-01") in calendar.holidays
+    assert np.datetime64("2025-09-28") in calendar.workdays
+
+
+def test_business_days_between_spring_festival(calendar):
+    # 2025-01-24 至 2025-02-10：春节 01-28 至 02-04 休市，01-26（周日）与 02-08（周六）调休上班
+    days = calendar.business_days_between(["2025-01-24", "2025-02-10"], ["2025-02-10", "2025-01-24"])
+    assert days.tolist() == [7, -7]
+    assert business_days_between("2025-01-24", "2025-02-10") == 7
+    assert business_days_remaining_on("2025-01-24", "2025-02-10") == 0
+
+
+def test_whole_column_with_missing_dates(calendar):
+    ends = pd.Series([pd.Timestamp("2025-12-31"), pd.NaT, pd.Timestamp("2025-06-01")])
+    remaining = calendar.business_days_remaining(ends, "2025-06-30")
+    # 国庆 6 个工作日休市，09-28 与 10-11 调休上班
+    assert remaining.tolist() == [np.busday_count("2025-06-30", "2025-12-31") - 6 + 2, 0, 0]
+    flags = calendar.is_business_day([date(2025, 1, 26), None, date(2025, 1, 28), date(2025, 1, 27)])
+    assert flags.tolist() == [True, False, False, True]
+
+
+def test_rolls(calendar):
+    days = ["2025-01-25", "2025-02-01", "2025-05-31", "2025-01-27", None]
+    assert calendar.roll(days, "following").astype(str).tolist() == \
+        ["2025-01-26", "2025-02-05", "2025-06-03", "2025-01-27", "NaT"]
+    assert calendar.roll(days, "preceding").astype(str).tolist() == \
+        ["2025-01-24", "2025-01-27", "2025-05-30", "2025-01-27", "NaT"]
+    # 2025-05-31 顺延后跨月，改为提前
+    assert str(calendar.roll("2025-05-31", "modified_following")) == "2025-05-30"
+    assert str(calendar.next_business_day("2025-02-07")) == "2025-02-08"
+    assert str(calendar.previous_business_day("2025-02-05")) == "2025-01-27"
+    with pytest.raises(ValueError):
+        calendar.roll(days, "nearest")
+
+
+def test_year_fraction():
+    fractions = year_fraction(["2025-01-01", None], ["2026-01-01", "2026-01-01"])
+    assert fractions[0] == pytest.approx(1.0)
+    assert np.isnan(fractions[1])
+    assert year_fraction("2025-01-01", "2025-07-01", "act/360") == pytest.approx(181 / 360)
+    with pytest.raises(ValueError):
+        year_fraction("2025-01-01", "2025-07-01", "30/360")
+
+
+def test_custom_holiday_file(tmp_path):
+    path = tmp_path / "holidays.txt"
+    path.write_text("# 测试\n2025-03-03  # 周一\n[workdays]\n2025-03-08\n", encoding="utf-8")
+    calendar = BusinessCalendar.from_file(path)
+    # 03-03 至 03-10：周一休市、周六上班
+    assert int(calendar.business_days_between("2025-03-03", "2025-03-10")) == 5
+    path.write_text("[weekends]\n2025-03-08\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_holiday_file(path)
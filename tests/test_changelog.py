@@ -0,0 +1,130 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+from sqlalchemy import delete, update
+
+from fundman.models import ChangeLogDB, WealthProductCreate, WealthProductDB
+from fundman.crud import create_products, delete_products_where, update_products_where
+from fundman.database.changelog import current_watermark, prune_change_log
+from fundman.database.versions import data_version
+from fundman.data_processor import export_data_file
+from fundman.app import changelog_data
+
+
+def _products(n, prefix="YD_CL"):
+    return [WealthProductCreate(
+        product_name=f"产品{i}",
+        product_yindeng_code=f"{prefix}_{i:03d}",
+        product_start_date=date(2025, 1, 1),
+        product_end_date=date(2025, 12, 31),
+        product_days_total=364,
+        product_raise_amount=100.0 * (i + 1),
+    ) for i in range(n)]
+
+
+def _log_since(db, since):
+    rows = db.query(ChangeLogDB).filter(ChangeLogDB.seq > since).order_by(ChangeLogDB.seq).all()
+    return [(row.table_name, row.row_id, row.operation) for row in rows]
+
+
+def test_triggers_record_changes(db_session):
+    start = current_watermark(db_session)
+    ids = create_products(db_session, _products(3))
+    update_products_where(db_session, {"product_id": ids[1]}, {"product_name": "改名"})
+    delete_products_where(db_session, {"product_id": ids[2]})
+    assert _log_since(db_session, start) == [
+        ("wealth_products", ids[0], "insert"),
+        ("wealth_products", ids[1], "insert"),
+        ("wealth_products", ids[2], "insert"),
+        ("wealth_products", ids[1], "update"),
+        ("wealth_products", ids[2], "delete"),
+    ]
+    assert current_watermark(db_session, "wealth_products") == current_watermark(db_session) > start
+
+
+def test_rollback_leaves_no_log(db_session):
+    ids = create_products(db_session, _products(1))
+    watermark = current_watermark(db_session)
+    db_session.execute(update(WealthProductDB).where(WealthProductDB.product_id == ids[0]).values(product_name="未提交"))
+    db_session.execute(delete(WealthProductDB))
+    db_session.rollback()
+    assert current_watermark(db_session) == watermark
+
+
+def test_export_since_streams_changes(db_session, tmp_path):
+    ids = create_products(db_session, _products(4))
+    since = current_watermark(db_session)
+    update_products_where(db_session, {"product_id": ids[0]}, {"product_name": "改名"})
+    update_products_where(db_session, {"product_id": ids[0]}, {"product_raise_amount": 1.0})
+    delete_products_where(db_session, {"product_id": ids[1]})
+    new_id, = create_products(db_session, _products(1, prefix="YD_CL_NEW"))
+
+    out = tmp_path / "delta.csv"
+    with patch("fundman.data_processor.get_db", return_value=iter([db_session])), \
+            patch("fundman.data_processor.EXPORT_CHUNK_ROWS", 2):
+        watermark = export_data_file(str(out), since=since)
+    assert watermark == current_watermark(db_session)
+
+    delta = pd.read_csv(out)
+    # 每个被修改的行只出现一次（最新状态），按最后一次变更排序
+    assert list(delta["product_id"]) == [ids[0], ids[1], new_id]
+    assert list(delta["change_operation"]) == ["upsert", "delete", "upsert"]
+    first = delta.iloc[0]
+    assert first["product_name"] == "改名" and first["product_raise_amount"] == 1.0
+    assert pd.isna(delta.iloc[1]["product_name"])
+
+    # 新水位之后没有变更：只写表头
+    empty = tmp_path / "empty.csv"
+    with patch("fundman.data_processor.get_db", return_value=iter([db_session])):
+        assert export_data_file(str(empty), since=watermark) == watermark
+    assert pd.read_csv(empty).empty
+
+
+def test_export_since_streams_xlsx(db_session, tmp_path):
+    ids = create_products(db_session, _products(3))
+    since = current_watermark(db_session)
+    update_products_where(db_session, {"product_id": ids[2]}, {"product_name": "改名"})
+    delete_products_where(db_session, {"product_id": ids[0]})
+
+    out = tmp_path / "delta.xlsx"
+    with patch("fundman.data_processor.get_db", return_value=iter([db_session])), \
+            patch("fundman.data_processor.EXPORT_CHUNK_ROWS", 1), \
+            patch("fundman.data_processor.pd.concat") as concat:
+        assert export_data_file(str(out), since=since) == current_watermark(db_session)
+    concat.assert_not_called()
+    delta = pd.read_excel(out, sheet_name="wealth_products")
+    assert list(delta["product_id"]) == [ids[2], ids[0]]
+    assert list(delta["change_operation"]) == ["upsert", "delete"] and delta.iloc[0]["product_name"] == "改名"
+
+
+def test_export_since_rejects_query_date(tmp_path):
+    with pytest.raises(ValueError):
+        export_data_file(str(tmp_path / "delta.csv"), query_date="2025-08-01", since=0)
+    with pytest.raises(ValueError, match="不支持 .xls"):
+        export_data_file(str(tmp_path / "delta.xls"), since=0)
+
+
+def test_data_version_sees_text_edits(db_session):
+    ids = create_products(db_session, _products(1))
+    before = data_version(db_session)
+    update_products_where(db_session, {"product_id": ids[0]}, {"product_name": "只改名称"})
+    assert data_version(db_session) != before
+    # 版本即水位：不扫描业务表
+    assert data_version(db_session) == str(current_watermark(db_session))
+
+
+def test_changelog_cli_prune(db_session, capsys):
+    create_products(db_session, _products(2))
+    watermark = current_watermark(db_session)
+    with patch("fundman.app.init_db"), patch("fundman.app.get_db", return_value=iter([db_session])):
+        changelog_data(prune_before=watermark)
+    printed = capsys.readouterr().out
+    # 保留最新一条，水位不回退
+    assert f"当前水位: {watermark}" in printed
+    assert db_session.query(ChangeLogDB).count() == 1
+    assert prune_change_log(db_session, watermark) == 0
+    # 清理后 seq 不复用
+    create_products(db_session, _products(1, prefix="YD_CL_AFTER"))
+    assert current_watermark(db_session) == watermark + 1
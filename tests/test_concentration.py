@@ -0,0 +1,103 @@
+import json
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+
+from fundman.models import AssetCreate, AssetUpdate, WealthProductCreate, TransactionCreate
+from fundman.crud import (
+    create_asset, get_asset_by_code, update_asset, upsert_product_by_yindeng_code, create_transaction,
+    update_transactions_where,
+)
+from fundman.analytics import ReportCache, concentration_report
+from fundman.app import concentration_data
+
+
+@pytest.fixture
+def book(db_session):
+    a1 = create_asset(db_session, AssetCreate(asset_name="债1", asset_code="CC_1", asset_type="债券",
+                                              issuer="发行人甲", industry="金融", region="北京"))
+    a2 = create_asset(db_session, AssetCreate(asset_name="债2", asset_code="CC_2", asset_type="债券",
+                                              issuer="发行人乙", industry="金融", region=None))
+    products = [
+        upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+            product_name=f"产品{c}", product_yindeng_code=f"YD_CC_{c}",
+            product_start_date=date(2025, 1, 1), product_end_date=date(2025, 12, 31), product_days_total=364,
+        ))
+        for c in "AB"
+    ]
+    for product, asset, amount in [(products[0], a1, 600.0), (products[0], a2, 400.0), (products[1], a1, 50.0)]:
+        create_transaction(db_session, TransactionCreate(
+            product_id=product.product_id, asset_id=asset.asset_id,
+            investment_date=date(2025, 2, 1), maturity_date=date(2025, 11, 30),
+            quantity=1.0, settlement_amount=amount,
+        ))
+    return products
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReportCache(tmp_path / "cache")
+
+
+def test_issuer_share_per_product_and_breach(db_session, book, cache):
+    report = concentration_report(db_session, "2025-06-30", ["issuer"], limit=0.5, cache=cache)
+    frame = report["issuer"].set_index(["product_yindeng_code", "issuer"])
+    assert frame.loc[("YD_CC_A", "发行人甲"), "exposure"] == pytest.approx(600.0)
+    assert frame.loc[("YD_CC_A", "发行人甲"), "share"] == pytest.approx(0.6)
+    assert bool(frame.loc[("YD_CC_A", "发行人甲"), "breach"]) is True
+    assert bool(frame.loc[("YD_CC_A", "发行人乙"), "breach"]) is False
+    assert frame.loc[("YD_CC_B", "发行人甲"), "share"] == pytest.approx(1.0)
+
+
+def test_book_level_and_unknown_region(db_session, book, cache):
+    region = concentration_report(db_session, "2025-06-30", ["region"], by_product=False, cache=cache)["region"]
+    shares = dict(zip(region["region"], region["share"]))
+    assert shares == pytest.approx({"北京": 650 / 1050, "未知": 400 / 1050})
+
+
+def test_cache_hit_and_invalidation(db_session, book, cache):
+    first = concentration_report(db_session, "2025-06-30", ["issuer"], cache=cache)["issuer"]
+    with patch("fundman.analytics.concentration.pd.read_sql") as read_sql:
+        second = concentration_report(db_session, "2025-06-30", ["issuer"], cache=cache)["issuer"]
+        read_sql.assert_not_called()
+    assert second.equals(first)
+    # 跨进程：新的缓存实例从文件命中
+    with patch("fundman.analytics.concentration.pd.read_sql") as read_sql:
+        from_file = concentration_report(db_session, "2025-06-30", ["issuer"], cache=ReportCache(cache.directory))["issuer"]
+        read_sql.assert_not_called()
+    pd.testing.assert_frame_equal(from_file, first)
+    # 缓存文件为 JSON，目录与文件仅当前用户可读写
+    files = list(cache.directory.glob("*.json"))
+    assert files and json.loads(files[0].read_text(encoding="utf-8"))["version"]
+    assert cache.directory.stat().st_mode & 0o077 == 0 and files[0].stat().st_mode & 0o077 == 0
+    # 数据变化后缓存失效
+    update_transactions_where(db_session, {"product_id": book[1].product_id}, {"settlement_amount": 5000.0})
+    refreshed = concentration_report(db_session, "2025-06-30", ["issuer"], cache=cache)["issuer"]
+    assert refreshed["exposure"].max() == pytest.approx(5000.0)
+
+
+def test_cache_invalidated_by_in_place_edits(db_session, book, cache):
+    # 行数与金额不变的原地修改（资产改发行人、交易改日期）也使缓存失效
+    concentration_report(db_session, "2025-06-30", ["issuer"], cache=cache)
+    asset = get_asset_by_code(db_session, "CC_2")
+    update_asset(db_session, asset.asset_id, AssetUpdate(asset_name="债2", asset_type="债券", issuer="发行人甲"))
+    issuers = concentration_report(db_session, "2025-06-30", ["issuer"], cache=cache)["issuer"]
+    assert set(issuers["issuer"]) == {"发行人甲"}
+    update_transactions_where(db_session, {"product_id": book[1].product_id}, {"investment_date": date(2025, 7, 1)})
+    issuers = concentration_report(db_session, "2025-06-30", ["issuer"], cache=cache)["issuer"]
+    assert set(issuers["product_id"]) == {book[0].product_id}
+
+
+def test_no_cache_without_change_log(db_session, book, cache):
+    with patch("fundman.database.versions.has_change_log", return_value=False):
+        concentration_report(db_session, "2025-06-30", ["issuer"], cache=cache)
+    assert not cache.directory.exists() or not list(cache.directory.glob("*.pkl"))
+
+
+def test_concentration_cli_breaches_only(db_session, book, capsys):
+    with patch("fundman.app.get_db", return_value=iter([db_session])):
+        concentration_data("2025-06-30", ["issuer"], limit=0.5, use_cache=False, breaches_only=True)
+    out = capsys.readouterr().out
+    assert "超限 2 行" in out
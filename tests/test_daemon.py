@@ -0,0 +1,113 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from fundman.app import main
+from fundman.models import AssetCreate
+from fundman.crud import create_asset
+from fundman.server.client import DaemonError, request, run_remote
+from fundman.server.daemon import DaemonServer
+
+
+@pytest.fixture
+def daemon(db_session, monkeypatch):
+    """在后台线程中运行守护进程；命令使用测试数据库会话"""
+    # Unix 套接字路径长度有限，使用短临时目录
+    directory = tempfile.mkdtemp(prefix="fm", dir="/tmp")
+    path = Path(directory) / "d.sock"
+    server = DaemonServer(path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("FUNDMAN_SOCKET", str(path))
+    monkeypatch.delenv("FUNDMAN_NO_DAEMON", raising=False)
+    with patch("fundman.app.get_db", side_effect=lambda: iter([db_session])):
+        yield server
+    server.shutdown()
+    server.server_close()
+    shutil.rmtree(directory)
+
+
+def test_ping(daemon):
+    response = request({"op": "ping"})
+    assert response["pid"] == os.getpid()
+    assert response["exit_code"] == 0
+
+
+def test_main_forwards_to_running_daemon(daemon, db_session, capsys):
+    create_asset(db_session, AssetCreate(asset_name="守护资产", asset_code="DM_1", asset_type="债券",
+                                         issuer="甲", industry="乙", region="丙"))
+    main(["investment", "list-assets"])
+    assert "DM_1" in capsys.readouterr().out
+    assert daemon.executor.commands_run == 1
+
+
+def test_command_errors_reported_with_exit_code(daemon, capsys):
+    with patch("fundman.app.run_command", side_effect=RuntimeError("boom")):
+        exit_code = run_remote(["investment", "list-assets"])
+    assert exit_code == 1
+    assert "boom" in capsys.readouterr().err
+
+
+def test_fallback_when_daemon_not_running(monkeypatch, tmp_path):
+    monkeypatch.delenv("FUNDMAN_NO_DAEMON", raising=False)
+    monkeypatch.setenv("FUNDMAN_SOCKET", str(tmp_path / "missing.sock"))
+    assert run_remote(["investment", "list-assets"]) is None
+    with patch("fundman.app.run_command") as run_command:
+        main(["investment", "list-assets"])
+    run_command.assert_called_once()
+
+
+def test_mismatched_database_falls_back_in_process(daemon, monkeypatch):
+    # 客户端指向另一个数据库时守护进程拒绝执行，命令在本进程内执行
+    monkeypatch.setenv("FUNDMAN_DB_URL", "sqlite:///other.db")
+    assert run_remote(["investment", "list-assets"]) is None
+    assert request({"op": "run", "argv": ["investment", "list-assets"]})["mismatch"]
+    with patch("fundman.app.run_command") as run_command:
+        main(["investment", "list-assets"])
+    run_command.assert_called_once()
+    assert daemon.executor.commands_run == 0
+
+
+def test_long_running_commands_not_forwarded(daemon):
+    with patch("fundman.server.client.run_remote") as run_remote_mock, patch("fundman.app.run_command") as run_command:
+        main(["export", "out.csv"])
+    run_remote_mock.assert_not_called()
+    run_command.assert_called_once()
+
+
+def test_no_local_rerun_after_request_sent(monkeypatch):
+    # 守护进程收下命令后未应答即断开：命令可能已执行，不得在本进程内再执行一次
+    directory = tempfile.mkdtemp(prefix="fm", dir="/tmp")
+    path = Path(directory) / "d.sock"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(path))
+    listener.listen()
+    received = []
+
+    def hang_up():
+        for _ in range(2):
+            conn, _ = listener.accept()
+            with conn, conn.makefile("rb") as stream:
+                received.append(stream.readline())
+
+    thread = threading.Thread(target=hang_up, daemon=True)
+    thread.start()
+    monkeypatch.setenv("FUNDMAN_SOCKET", str(path))
+    monkeypatch.delenv("FUNDMAN_NO_DAEMON", raising=False)
+    try:
+        with pytest.raises(DaemonError):
+            run_remote(["investment", "list-assets"])
+        with patch("fundman.app.run_command") as run_command, pytest.raises(SystemExit) as exit_info:
+            main(["investment", "list-assets"])
+        run_command.assert_not_called()
+        assert exit_info.value.code == 1 and len(received) == 2
+    finally:
+        thread.join(timeout=5)
+        listener.close()
+        shutil.rmtree(directory)
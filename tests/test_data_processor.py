@@ -137,6 +137,59 @@ class TestImportDataFile:
             mock_db.close.assert_called_once()
 
 
+class TestMemoryBoundedImport:
+    @pytest.fixture
+    def products_csv(self, tmp_path: Path):
+        from fundman.bench.generator import generate_products, to_import_frame
+        p = tmp_path / "products.csv"
+        to_import_frame(generate_products(300)).to_csv(p, index=False, encoding="utf-8")
+        return p
+
+    def test_bounded_import_commits_per_batch(self, products_csv: Path, capsys):
+        mock_db = MagicMock()
+        with patch("fundman.data_processor.get_db", return_value=iter([mock_db])), patch(
+            "fundman.data_processor.upsert_product_by_yindeng_code"
+        ) as mock_upsert:
+            import_data_file(str(products_csv), query_date="2025-06-30", max_memory=64 * 1024 * 1024)
+        assert mock_upsert.call_count == 300
+        # 每批提交后清空会话
+        assert mock_db.commit.call_count == mock_db.expunge_all.call_count >= 1
+        mock_db.close.assert_called_once()
+        assert "峰值" in capsys.readouterr().out
+
+    def test_small_budget_shrinks_batches(self, products_csv: Path):
+        mock_db = MagicMock()
+        with patch("fundman.data_processor.get_db", return_value=iter([mock_db])), patch(
+            "fundman.data_processor.upsert_product_by_yindeng_code"
+        ):
+            import_data_file(str(products_csv), query_date="2025-06-30", max_memory=200 * 1024)
+        assert mock_db.commit.call_count > 1
+
+    @pytest.mark.parametrize("suffix", [".csv", ".xlsx"])
+    def test_bounded_import_matches_full_import(self, tmp_path: Path, suffix: str):
+        from sqlalchemy import create_engine
+        from fundman.bench.generator import generate_products, to_import_frame
+        from fundman.database.connection import bind_engine
+        from fundman.models import Base
+
+        frame = to_import_frame(generate_products(120))
+        p = tmp_path / f"products{suffix}"
+        if suffix == ".csv":
+            frame.to_csv(p, index=False, encoding="utf-8")
+        else:
+            frame.to_excel(p, index=False, engine="openpyxl")
+
+        tables = []
+        for name, kwargs in (("full", {}), ("bounded", {"max_memory": 256 * 1024})):
+            engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+            Base.metadata.create_all(bind=engine)
+            with bind_engine(engine):
+                import_data_file(str(p), query_date="2025-06-30", **kwargs)
+            tables.append(pd.read_sql_table("wealth_products", engine).drop(columns=["product_id"]))
+            engine.dispose()
+        pd.testing.assert_frame_equal(tables[0], tables[1])
+
+
 class TestExportDataFile:
     @pytest.fixture
     def fake_products(self):
@@ -0,0 +1,94 @@
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from fundman.models import WealthProductCreate
+from fundman.crud import create_products
+from fundman.data_processor import _build_product, diff_data_file, normalize_products_frame
+from fundman.app import diff_data
+
+
+def _seed(db):
+    return create_products(db, [WealthProductCreate(
+        product_name=f"产品{i}",
+        product_yindeng_code=f"YD_DF_{i}",
+        product_start_date=date(2025, 1, 1),
+        product_end_date=date(2025, 12, 31),
+        product_days_total=364,
+        product_query_date=date(2025, 8, 1),
+        product_days_remaining=152,
+        product_performance_benchmark=0.035,
+        product_raise_amount=100.0,
+    ) for i in range(3)])
+
+
+def _row(code, name="产品", amount="100", end="2025-12-31"):
+    return {"产品名称": name, "银登编码": code, "起息日": "2025-01-01", "到期日": end,
+            "业绩基准": "3.5%", "募集金额": amount}
+
+
+def test_normalize_matches_row_path():
+    rows = [
+        {"产品名称": " 甲 ", "银登编码": " YD1 ", "起息日": "2025/1/1", "到期日": "2025年12月31日",
+         "业绩基准": "3.5%", "募集金额": "1,000.5", "个人募集": "null"},
+        {"product_name": "乙", "product_yindeng_code": "", "product_start_date": "2025.03.01",
+         "product_end_date": None, "product_raise_target": 12},
+    ]
+    frame = normalize_products_frame(pd.DataFrame(rows), "2025-08-01")
+    for i, record in enumerate(pd.DataFrame(rows).to_dict("records")):
+        expected = _build_product(record, i + 1, "2025-08-01").model_dump()
+        got = frame.iloc[i]
+        for field, value in expected.items():
+            actual = got[field]
+            if isinstance(value, date):
+                actual = pd.Timestamp(actual).date()
+            if value is None:
+                assert pd.isna(actual), field
+            else:
+                assert actual == value, field
+
+
+def test_normalize_reports_bad_rows():
+    with pytest.raises(ValueError, match="第2行缺少 产品名称"):
+        normalize_products_frame(pd.DataFrame([_row("A", name="甲"), _row("B", name=" ")]))
+    with pytest.raises(ValueError, match="第1行无法解析募集金额"):
+        normalize_products_frame(pd.DataFrame([_row("A", amount="abc")]))
+
+
+def test_diff_file_against_database(db_session, tmp_path):
+    _seed(db_session)
+    rows = [
+        _row("YD_DF_0", name="产品0"),                        # 无变化
+        _row("YD_DF_1", name="改名1", amount="200"),          # 两个字段变化
+        _row("YD_DF_NEW", name="新产品"),                      # 新增
+        _row(None, name="无编码"),                              # 无编码：导入时新建
+    ]
+    source = tmp_path / "in.csv"
+    pd.DataFrame(rows).to_csv(source, index=False)
+    out = tmp_path / "diff.csv"
+    with patch("fundman.data_processor.get_db", return_value=iter([db_session])):
+        summary = diff_data_file(str(source), "2025-08-01", str(out))
+
+    assert summary["added"] == 2 and summary["without_code"] == 1
+    assert summary["removed"] == 1  # YD_DF_2 不在文件中
+    assert summary["changed"] == 1 and summary["unchanged"] == 1
+    assert summary["fields"] == {"product_name": 1, "product_raise_amount": 1}
+
+    detail = pd.read_csv(out, dtype=str)
+    changed = detail[detail["change_type"] == "changed"].set_index("field")
+    assert changed.loc["product_name", "old_value"] == "产品1"
+    assert changed.loc["product_name", "new_value"] == "改名1"
+    assert float(changed.loc["product_raise_amount", "new_value"]) == 200.0
+    assert list(detail.loc[detail["change_type"] == "removed", "product_yindeng_code"]) == ["YD_DF_2"]
+
+
+def test_diff_cli_prints_summary(capsys):
+    summary = {"file_rows": 3, "added": 1, "without_code": 0, "duplicates": 1, "removed": 0,
+               "changed": 1, "unchanged": 1, "fields": {"product_end_date": 1}}
+    with patch("fundman.app.diff_data_file", return_value=summary) as mock_diff:
+        diff_data("in.csv", "2025-08-01")
+    mock_diff.assert_called_once_with("in.csv", "2025-08-01", None)
+    printed = capsys.readouterr().out
+    assert "有变化: 1" in printed and "product_end_date: 1" in printed and "重复" in printed
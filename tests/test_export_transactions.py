@@ -0,0 +1,100 @@
+import json
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+from sqlalchemy import event
+
+from fundman.models import AssetCreate, TransactionCreate, WealthProductCreate
+from fundman.crud import create_asset, create_transaction, upsert_product_by_yindeng_code
+from fundman.data_processor import TRANSACTION_EXPORT_COLUMNS, _stream_xlsx, export_transactions_file
+from fundman.app import main
+
+
+@pytest.fixture
+def ledger(db_session):
+    products = [
+        upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+            product_name=f"产品{i}", product_yindeng_code=f"YD_ET{i}", product_start_date=date(2025, 1, 1),
+            product_end_date=date(2025, 12, 31), product_days_total=364, product_query_date=date(2025, 1, i),
+        ))
+        for i in (1, 2)
+    ]
+    assets = [
+        create_asset(db_session, AssetCreate(asset_name="债券", asset_code="ET_BOND", asset_type="债券", issuer="国开行")),
+        create_asset(db_session, AssetCreate(asset_name="存款", asset_code="ET_DEP", asset_type="存款")),
+    ]
+    for day in range(1, 7):
+        create_transaction(db_session, TransactionCreate(
+            product_id=products[day % 2].product_id, asset_id=assets[day // 4].asset_id,
+            investment_date=date(2025, 3, day), maturity_date=date(2025, 9, day) if day % 3 else None,
+            interest_rate=2.5, quantity=float(day), unit_full_price=100.0,
+        ))
+    return products, assets
+
+
+def _export(db, path, **kwargs):
+    with patch("fundman.data_processor.get_db", return_value=iter([db])):
+        return export_transactions_file(str(path), **kwargs)
+
+
+def test_export_csv_is_one_joined_query(db_session, ledger, tmp_path):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert _export(db_session, tmp_path / "ledger.csv", batch_size=2) == 6
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+    assert len(statements) == 1 and "JOIN" in statements[0]
+
+    frame = pd.read_csv(tmp_path / "ledger.csv", dtype=str, keep_default_na=False)
+    assert list(frame.columns) == [name for _, name in TRANSACTION_EXPORT_COLUMNS]
+    first = frame.iloc[0]
+    assert (first["product_yindeng_code"], first["asset_code"], first["issuer"]) == ("YD_ET2", "ET_BOND", "国开行")
+    assert (first["investment_date"], first["maturity_date"], first["settlement_amount"]) == ("2025-03-01", "2025-09-01", "100.0")
+    assert frame.loc[2, "maturity_date"] == "" and frame.loc[5, "asset_code"] == "ET_DEP"
+
+
+def test_export_filters(db_session, ledger, tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    assert _export(db_session, path, product_codes=["YD_ET2"], asset_codes=["ET_BOND"]) == 2
+    rows = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [row["investment_date"] for row in rows] == ["2025-03-01", "2025-03-03"]
+    assert rows[1]["maturity_date"] is None and rows[0]["product_name"] == "产品2"
+
+    assert _export(db_session, path, date_from="2025/03/02", date_to="2025-03-04") == 3
+    assert _export(db_session, path, query_date="2025-01-02") == 3
+    assert _export(db_session, path, product_codes=["YD_NONE"]) == 0
+    assert path.read_text(encoding="utf-8") == ""
+    with pytest.raises(ValueError, match="不支持的文件格式"):
+        _export(db_session, tmp_path / "ledger.txt")
+
+
+def test_export_transactions_cli_xlsx(db_session, ledger, tmp_path):
+    path = tmp_path / "ledger.xlsx"
+    argv = ["fundman", "export-transactions", str(path), "--asset-code", "ET_DEP", "--date-from", "2025-03-05"]
+    with patch("fundman.data_processor.get_db", return_value=iter([db_session])), patch("sys.argv", argv):
+        main()
+    frame = pd.read_excel(path)
+    assert list(frame["asset_code"]) == ["ET_DEP", "ET_DEP"]
+    assert list(frame["quantity"]) == [5.0, 6.0]
+
+
+def test_xlsx_row_limit_boundary(db_session, ledger, tmp_path):
+    # 上限含表头：6 行数据加表头恰好 7 行时可以写出，再少一行上限即拒绝
+    with patch("fundman.data_processor.XLSX_MAX_ROWS", 7):
+        assert _export(db_session, tmp_path / "full.xlsx", batch_size=4) == 6
+    assert len(pd.read_excel(tmp_path / "full.xlsx")) == 6
+    with patch("fundman.data_processor.XLSX_MAX_ROWS", 6), pytest.raises(ValueError, match="共 6 行，超过 XLSX 单表上限 5 行"):
+        _export(db_session, tmp_path / "over.xlsx")
+    assert not (tmp_path / "over.xlsx").exists()
+
+
+def test_stream_xlsx_closes_sheet_on_limit(tmp_path):
+    # 计数后又有新行写入：流式写出途中超限时同样报错且不生成文件
+    partitions = iter([[("a",), ("b",)], [("c",), ("d",)]])
+    with patch("fundman.data_processor.XLSX_MAX_ROWS", 4), pytest.raises(ValueError, match="单表上限 3 行"):
+        _stream_xlsx(partitions, ["name"], tmp_path / "late.xlsx")
+    assert not (tmp_path / "late.xlsx").exists()
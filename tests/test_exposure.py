@@ -0,0 +1,119 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from fundman.models import AssetCreate, WealthProductCreate, TransactionCreate
+from fundman.crud import create_asset, upsert_product_by_yindeng_code, create_transaction
+from fundman.analytics import compute_exposure_changes, compute_exposure_series, exposure_series
+from fundman.analytics.exposure import _exposure_events, _summarize_events, summarize_exposure
+from fundman.app import exposure_data
+
+
+def _frame(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    investment = np.datetime64("2024-11-01") + rng.integers(0, 150, n).astype("timedelta64[D]")
+    maturity = investment + rng.integers(1, 120, n).astype("timedelta64[D]")
+    maturity[rng.random(n) < 0.1] = np.datetime64("NaT", "D")
+    return pd.DataFrame({
+        "asset_code": rng.choice(["A", "B", "C"], n),
+        "issuer": pd.Categorical(rng.choice(["甲", "乙", "未知"], n)),
+        "investment_date": investment.astype("datetime64[ns]"),
+        "maturity_date": maturity.astype("datetime64[ns]"),
+        "settlement_amount": rng.uniform(1, 100, n).round(2),
+    })
+
+
+def _loop(frame, by, days):
+    # 逐日筛选的参考实现
+    rows = []
+    for day in days:
+        live = (frame["investment_date"] <= day) & (frame["maturity_date"].isna() | (frame["maturity_date"] > day))
+        rows.append(frame[live].groupby(by, observed=False)["settlement_amount"].sum())
+    return pd.DataFrame(rows).fillna(0.0)
+
+
+@pytest.mark.parametrize("by, column", [("asset", "asset_code"), ("issuer", "issuer")])
+def test_cumsum_series_matches_daily_loop(by, column):
+    frame = _frame()
+    series = compute_exposure_series(frame, "2025-01-01", "2025-03-31", by)
+    assert len(series) == 90 and series.index[0] == pd.Timestamp("2025-01-01")
+    expected = _loop(frame, column, series.index)
+    for group in series.columns:
+        np.testing.assert_allclose(series[group].to_numpy(), expected[group].to_numpy(), atol=1e-6)
+
+
+def test_sparse_changes_and_summary_match_wide_table():
+    frame = _frame(n=500, seed=11)
+    series = compute_exposure_series(frame, "2025-01-01", "2025-03-31", "asset")
+    changes = compute_exposure_changes(frame, "2025-01-01", "2025-03-31", "asset")
+    assert len(changes) < series.size
+    # 变化点沿日期向后填充即为逐日宽表
+    filled = changes.pivot(index="date", columns="asset", values="exposure").reindex(series.index).ffill().fillna(0.0)
+    np.testing.assert_allclose(filled[series.columns].to_numpy(), series.to_numpy(), atol=1e-6)
+
+    start = np.datetime64("2025-01-01")
+    events, groups = _exposure_events(frame, start, len(series), "asset")
+    sparse = _summarize_events(events, groups, start, "asset")
+    dense = summarize_exposure(series)
+    assert list(sparse["asset"]) == list(dense["asset"])
+    np.testing.assert_allclose(sparse[["start_exposure", "end_exposure", "peak_exposure"]].to_numpy(),
+                               dense[["start_exposure", "end_exposure", "peak_exposure"]].to_numpy(), atol=1e-6)
+    assert list(sparse["peak_date"]) == list(dense["peak_date"])
+
+
+def test_wide_table_cell_limit(db_session):
+    frame = _frame(n=50)
+    with patch("fundman.analytics.exposure.EXPOSURE_MAX_CELLS", 100), pytest.raises(ValueError, match="逐日宽表过大"):
+        compute_exposure_series(frame, "2025-01-01", "2025-03-31")
+    with patch("fundman.analytics.exposure.load_transaction_frame", return_value=frame), \
+            patch("fundman.analytics.exposure.EXPOSURE_MAX_CELLS", 100):
+        frames = exposure_series(db_session, "2025-01-01", "2025-03-31")
+    assert set(frames) == {"changes", "summary"} and list(frames["changes"].columns) == ["date", "asset", "exposure"]
+    assert len(frames["summary"]) == 3
+
+
+def test_exposure_edges():
+    frame = pd.DataFrame({
+        "asset_code": ["A", "A", "B"],
+        "investment_date": pd.to_datetime(["2024-12-01", "2025-01-03", "2025-02-01"]),
+        "maturity_date": pd.to_datetime(["2025-01-02", None, "2025-03-01"]),
+        "settlement_amount": [10.0, 5.0, 7.0],
+    })
+    series = compute_exposure_series(frame, date(2025, 1, 1), date(2025, 1, 4))
+    # 到期日当天不再计入；起始日前的投资首日即计入；区间后才投资的 B 为 0
+    assert series["A"].tolist() == [10.0, 0.0, 5.0, 5.0]
+    assert series["B"].tolist() == [0.0] * 4
+    with pytest.raises(ValueError):
+        compute_exposure_series(frame, "2025-01-01", "2025-01-04", by="color")
+    with pytest.raises(ValueError):
+        compute_exposure_series(frame, "2025-01-04", "2025-01-01")
+
+
+def test_exposure_from_db_and_cli(db_session, tmp_path, capsys):
+    asset = create_asset(db_session, AssetCreate(asset_name="债券", asset_code="EX_BOND", asset_type="债券", issuer="发行人甲"))
+    product = upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+        product_name="产品", product_yindeng_code="YD_EX", product_start_date=date(2025, 1, 1),
+        product_end_date=date(2025, 12, 31), product_days_total=364,
+    ))
+    for invested, matures in ((date(2025, 1, 10), date(2025, 2, 10)), (date(2025, 1, 20), None)):
+        create_transaction(db_session, TransactionCreate(
+            product_id=product.product_id, asset_id=asset.asset_id, investment_date=invested,
+            maturity_date=matures, quantity=1.0, unit_full_price=100.0,
+        ))
+    frames = exposure_series(db_session, "2025-01-01", "2025-02-28", by="product")
+    exposure = frames["exposure"].set_index("date")["YD_EX"]
+    assert exposure[pd.Timestamp("2025-01-15")] == 100.0
+    assert exposure[pd.Timestamp("2025-01-25")] == 200.0
+    assert exposure[pd.Timestamp("2025-02-10")] == 100.0
+    assert frames["summary"].iloc[0]["peak_exposure"] == 200.0
+
+    out = tmp_path / "exposure.csv"
+    with patch("fundman.app.get_db", return_value=iter([db_session])):
+        exposure_data("2025-01-01", "2025-02-28", "issuer", output=str(out))
+    printed = capsys.readouterr().out
+    assert "59 天，1 个分组" in printed and "发行人甲" in printed
+    assert list(pd.read_csv(out).columns) == ["date", "发行人甲"]
+    assert (tmp_path / "exposure_summary.csv").exists()
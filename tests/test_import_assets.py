@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import PropertyMock, patch
+
+import pandas as pd
+from sqlalchemy import event
+
+from fundman.models import AssetCreate, AssetDB
+from fundman.crud import create_asset, upsert_assets
+from fundman.data_processor import import_assets_file
+from fundman.app import main
+
+
+def _import(db, path, **kwargs):
+    with patch("fundman.data_processor.get_db", return_value=iter([db])):
+        return import_assets_file(str(path), **kwargs)
+
+
+def test_upsert_assets_counts(db_session):
+    create_asset(db_session, AssetCreate(asset_name="旧名", asset_code="IA_1", asset_type="债券"))
+    create_asset(db_session, AssetCreate(asset_name="不变", asset_code="IA_2", asset_type="债券"))
+    counts = upsert_assets(db_session, [
+        AssetCreate(asset_name="新名", asset_code="IA_1", asset_type="债券", issuer="发行人"),
+        AssetCreate(asset_name="不变", asset_code="IA_2", asset_type="债券"),
+        AssetCreate(asset_name="新增", asset_code="IA_3", asset_type="存款"),
+        AssetCreate(asset_name="无编码", asset_type="存款"),
+    ])
+    assert counts == {"inserted": 2, "updated": 1, "skipped": 1}
+    renamed = db_session.query(AssetDB).filter_by(asset_code="IA_1").one()
+    db_session.refresh(renamed)
+    assert (renamed.asset_name, renamed.issuer) == ("新名", "发行人")
+    assert renamed.created_date is not None
+    assert db_session.query(AssetDB).count() == 4
+
+
+def test_upsert_assets_counts_without_rowcount(db_session):
+    # 驱动不报告 executemany 的 rowcount（-1）时计数不受影响；全部未变化时不发出写入
+    create_asset(db_session, AssetCreate(asset_name="旧名", asset_code="IA_R1", asset_type="债券"))
+    batch = [AssetCreate(asset_name="新名", asset_code="IA_R1", asset_type="债券"),
+             AssetCreate(asset_name="新增", asset_code="IA_R2", asset_type="债券")]
+    with patch("sqlalchemy.engine.CursorResult.rowcount", new_callable=PropertyMock, return_value=-1):
+        assert upsert_assets(db_session, batch) == {"inserted": 1, "updated": 1, "skipped": 0}
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        assert upsert_assets(db_session, batch) == {"inserted": 0, "updated": 0, "skipped": 2}
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+    assert not any(statement.lstrip().upper().startswith("INSERT") for statement in statements)
+
+
+def test_import_assets_file_headers_and_batches(db_session, tmp_path):
+    create_asset(db_session, AssetCreate(asset_name="旧名", asset_code="IA_007", asset_type="债券"))
+    rows = [{"资产名称": f"债券{i}", "资产编码": f"IA_{i:03d}", "资产类型": "债券", "发行人": " 甲 " if i % 2 else ""}
+            for i in range(10)]
+    rows.append({"资产名称": "重复", "资产编码": "IA_000", "资产类型": "债券"})
+    source = tmp_path / "assets.csv"
+    pd.DataFrame(rows).to_csv(source, index=False)
+    counts = _import(db_session, source, batch_size=3)
+    assert counts == {"inserted": 9, "updated": 1, "skipped": 1, "rows": 11}
+    assets = {a.asset_code: a for a in db_session.query(AssetDB).all()}
+    assert assets["IA_000"].asset_name == "重复"
+    assert assets["IA_001"].issuer == "甲" and assets["IA_002"].issuer is None
+
+    # 再次导入同一文件：全部未变化
+    counts = _import(db_session, source)
+    assert counts["inserted"] == 0 and counts["updated"] == 0 and counts["skipped"] == 11
+
+
+def test_import_assets_english_headers_xlsx(db_session, tmp_path):
+    source = tmp_path / "assets.xlsx"
+    pd.DataFrame([{"asset_name": "存款", "asset_code": "IA_DEP", "asset_type": "存款", "region": "上海",
+                   "created_date": "2025/01/02"}]).to_excel(source, index=False)
+    assert _import(db_session, source)["inserted"] == 1
+    asset = db_session.query(AssetDB).filter_by(asset_code="IA_DEP").one()
+    assert asset.region == "上海" and str(asset.created_date) == "2025-01-02"
+
+
+def test_import_assets_rejects_bad_rows(db_session, tmp_path):
+    source = tmp_path / "bad.csv"
+    pd.DataFrame([{"资产名称": "甲", "资产编码": "IA_X", "资产类型": "债券"},
+                  {"资产名称": "乙", "资产编码": "IA_Y", "资产类型": ""}]).to_csv(source, index=False)
+    with pytest.raises(ValueError, match="第2行缺少 资产类型"):
+        _import(db_session, source)
+    assert db_session.query(AssetDB).count() == 0
+
+
+def test_import_assets_cli(tmp_path, capsys):
+    with patch("fundman.app.import_assets_file") as mock_import:
+        main(["--no-daemon", "import-assets", "assets.csv", "--batch-size", "500"])
+    mock_import.assert_called_once_with("assets.csv", batch_size=500)
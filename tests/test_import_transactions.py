@@ -0,0 +1,95 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+
+from fundman.models import AssetCreate, TransactionDB, WealthProductCreate
+from fundman.crud import create_asset, insert_transaction_columns, upsert_product_by_yindeng_code
+from fundman.data_processor import import_transactions_file
+from fundman.app import main
+
+
+@pytest.fixture
+def holdings(db_session):
+    product = upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+        product_name="产品", product_yindeng_code="YD_IT", product_start_date=date(2025, 1, 1),
+        product_end_date=date(2025, 12, 31), product_days_total=364,
+    ))
+    asset = create_asset(db_session, AssetCreate(asset_name="债券", asset_code="IT_BOND", asset_type="债券"))
+    return product.product_id, asset.asset_id
+
+
+def _import(db, path, **kwargs):
+    with patch("fundman.data_processor.get_db", return_value=iter([db])):
+        return import_transactions_file(str(path), **kwargs)
+
+
+def test_import_transactions_resolves_codes_and_rejects(db_session, holdings, tmp_path):
+    rows = [
+        {"银登编码": "YD_IT", "资产编码": "IT_BOND", "投资日期": "2025/02/01", "到期日期": "2025-08-01",
+         "收益率": "2.5%", "数量": "1,000", "单位全价": "100.5", "清算金额": ""},
+        {"银登编码": " YD_IT ", "资产编码": "IT_BOND", "投资日期": "2025-02-02", "到期日期": "",
+         "收益率": "3", "数量": "10", "单位全价": "", "清算金额": "999"},
+        {"银登编码": "YD_NONE", "资产编码": "IT_BOND", "投资日期": "2025-02-03", "数量": "1"},
+        {"银登编码": "YD_IT", "资产编码": "IT_NONE", "投资日期": "2025-02-03", "数量": "1"},
+        {"银登编码": "YD_IT", "资产编码": "IT_BOND", "投资日期": "明天", "数量": "1"},
+        {"银登编码": "YD_IT", "资产编码": "IT_BOND", "投资日期": "2025-02-03", "数量": ""},
+    ]
+    source = tmp_path / "blotter.csv"
+    pd.DataFrame(rows).to_csv(source, index=False)
+    # 分块读取：不整体读入文件
+    with patch("fundman.data_processor.read_import_file", side_effect=AssertionError("整体读入")):
+        counts = _import(db_session, source, batch_size=4)
+    assert counts == {"rows": 6, "inserted": 2, "rejected": 4}
+
+    first, second = db_session.query(TransactionDB).order_by(TransactionDB.transaction_id).all()
+    assert (first.product_id, first.asset_id) == holdings
+    assert first.investment_date == date(2025, 2, 1) and first.maturity_date == date(2025, 8, 1)
+    assert first.interest_rate == 2.5 and first.quantity == 1000.0
+    assert first.settlement_amount == pytest.approx(100500.0)
+    assert second.maturity_date is None and second.unit_full_price is None and second.settlement_amount == 999.0
+
+    rejects = pd.read_csv(tmp_path / "blotter_rejects.csv", dtype=str)
+    assert list(rejects["reject_reason"]) == ["银登编码未找到", "资产编码未找到", "无法解析 投资日期", "缺少 数量"]
+    assert list(rejects.columns[1:]) == list(pd.DataFrame(rows).columns)
+
+
+def test_import_transactions_english_headers_xlsx(db_session, holdings, tmp_path):
+    source = tmp_path / "blotter.xlsx"
+    pd.DataFrame([{"product_code": "YD_IT", "asset_code": "IT_BOND", "investment_date": date(2025, 3, 1),
+                   "quantity": 2, "unit_full_price": 50}]).to_excel(source, index=False)
+    assert _import(db_session, source, reject_path=str(tmp_path / "r.csv")) == {"rows": 1, "inserted": 1, "rejected": 0}
+    assert not (tmp_path / "r.csv").exists()
+    transaction = db_session.query(TransactionDB).one()
+    assert transaction.investment_date == date(2025, 3, 1) and transaction.settlement_amount == 100.0
+
+
+def test_import_transactions_xlsx_in_chunks(db_session, holdings, tmp_path):
+    source = tmp_path / "blotter.xlsx"
+    pd.DataFrame([{"银登编码": "YD_IT", "资产编码": "IT_BOND" if i % 4 else "IT_NONE", "投资日期": date(2025, 3, i + 1),
+                   "数量": i + 1} for i in range(7)]).to_excel(source, index=False)
+    with patch("fundman.data_processor.read_import_file", side_effect=AssertionError("整体读入")):
+        assert _import(db_session, source, batch_size=3) == {"rows": 7, "inserted": 5, "rejected": 2}
+    quantities = [row.quantity for row in db_session.query(TransactionDB).order_by(TransactionDB.transaction_id)]
+    assert quantities == [2.0, 3.0, 4.0, 6.0, 7.0]
+
+
+def test_insert_transaction_columns_validates_against_model(db_session, holdings):
+    product_id, asset_id = holdings
+    columns = {"product_id": [product_id, product_id], "asset_id": [asset_id, asset_id],
+               "investment_date": ["2025-03-01", "2025-13-01"], "quantity": [1.0, 2.0]}
+    with pytest.raises(ValueError, match="investment_date 第2行不合法"):
+        insert_transaction_columns(db_session, columns)
+    with pytest.raises(ValueError, match="quantity 第1行不合法"):
+        insert_transaction_columns(db_session, {**columns, "investment_date": ["2025-03-01"] * 2, "quantity": [None, 2.0]})
+    with pytest.raises(ValueError, match="缺少必填列: quantity"):
+        insert_transaction_columns(db_session, {name: columns[name] for name in ("product_id", "asset_id", "investment_date")})
+    assert db_session.query(TransactionDB).count() == 0
+    assert insert_transaction_columns(db_session, {**columns, "investment_date": ["2025-03-01", "2025-03-02"]}) == 2
+
+
+def test_import_transactions_cli():
+    with patch("fundman.app.import_transactions_file") as mock_import:
+        main(["--no-daemon", "import-transactions", "blotter.csv", "--rejects", "bad.csv"])
+    mock_import.assert_called_once_with("blotter.csv", reject_path="bad.csv")
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.dialects import sqlite
+
+from fundman.models import WealthProductCreate
+from fundman.crud import create_products, get_products_in_date_range, get_top_products
+from fundman.crud.wealth_product_crud import products_in_date_range_query, top_products_query
+from fundman.app import main
+
+
+def _seed(db, n=40):
+    return create_products(db, [WealthProductCreate(
+        product_name=f"产品{i}",
+        product_yindeng_code=f"YD_IX_{i:03d}",
+        product_start_date=date(2025, 1, 1) + timedelta(days=i),
+        product_end_date=date(2025, 8, 1) + timedelta(days=3 * i),
+        product_days_total=212 + 2 * i,
+        product_performance_benchmark=None if i % 10 == 0 else 0.02 + (i % 7) / 1000,
+        product_raise_amount=float((i * 37) % 101),
+    ) for i in range(n)])
+
+
+def _plan(db, query):
+    sql = str(query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    return " | ".join(row[-1] for row in db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql))
+
+
+def test_maturity_window(db_session):
+    _seed(db_session)
+    rows = get_products_in_date_range(db_session, "product_end_date", date(2025, 8, 10), date(2025, 8, 31), mode="row")
+    ends = [row.product_end_date for row in rows]
+    assert ends == sorted(ends) and len(ends) == 8
+    assert all(date(2025, 8, 10) <= end <= date(2025, 8, 31) for end in ends)
+    starts = get_products_in_date_range(db_session, "product_start_date", date_to=date(2025, 1, 3))
+    assert [p.product_yindeng_code for p in starts] == ["YD_IX_000", "YD_IX_001", "YD_IX_002"]
+
+
+def test_top_n(db_session):
+    _seed(db_session)
+    top = get_top_products(db_session, "product_raise_amount", 5, mode="tuple")
+    amounts = [row[12] for row in top]
+    assert amounts == sorted(((i * 37) % 101 for i in range(40)), reverse=True)[:5]
+    lowest = get_top_products(db_session, "product_performance_benchmark", 3, ascending=True)
+    assert [p.product_performance_benchmark for p in lowest] == [0.02, 0.02, 0.02]
+    with pytest.raises(ValueError):
+        get_top_products(db_session, "product_name", 5)
+
+
+def test_query_plans_use_indexes(db_session):
+    _seed(db_session)
+    window = _plan(db_session, products_in_date_range_query(db_session, "product_end_date", date(2025, 8, 1), date(2025, 9, 1)))
+    assert "USING INDEX ix_wealth_products_product_end_date" in window and "TEMP B-TREE" not in window
+    for column in ("product_raise_amount", "product_performance_benchmark"):
+        plan = _plan(db_session, top_products_query(db_session, column, 50))
+        assert f"USING INDEX ix_wealth_products_{column}" in plan and "TEMP B-TREE" not in plan
+
+
+def test_init_db_adds_missing_indexes(tmp_path):
+    from fundman.database import connection
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE wealth_products (product_id INTEGER PRIMARY KEY, product_name VARCHAR NOT NULL, "
+            "product_yindeng_code VARCHAR UNIQUE, product_jinshu_code VARCHAR, product_custody_code VARCHAR, "
+            "product_start_date DATE NOT NULL, product_end_date DATE NOT NULL, product_days_total INTEGER NOT NULL, "
+            "product_query_date DATE, product_days_remaining INTEGER, product_performance_benchmark FLOAT, "
+            "product_raise_target FLOAT, product_raise_amount FLOAT, product_raise_institutional FLOAT, "
+            "product_raise_retail FLOAT)")
+    with patch.object(connection, "engine", engine):
+        connection.init_db(force=True)
+    names = {index["name"] for index in inspect(engine).get_indexes("wealth_products")}
+    assert "ix_wealth_products_product_end_date" in names and "ix_wealth_products_product_raise_amount" in names
+    engine.dispose()
+
+
+def test_query_cli_window_and_top(db_session, capsys):
+    _seed(db_session)
+    with patch("fundman.app.init_db"), patch("fundman.app.get_db", return_value=iter([db_session])):
+        main(["--no-daemon", "query", "--query-date", "2025-08-01", "--maturing-within", "6"])
+    printed = capsys.readouterr().out
+    assert "6 天内到期: 3 个产品" in printed and "剩余天数: 6" in printed
+    with patch("fundman.app.init_db"), patch("fundman.app.get_db", return_value=iter([db_session])):
+        main(["--no-daemon", "query", "--query-date", "2025-08-01", "--top", "2", "--by", "benchmark"])
+    assert "benchmark 前 2 名: 2 个产品" in capsys.readouterr().out
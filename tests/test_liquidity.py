@@ -0,0 +1,63 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+from fundman.models import AssetCreate, WealthProductCreate, TransactionCreate
+from fundman.crud import create_asset, upsert_product_by_yindeng_code, create_transaction
+from fundman.analytics import liquidity_mismatch
+from fundman.app import liquidity_data
+
+
+@pytest.fixture
+def book(db_session):
+    """产品 A 到期 2025-06-30，持有 3 笔；产品 B 到期 2025-12-31，资产均早于其到期"""
+    asset = create_asset(db_session, AssetCreate(asset_name="债券", asset_code="LQ_BOND", asset_type="债券"))
+    a = upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+        product_name="短期产品", product_yindeng_code="YD_LQ_A",
+        product_start_date=date(2025, 1, 1), product_end_date=date(2025, 6, 30), product_days_total=180,
+    ))
+    b = upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+        product_name="长期产品", product_yindeng_code="YD_LQ_B",
+        product_start_date=date(2025, 1, 1), product_end_date=date(2025, 12, 31), product_days_total=364,
+    ))
+    for product, maturity, amount in [
+        (a, date(2025, 6, 15), 100.0),   # 无错配
+        (a, date(2025, 8, 14), 200.0),   # 缺口 45 天
+        (a, None, 50.0),                 # 无到期日，视为错配
+        (b, date(2025, 9, 30), 400.0),
+    ]:
+        create_transaction(db_session, TransactionCreate(
+            product_id=product.product_id, asset_id=asset.asset_id,
+            investment_date=date(2025, 1, 15), maturity_date=maturity,
+            quantity=1.0, settlement_amount=amount,
+        ))
+    return a, b
+
+
+def test_exception_report_flags_and_ranks(db_session, book):
+    report = liquidity_mismatch(db_session, "2025-03-01")["mismatch"]
+    assert list(report["product_yindeng_code"]) == ["YD_LQ_A"]
+    row = report.iloc[0]
+    assert row["rank"] == 1
+    assert row["settlement_total"] == pytest.approx(350.0)
+    assert row["mismatch_amount"] == pytest.approx(250.0)
+    assert row["mismatch_count"] == 2
+    assert row["max_gap_days"] == 45
+    assert row["gap_31_90d"] == pytest.approx(200.0)
+    assert row["gap_open_ended"] == pytest.approx(50.0)
+    assert row["product_days_remaining"] == 121
+
+
+def test_include_all_keeps_clean_products(db_session, book):
+    report = liquidity_mismatch(db_session, "2025-03-01", include_all=True)["mismatch"]
+    assert list(report["product_yindeng_code"]) == ["YD_LQ_A", "YD_LQ_B"]
+    assert report.iloc[1]["mismatch_amount"] == 0
+
+
+def test_liquidity_cli(db_session, book, tmp_path, capsys):
+    out = tmp_path / "mismatch.csv"
+    with patch("fundman.app.get_db", return_value=iter([db_session])):
+        liquidity_data("2025-03-01", output=str(out))
+    printed = capsys.readouterr().out
+    assert "1 个产品" in printed
+    assert "YD_LQ_A" in out.read_text(encoding="utf-8")
@@ -0,0 +1,46 @@
+import pytest
+
+from fundman.utils.memory import MemoryBudget, current_rss, parse_size
+
+
+def test_parse_size():
+    assert parse_size("512") == 512
+    assert parse_size("2K") == 2048
+    assert parse_size("256M") == 256 * 1024 ** 2
+    assert parse_size("1.5GiB") == int(1.5 * 1024 ** 3)
+    for bad in ("", "abc", "0M", "-1G"):
+        with pytest.raises(ValueError):
+            parse_size(bad)
+
+
+def test_tracemalloc_budget_adapts_batch_size():
+    with MemoryBudget(1024 * 1024, initial=100, minimum=10, maximum=10000, source="tracemalloc") as budget:
+        # 每行约 1KB：预算充足时逐步放大（单次最多 2 倍）
+        rows = [bytes(1024) for _ in range(100)]
+        budget.sample()
+        del rows
+        assert budget.update(100) == 200
+        # 每行约 64KB：缩小，但单次最多缩到 1/4
+        rows = [bytes(64 * 1024) for _ in range(200)]
+        del rows
+        assert budget.update(200) == 50
+        assert budget.exceeded
+    assert budget.batches == 2
+    assert budget.peak >= 200 * 64 * 1024
+
+
+@pytest.mark.skipif(current_rss() is None, reason="需要 /proc/self/statm")
+def test_rss_budget_measures_growth():
+    rss = current_rss()
+    # 预算小于当前常驻内存也可用：只计进入作用域后的增量
+    with MemoryBudget(rss // 2, initial=100, source="rss") as budget:
+        assert budget.update(100) >= 100
+        assert not budget.exceeded and budget.peak < rss // 2
+    # 作用域内增长超出预算：每批缩小（单次最多缩到 1/4）直至下限
+    with MemoryBudget(8 * 1024 * 1024, initial=400, minimum=10, source="rss") as budget:
+        block = b"\x01" * (32 * 1024 * 1024)
+        budget.sample()
+        assert budget.update(400) == 100
+        assert budget.update(100) == 25
+        assert budget.exceeded and budget.peak >= 32 * 1024 * 1024
+        del block
@@ -0,0 +1,184 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from fundman.models import AssetCreate, WealthProductCreate, TransactionCreate
+from fundman.crud import create_asset, create_products, create_transaction, query_dynamic, update_products_where
+from fundman.analytics import (
+    ProductTable, load_transaction_frame, portfolio_analytics, product_table, resident_product_table,
+)
+from fundman.app import main
+from fundman.database.changelog import current_watermark, prune_change_log
+from fundman.data_processor import export_data_file
+
+
+def _product(i, **kwargs):
+    data = dict(
+        product_name=f"产品{i % 3}",
+        product_yindeng_code=f"YD_PT_{i:03d}",
+        product_custody_code=None if i % 2 else f"TG{i % 2}",
+        product_start_date=date(2025, 1, 1),
+        product_end_date=date(2025, 7, 1 + i),
+        product_days_total=180,
+        product_query_date=date(2025, 6, 30),
+        product_raise_amount=float(100 * (i + 1)),
+        product_performance_benchmark=None if i == 2 else 3.0 + i / 10,
+    )
+    data.update(kwargs)
+    return WealthProductCreate(**data)
+
+
+@pytest.fixture
+def products(db_session):
+    return create_products(db_session, [_product(i) for i in range(6)])
+
+
+def test_load_columns(db_session, products):
+    table = ProductTable.load(db_session)
+    assert len(table) == 6
+    assert table["product_id"].dtype == np.int64
+    assert table["product_end_date"].dtype == np.dtype("datetime64[D]")
+    assert np.isnan(table["product_performance_benchmark"][2])
+    # 文本列字典编码：三个名称，托管编码空值代码为 -1
+    assert table.categories["product_name"] == ["产品0", "产品1", "产品2"]
+    assert list(table["product_custody_code"]) == [0, -1, 0, -1, 0, -1]
+    assert table.nbytes == sum(array.nbytes for array in table.columns.values())
+
+
+def test_query_dynamic_matches_crud(db_session, products):
+    expected = query_dynamic(db_session, "2025-07-03", mode="dataframe")
+    frame = ProductTable.load(db_session).query_dynamic("2025-07-03").to_frame()
+    assert list(frame["product_id"]) == list(expected["product_id"])
+    assert list(frame["product_days_remaining"]) == list(expected["product_days_remaining"])
+    assert list(frame["product_name"].astype(object)) == list(expected["product_name"])
+
+
+def test_sort_filter_and_group(db_session, products):
+    table = ProductTable.load(db_session)
+    ranked = table.sort("product_raise_amount", descending=True)
+    assert list(ranked["product_raise_amount"]) == [600.0, 500.0, 400.0, 300.0, 200.0, 100.0]
+    by_name = table.sort(["product_name", "product_id"])
+    assert list(by_name.labels("product_name")) == ["产品0", "产品0", "产品1", "产品1", "产品2", "产品2"]
+    # 降序同样稳定、空值在最后：业绩基准为空的产品 2 排在最后，同名产品保持原有顺序
+    by_benchmark = table.sort("product_performance_benchmark", descending=True)
+    assert list(by_benchmark["product_id"]) == [products[i] for i in (5, 4, 3, 1, 0, 2)]
+    by_custody = table.sort(["product_custody_code", "product_name"], descending=True)
+    assert list(by_custody["product_id"]) == [products[i] for i in (2, 4, 0, 5, 1, 3)]
+
+    subset = table.filter(table.isin("product_name", ["产品1"]))
+    assert list(subset.labels("product_yindeng_code")) == ["YD_PT_001", "YD_PT_004"]
+
+    totals = table.group_sum("product_name", "product_raise_amount").set_index("product_name")
+    assert totals.loc["产品0", "product_raise_amount"] == pytest.approx(100 + 400)
+    assert totals.loc["产品2", "count"] == 2
+
+    pos = table.positions([products[3], -1])
+    assert pos[1] == -1
+    assert table["product_id"][pos[0]] == products[3]
+
+
+def test_refresh_appends_and_reloads(db_session, products):
+    table = ProductTable.load(db_session)
+    assert table.refresh(db_session) is False
+
+    create_products(db_session, [_product(6, product_name="产品新")])
+    assert table.refresh(db_session) is True
+    assert len(table) == 7
+    assert table.labels("product_name")[-1] == "产品新"
+
+    # 修改金额后整表重新加载
+    update_products_where(db_session, {"product_id": products[0]}, {"product_raise_amount": 999.0})
+    assert table.refresh(db_session) is True
+    assert table["product_raise_amount"][0] == 999.0
+    assert len(table) == 7
+
+    # 只改文本列也能识别（按变更日志判断）
+    update_products_where(db_session, {"product_id": products[1]}, {"product_name": "改名"})
+    assert table.refresh(db_session) is True
+    assert table.labels("product_name")[1] == "改名"
+
+    # 只有其他表变化时不重新加载
+    create_asset(db_session, AssetCreate(asset_name="债券", asset_code="PT_OTHER", asset_type="债券"))
+    with patch.object(table, "_reload") as reload:
+        assert table.refresh(db_session) is False
+    reload.assert_not_called()
+
+
+def test_refresh_reloads_when_log_pruned_or_missing(db_session, products):
+    table = ProductTable.load(db_session)
+    create_products(db_session, [_product(6), _product(7)])
+    prune_change_log(db_session, current_watermark(db_session))
+    with patch.object(table, "_reload", wraps=table._reload) as reload:
+        assert table.refresh(db_session) is True
+    reload.assert_called_once()
+    assert len(table) == 8
+
+    with patch("fundman.analytics.product_table.has_change_log", return_value=False):
+        table = ProductTable.load(db_session)
+        assert table.version is None
+        update_products_where(db_session, {"product_id": products[0]}, {"product_name": "无日志"})
+        assert table.refresh(db_session) is True
+    assert table.labels("product_name")[0] == "无日志"
+
+
+def test_product_table_cache(db_session, products):
+    with patch("fundman.analytics.product_table._tables", {}):
+        first = product_table(db_session)
+        create_products(db_session, [_product(6)])
+        second = product_table(db_session)
+        third = product_table(db_session)
+    assert len(first) == 6 and len(second) == 7
+    # 无变化时复用同一份列数组
+    assert third["product_id"] is second["product_id"]
+
+
+def test_resident_snapshot_read_paths(db_session, products, capsys):
+    expected = [row.model_dump() for row in query_dynamic(db_session, "2025-07-03", mode="row")]
+    with patch("fundman.analytics.product_table._tables", {}), \
+            patch("fundman.analytics.product_table._resident", True):
+        snapshot = resident_product_table(db_session)
+        assert snapshot.query_dynamic("2025-07-03").to_records() == expected
+        # 快照与之后的刷新互不影响
+        create_products(db_session, [_product(6)])
+        assert len(resident_product_table(db_session)) == 7 and len(snapshot) == 6
+
+        with patch("fundman.app.init_db"), patch("fundman.app.get_db", return_value=iter([db_session])), \
+                patch("fundman.crud.query_dynamic") as crud_query:
+            main(["--no-daemon", "query", "--query-date", "2025-07-03", "--trusted"])
+        crud_query.assert_not_called()
+    out = capsys.readouterr().out
+    assert "动态查询结果数量: 7" in out and "产品1, 剩余天数: 0" in out and "产品0, 剩余天数: 4" in out
+
+
+def test_trusted_export_matches_validate(db_session, products, tmp_path):
+    outputs = {}
+    for mode in ("validate", "dataframe"):
+        out = tmp_path / f"{mode}.csv"
+        with patch("fundman.data_processor.get_db", return_value=iter([db_session])):
+            export_data_file(str(out), query_date="2025-06-30", mode=mode)
+        outputs[mode] = pd.read_csv(out, dtype=str)
+    pd.testing.assert_frame_equal(outputs["dataframe"], outputs["validate"], check_like=True)
+
+
+def test_transaction_frame_with_snapshot(db_session, products):
+    asset = create_asset(db_session, AssetCreate(asset_name="债券", asset_code="PT_BOND", asset_type="债券"))
+    for product_id, amount in zip(products[:3], (100.0, 200.0, 300.0)):
+        create_transaction(db_session, TransactionCreate(
+            product_id=product_id, asset_id=asset.asset_id, investment_date=date(2025, 2, 1),
+            maturity_date=date(2025, 9, 30), interest_rate=3.0, quantity=1.0, settlement_amount=amount,
+        ))
+    table = ProductTable.load(db_session)
+    joined = load_transaction_frame(db_session, product_codes=["YD_PT_000", "YD_PT_002"])
+    snapshot = load_transaction_frame(db_session, product_codes=["YD_PT_000", "YD_PT_002"], products=table)
+    assert list(snapshot["transaction_id"]) == list(joined["transaction_id"])
+    for column in ("product_name", "product_yindeng_code"):
+        assert snapshot[column].tolist() == joined[column].tolist()
+    np.testing.assert_array_equal(snapshot["product_performance_benchmark"], joined["product_performance_benchmark"])
+    assert (snapshot["product_end_date"].to_numpy("datetime64[D]") == joined["product_end_date"].to_numpy("datetime64[D]")).all()
+
+    expected = portfolio_analytics(db_session, "2025-07-01")["summary"]
+    actual = portfolio_analytics(db_session, "2025-07-01", products=table)["summary"]
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
@@ -0,0 +1,74 @@
+import json
+import time
+from datetime import date
+from unittest.mock import patch
+
+from fundman.app import main
+from fundman.crud import get_assets, upsert_product_by_yindeng_code
+from fundman.models import WealthProductCreate
+from fundman.utils import profiling
+from fundman.utils.profiling import Profiler, profiled, span
+
+
+def test_span_is_noop_without_profiler():
+    assert profiling._active is None
+    with span("anything") as record:
+        assert record is None
+
+    @profiled("demo")
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    assert add.__name__ == "add"
+
+
+def test_nested_spans_and_sql_attribution(db_session):
+    with profiling.profiling("root") as profiler:
+        with span("stage.outer"):
+            time.sleep(0.01)
+            with span("stage.inner", rows=3):
+                get_assets(db_session)
+        upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+            product_name="剖析产品", product_yindeng_code="YD_PROF",
+            product_start_date=date(2025, 1, 1), product_end_date=date(2025, 12, 31), product_days_total=364,
+        ))
+    assert profiling._active is None
+
+    rows = {row["name"]: row for row in profiler.summary()}
+    assert rows["stage.outer"]["self_ms"] >= 10
+    assert rows["stage.outer"]["total_ms"] >= rows["stage.inner"]["total_ms"]
+    # 内层的 SQL 同时计入外层与根区段
+    assert rows["crud.get_assets"]["sql_count"] == rows["stage.inner"]["sql_count"] == 1
+    assert rows["root"]["sql_count"] >= rows["stage.outer"]["sql_count"] + 2
+    verbs = {row["verb"] for row in profiler.sql_summary()}
+    assert {"SELECT", "INSERT", "COMMIT"} <= verbs
+
+
+def test_chrome_trace_format(db_session, tmp_path):
+    profiler = Profiler().start()
+    try:
+        with profiler.span("command.demo"):
+            get_assets(db_session)
+    finally:
+        profiler.stop()
+    path = tmp_path / "trace.json"
+    profiler.write_trace(str(path))
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+    assert {event["ph"] for event in events} == {"X"}
+    assert [event["name"] for event in events][:2] == ["command.demo", "crud.get_assets"]
+    sql = [event for event in events if event["cat"] == "sql"]
+    assert sql and sql[0]["args"]["statement"].startswith("SELECT")
+
+
+@patch("fundman.app.get_db")
+def test_profile_flag_prints_breakdown(mock_get_db, db_session, tmp_path, capsys):
+    mock_get_db.return_value = iter([db_session])
+    trace = tmp_path / "list.json"
+    main(["--profile-trace", str(trace), "investment", "list-assets"])
+    captured = capsys.readouterr()
+    assert "没有找到资产" in captured.out
+    assert "command.investment" in captured.err
+    assert "crud.get_assets" in captured.err
+    assert "SQL 语句" in captured.err
+    assert trace.exists()
@@ -0,0 +1,79 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from fundman.models import AssetCreate, WealthProductCreate, TransactionCreate
+from fundman.crud import create_asset, upsert_product_by_yindeng_code, create_transaction
+from fundman.analytics import compute_cash_flow_ladder, project_cash_flows
+from fundman.analytics.projection import bucket_edges
+from fundman.app import projection_data
+
+
+def _frames():
+    transactions = pd.DataFrame({
+        "investment_date": pd.to_datetime(["2025-01-01", "2025-01-01", "2025-01-01"]),
+        "maturity_date": pd.to_datetime(["2025-01-06", "2025-02-03", None]),
+        "interest_rate": [3.65, 0.0, 5.0],
+        "settlement_amount": [1000.0, 500.0, 700.0],
+    })
+    products = pd.DataFrame({
+        "product_end_date": pd.to_datetime(["2025-01-06", "2025-03-01"]),
+        "product_raise_amount": [800.0, 9999.0],
+    })
+    return transactions, products
+
+
+def test_daily_ladder_principal_interest_and_redemption():
+    transactions, products = _frames()
+    daily = compute_cash_flow_ladder(transactions, products, "2025-01-01", 40, ["daily"])["daily"]
+    assert len(daily) == 40
+    day = daily.set_index("bucket_start").loc[pd.Timestamp("2025-01-06")]
+    assert day["principal"] == pytest.approx(1000.0)
+    # 1000 * 3.65% * 5 / 365
+    assert day["interest"] == pytest.approx(0.5)
+    assert day["product_redemption"] == pytest.approx(800.0)
+    # 未到期日期的交易与区间外的兑付不计入
+    assert daily["principal"].sum() == pytest.approx(1500.0)
+    assert daily["product_redemption"].sum() == pytest.approx(800.0)
+    assert daily["cumulative_net_flow"].iloc[-1] == pytest.approx(daily["net_flow"].sum())
+
+
+def test_frequencies_agree_on_totals():
+    transactions, products = _frames()
+    ladders = compute_cash_flow_ladder(transactions, products, "2025-01-01", 90)
+    totals = {freq: ladder["asset_inflow"].sum() for freq, ladder in ladders.items()}
+    assert totals["daily"] == pytest.approx(totals["weekly"]) == pytest.approx(totals["monthly"])
+    assert list(ladders["monthly"]["bucket_start"].dt.day) == [1, 1, 1]
+
+
+def test_bucket_edges_monthly_partial_first_month():
+    edges = bucket_edges(np.datetime64("2025-01-15"), np.datetime64("2025-03-10"), "monthly")
+    assert list(edges.astype(str)) == ["2025-01-15", "2025-02-01", "2025-03-01"]
+    with pytest.raises(ValueError):
+        bucket_edges(np.datetime64("2025-01-15"), np.datetime64("2025-03-10"), "yearly")
+
+
+def test_project_cash_flows_from_db_and_cli(db_session, tmp_path, capsys):
+    asset = create_asset(db_session, AssetCreate(asset_name="债券", asset_code="PJ_BOND", asset_type="债券"))
+    product = upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+        product_name="投影产品", product_yindeng_code="YD_PJ_1",
+        product_start_date=date(2025, 1, 1), product_end_date=date(2025, 3, 31),
+        product_days_total=89, product_raise_amount=2000.0,
+    ))
+    create_transaction(db_session, TransactionCreate(
+        product_id=product.product_id, asset_id=asset.asset_id,
+        investment_date=date(2025, 1, 1), maturity_date=date(2025, 3, 1),
+        interest_rate=2.0, quantity=10.0, unit_full_price=100.0,
+    ))
+    monthly = project_cash_flows(db_session, "2025-01-01", 120)["monthly"].set_index("bucket_start")
+    assert monthly.loc[pd.Timestamp("2025-03-01"), "principal"] == pytest.approx(1000.0)
+    assert monthly.loc[pd.Timestamp("2025-03-01"), "product_redemption"] == pytest.approx(2000.0)
+
+    out = tmp_path / "ladder.xlsx"
+    with patch("fundman.app.get_db", return_value=iter([db_session])):
+        projection_data("2025-01-01", 120, "weekly", str(out))
+    assert "按 weekly 分桶" in capsys.readouterr().out
+    assert set(pd.ExcelFile(out).sheet_names) == {"daily", "weekly", "monthly"}
@@ -0,0 +1,102 @@
+import pytest
+from datetime import date
+
+import pandas as pd
+
+from fundman.models import AssetCreate, WealthProductCreate, TransactionCreate, AssetInDB, WealthProductInDB, WealthProductDB
+from fundman.crud import (
+    create_asset, upsert_product_by_yindeng_code, create_transaction,
+    get_assets, get_transactions, get_transactions_by_product, query_dynamic
+)
+from fundman.crud.read_modes import READ_MODES, SlotRow, column_names
+
+
+@pytest.fixture
+def seeded(db_session):
+    """一个产品、一个资产、一笔交易"""
+    asset = create_asset(db_session, AssetCreate(
+        asset_name="国债A", asset_code="RM_BOND", asset_type="债券",
+        issuer="财政部", industry="政府", region="中国大陆",
+    ))
+    product = upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+        product_name="读取模式产品",
+        product_yindeng_code="YD_RM_001",
+        product_start_date=date(2025, 1, 1),
+        product_end_date=date(2025, 12, 31),
+        product_days_total=364,
+    ))
+    create_transaction(db_session, TransactionCreate(
+        product_id=product.product_id,
+        asset_id=asset.asset_id,
+        investment_date=date(2025, 2, 1),
+        quantity=100.0,
+        unit_full_price=101.0,
+    ))
+    return product, asset
+
+
+@pytest.mark.parametrize("mode", ["construct", "row"])
+def test_trusted_modes_match_validated_values(db_session, seeded, mode):
+    """免校验模式的字段值与校验模式一致"""
+    validated = get_assets(db_session)
+    trusted = get_assets(db_session, mode=mode)
+    assert len(trusted) == len(validated) == 1
+    assert trusted[0].model_dump() == validated[0].model_dump()
+
+
+def test_row_mode_returns_slotted_objects(db_session, seeded):
+    rows = get_transactions(db_session, mode="row")
+    assert isinstance(rows[0], SlotRow)
+    assert not hasattr(rows[0], "__dict__")
+    assert rows[0].settlement_amount == pytest.approx(10100.0)
+
+
+def test_construct_mode_returns_pydantic_instances(db_session, seeded):
+    rows = get_assets(db_session, mode="construct")
+    assert isinstance(rows[0], AssetInDB)
+
+
+def test_tuple_and_dataframe_modes(db_session, seeded):
+    product, _ = seeded
+    tuples = get_transactions_by_product(db_session, product.product_id, mode="tuple")
+    assert isinstance(tuples[0], tuple)
+
+    df = get_transactions_by_product(db_session, product.product_id, mode="dataframe")
+    assert isinstance(df, pd.DataFrame)
+    assert len(df) == 1
+    assert pd.api.types.is_datetime64_any_dtype(df["investment_date"])
+
+
+@pytest.mark.parametrize("mode", READ_MODES)
+def test_query_dynamic_days_remaining_all_modes(db_session, seeded, mode):
+    """各读取模式下 query_dynamic 计算的剩余天数一致"""
+    result = query_dynamic(db_session, "2025-12-01", mode=mode)
+    if mode == "dataframe":
+        days = result["product_days_remaining"].tolist()
+    elif mode == "tuple":
+        idx = column_names(WealthProductDB).index("product_days_remaining")
+        days = [row[idx] for row in result]
+    else:
+        days = [row.product_days_remaining for row in result]
+    assert days == [30]
+    if mode in ("validate", "construct"):
+        assert isinstance(result[0], WealthProductInDB)
+
+
+def test_unknown_mode_raises(db_session):
+    with pytest.raises(ValueError):
+        get_assets(db_session, mode="fast")
+
+
+@pytest.mark.parametrize("mode", READ_MODES)
+def test_query_dynamic_business_days_all_modes(db_session, seeded, mode):
+    """按工作日计算剩余期限：2025-12-01 至 2025-12-31 共 22 个工作日"""
+    result = query_dynamic(db_session, "2025-12-01", mode=mode, business_days=True)
+    if mode == "dataframe":
+        days = result["product_days_remaining"].tolist()
+    elif mode == "tuple":
+        idx = column_names(WealthProductDB).index("product_days_remaining")
+        days = [row[idx] for row in result]
+    else:
+        days = [row.product_days_remaining for row in result]
+    assert days == [22]
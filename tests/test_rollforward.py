@@ -0,0 +1,44 @@
+from datetime import date
+from unittest.mock import patch
+
+from fundman.models import WealthProductCreate, WealthProductDB
+from fundman.crud import create_products, query_dynamic, rollforward_products
+from fundman.app import rollforward_data
+
+
+def _seed(db):
+    ends = [date(2025, 8, 31), date(2026, 1, 15), date(2025, 7, 1)]
+    return create_products(db, [WealthProductCreate(
+        product_name=f"产品{i}",
+        product_yindeng_code=f"YD_RF_{i}",
+        product_start_date=date(2025, 1, 1),
+        product_end_date=end,
+        product_days_total=(end - date(2025, 1, 1)).days,
+    ) for i, end in enumerate(ends)])
+
+
+def test_rollforward_matches_dynamic_query(db_session):
+    _seed(db_session)
+    assert rollforward_products(db_session, "2025/08/01") == 3
+    stored = {p.product_yindeng_code: (p.product_query_date, p.product_days_remaining)
+              for p in db_session.query(WealthProductDB).all()}
+    dynamic = {p.product_yindeng_code: p.product_days_remaining for p in query_dynamic(db_session, "2025-08-01")}
+    assert stored == {code: (date(2025, 8, 1), days) for code, days in dynamic.items()}
+    # 已到期的产品剩余天数为 0
+    assert stored["YD_RF_2"][1] == 0
+
+
+def test_rollforward_with_filters(db_session):
+    ids = _seed(db_session)
+    assert rollforward_products(db_session, "2025-12-31", {"product_id": ids[1]}) == 1
+    product = db_session.get(WealthProductDB, ids[1])
+    db_session.refresh(product)
+    assert product.product_days_remaining == 15
+    assert db_session.get(WealthProductDB, ids[0]).product_query_date is None
+
+
+def test_rollforward_cli(db_session, capsys):
+    _seed(db_session)
+    with patch("fundman.app.get_db", return_value=iter([db_session])):
+        rollforward_data("2025-09-01", ["YD_RF_0", "YD_RF_1"])
+    assert "更新 2 个产品，其中已到期 1 个" in capsys.readouterr().out
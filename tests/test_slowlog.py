@@ -0,0 +1,65 @@
+import json
+
+from fundman.app import main
+from fundman.crud import get_asset_by_code, get_assets
+from fundman.database.slowlog import SlowQueryLog, normalize_statement, read_entries, summarize
+
+
+def test_normalize_statement():
+    assert normalize_statement("SELECT *  FROM t\n WHERE a = 'x' AND b = 12.5 LIMIT ?") == \
+        "SELECT * FROM t WHERE a = ? AND b = ? LIMIT ?"
+    # IN 列表长度不同也归为同一组
+    assert normalize_statement("SELECT * FROM t WHERE id IN (?, ?, ?)") == \
+        normalize_statement("SELECT * FROM t WHERE id IN (?)") == "SELECT * FROM t WHERE id IN (?)"
+    assert normalize_statement("SELECT * FROM t WHERE id = %(id_1)s") == "SELECT * FROM t WHERE id = ?"
+
+
+def test_slow_statements_logged_with_caller_and_plan(db_session, tmp_path):
+    path = tmp_path / "slow.log"
+    log = SlowQueryLog(path, threshold_ms=0).install(db_session.get_bind())
+    try:
+        get_asset_by_code(db_session, "NOPE")
+        get_assets(db_session)
+    finally:
+        log.uninstall()
+    entries = list(read_entries(path))
+    assert len(entries) == 2
+    lookup = entries[0]
+    assert lookup["caller"] == "fundman.crud.investment_crud.get_asset_by_code"
+    assert "NOPE" in lookup["parameters"]
+    assert lookup["duration_ms"] >= 0
+    assert any("assets" in line for line in lookup["plan"])
+
+
+def test_threshold_and_summary(db_session, tmp_path):
+    path = tmp_path / "slow.log"
+    log = SlowQueryLog(path, threshold_ms=10_000).install(db_session.get_bind())
+    try:
+        get_assets(db_session)
+    finally:
+        log.uninstall()
+    assert list(read_entries(path)) == []
+
+    entries = [
+        {"normalized": "SELECT a", "duration_ms": 5.0, "caller": "f", "plan": ["SCAN a"]},
+        {"normalized": "SELECT a", "duration_ms": 7.0, "caller": "f", "plan": ["SCAN a2"]},
+        {"normalized": "SELECT b", "duration_ms": 20.0, "caller": "g", "plan": []},
+    ]
+    rows = summarize(entries, top=1)
+    assert [row["normalized"] for row in rows] == ["SELECT b"]
+    rows = summarize(entries)
+    assert rows[1]["count"] == 2 and rows[1]["mean_ms"] == 6.0 and rows[1]["plan"] == ["SCAN a2"]
+
+
+def test_cli_db_slowlog(tmp_path, capsys):
+    path = tmp_path / "slow.log"
+    backup = tmp_path / "slow.log.1"
+    backup.write_text(json.dumps({"normalized": "SELECT x FROM assets", "duration_ms": 3.0, "plan": ["SCAN assets"]}) + "\n",
+                      encoding="utf-8")
+    path.write_text(json.dumps({"normalized": "SELECT x FROM assets", "duration_ms": 5.0, "caller": "c"}) + "\nnot json\n",
+                    encoding="utf-8")
+    main(["db", "slowlog", "--log", str(path)])
+    out = capsys.readouterr().out
+    assert "SELECT x FROM assets" in out
+    assert "     2" in out and "8.00" in out
+    assert "调用方: c" in out
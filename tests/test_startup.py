@@ -0,0 +1,62 @@
+"""CLI 启动开销测试（基于 python -X importtime）"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Set, Tuple
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# fundman query 启动（解析参数 + 加载查询所需依赖）的导入耗时预算（毫秒）；
+# 墙钟耗时受机器负载影响，仅在设置该环境变量时检查
+QUERY_IMPORT_BUDGET_MS = os.getenv("FUNDMAN_IMPORT_BUDGET_MS")
+
+QUERY_STARTUP = (
+    "from fundman.app import build_parser, __getattr__ as load; "
+    "build_parser().parse_args(['query', '--query-date', '2025-08-01']); "
+    "[load(name) for name in ('init_db', 'get_db', 'query_dynamic')]"
+)
+
+
+def _importtime(code: str) -> Tuple[Set[str], float]:
+    """在子进程中执行代码，返回导入的模块集合与顶层导入累计耗时（毫秒）"""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    modules: Set[str] = set()
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.add(name.strip())
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return modules, total_us / 1000.0
+
+
+def test_app_import_is_lightweight():
+    modules, _ = _importtime("import fundman.app")
+    assert not {"pandas", "numpy", "sqlalchemy", "pydantic", "openpyxl"} & modules
+
+
+def test_query_startup_skips_dataframe_stack():
+    modules, _ = _importtime(QUERY_STARTUP)
+    assert "sqlalchemy" in modules
+    assert not {"pandas", "numpy", "openpyxl", "xlrd"} & modules
+
+
+@pytest.mark.skipif(not QUERY_IMPORT_BUDGET_MS, reason="未设置 FUNDMAN_IMPORT_BUDGET_MS")
+def test_query_startup_fits_budget():
+    _, elapsed_ms = _importtime(QUERY_STARTUP)
+    budget_ms = float(QUERY_IMPORT_BUDGET_MS)
+    assert elapsed_ms < budget_ms, f"fundman query 启动导入耗时 {elapsed_ms:.0f}ms 超出预算 {budget_ms:.0f}ms"
+
+
+def test_schema_modules_do_not_need_pydantic():
+    modules, _ = _importtime("import fundman.database.connection")
+    assert "pydantic" not in modules
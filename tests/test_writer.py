@@ -0,0 +1,109 @@
+import shutil
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from fundman.models import AssetCreate, TransactionCreate, TransactionDB, WealthProductCreate
+from fundman.crud import create_asset, upsert_product_by_yindeng_code
+from fundman.server.client import write_remote
+from fundman.server.daemon import DaemonServer
+from fundman.server.writer import WriteBehindQueue
+
+
+@pytest.fixture
+def holdings(db_session):
+    asset = create_asset(db_session, AssetCreate(asset_name="债券", asset_code="WB_BOND", asset_type="债券"))
+    product = upsert_product_by_yindeng_code(db_session, WealthProductCreate(
+        product_name="产品", product_yindeng_code="YD_WB", product_start_date=date(2025, 1, 1),
+        product_end_date=date(2025, 12, 31), product_days_total=364,
+    ))
+    return product.product_id, asset.asset_id
+
+
+def _transaction(product_id, asset_id, quantity):
+    return TransactionCreate(product_id=product_id, asset_id=asset_id, investment_date=date(2025, 2, 1),
+                             quantity=quantity, unit_full_price=100.0)
+
+
+def test_concurrent_submits_are_grouped(db_engine, db_session, holdings):
+    # 写线程处理第一组期间到达的请求合并为下一组
+    with WriteBehindQueue(db_engine, max_latency=0.05) as writer:
+        futures = [writer.submit("create_transaction", _transaction(*holdings, float(i + 1))) for i in range(20)]
+        results = [future.result(5) for future in futures]
+        stats = writer.stats()
+    assert [result.settlement_amount for result in results] == [100.0 * (i + 1) for i in range(20)]
+    assert len({result.transaction_id for result in results}) == 20
+    assert stats["requests"] == 20 and stats["groups"] < 20
+    assert db_session.query(TransactionDB).count() == 20
+
+
+def test_failed_request_only_fails_itself(db_engine, db_session, holdings):
+    with WriteBehindQueue(db_engine, max_latency=0.05) as writer:
+        ok = writer.submit("create_asset", {"asset_name": "存款", "asset_code": "WB_DEP", "asset_type": "存款"})
+        duplicate = writer.submit("create_asset", {"asset_name": "重复", "asset_code": "WB_BOND", "asset_type": "债券"})
+        after = writer.submit("create_transaction", _transaction(*holdings, 2.0))
+        assert ok.result(5).asset_code == "WB_DEP"
+        with pytest.raises(Exception, match="UNIQUE"):
+            duplicate.result(5)
+        assert after.result(5).settlement_amount == 200.0
+
+
+def test_invalid_payload_raises_in_caller(db_engine):
+    writer = WriteBehindQueue(db_engine)
+    with pytest.raises(ValueError):
+        writer.submit("delete_everything", {})
+    with pytest.raises(Exception):
+        writer.submit("create_asset", {"asset_name": "缺少类型"})
+    writer.close()
+
+
+def test_locked_group_is_retried(db_engine, db_session, holdings):
+    writer = WriteBehindQueue(db_engine)
+    apply = writer._apply
+    calls = []
+
+    def flaky(group):
+        calls.append(len(group))
+        if len(calls) == 1:
+            raise OperationalError("COMMIT", {}, Exception("database is locked"))
+        return apply(group)
+
+    with patch.object(writer, "_apply", side_effect=flaky):
+        result = writer.write("create_transaction", _transaction(*holdings, 3.0), timeout=5)
+    writer.close()
+    assert result.settlement_amount == 300.0
+    assert writer.stats()["lock_retries"] == 1
+    assert db_session.query(TransactionDB).count() == 1
+
+
+def test_daemon_write_op(db_engine, db_session, holdings):
+    directory = tempfile.mkdtemp(prefix="fm", dir="/tmp")
+    path = Path(directory) / "d.sock"
+    server = DaemonServer(path, writer=WriteBehindQueue(db_engine))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        payload = {"product_id": holdings[0], "asset_id": holdings[1], "investment_date": date(2025, 2, 1),
+                   "quantity": 1.0, "unit_full_price": 99.0}
+        results = []
+        workers = [threading.Thread(target=lambda: results.append(write_remote("create_transaction", payload, str(path))))
+                   for _ in range(5)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert [result["settlement_amount"] for result in results] == [99.0] * 5
+        assert results[0]["investment_date"] == "2025-02-01"
+        with pytest.raises(RuntimeError):
+            write_remote("create_transaction", {"product_id": holdings[0]}, str(path))
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory)
+    assert write_remote("create_transaction", payload, str(path)) is None
+    assert db_session.query(TransactionDB).count() == 5